@@ -5,24 +5,738 @@
 #
 # The full license is in the file LICENSE, distributed with this software.
 # ----------------------------------------------------------------------------
+import collections
+import concurrent.futures
+import contextlib
+import contextvars
+import errno
+import functools
 import gzip
+import hashlib
+import io
 import itertools
+import mmap
+import os
+import queue
+import re
+import shutil
+import sqlite3
+import struct
+import threading
 import warnings
+import zipfile
+import zlib
 from typing import List
 
+import numpy as np
 import skbio
 import pandas as pd
 
 import qiime2.plugin.model as model
 from qiime2.plugin import ValidationError
 
+from q2_types import __version__
+
+
+_FASTA_READ_SIZE = 8 * 1024 * 1024
+_FASTA_WRITE_SIZE = 8 * 1024 * 1024
+
 
 def read_from_fasta(path, constructor=skbio.DNA, lowercase=False):
     return skbio.read(path, format='fasta', constructor=constructor,
                       lowercase=lowercase)
 
 
+class SequenceRecord:
+    """A sequence read from a FASTA file, without an skbio object behind it.
+
+    Records carry the ID, description and sequence string of a FASTA record
+    and only build the skbio sequence (see `to_skbio`) when it is needed. For
+    convenience they look like one: `metadata`, `str`, `len`, equality and
+    slicing work as they do for skbio sequences, and any other attribute is
+    looked up on the skbio sequence.
+
+    """
+    __slots__ = ('_metadata', '_sequence', '_constructor', '_skbio')
+    __hash__ = None
+
+    def __init__(self, id, description, sequence, constructor=None):
+        self._metadata = {'id': id, 'description': description}
+        self._sequence = sequence
+        self._constructor = constructor
+        self._skbio = None
+
+    @classmethod
+    def from_skbio(cls, sequence):
+        record = cls(sequence.metadata.get('id', ''),
+                     sequence.metadata.get('description', ''),
+                     str(sequence), constructor=type(sequence))
+        record._skbio = sequence
+        return record
+
+    @property
+    def id(self):
+        return self.metadata['id']
+
+    @property
+    def description(self):
+        return self.metadata['description']
+
+    @property
+    def metadata(self):
+        if self._skbio is not None:
+            return self._skbio.metadata
+        return self._metadata
+
+    def to_skbio(self):
+        """Return the record as an skbio sequence.
+
+        The sequence is built once, on the first call. Its characters are not
+        validated again, as the record was read from a validated file.
+
+        """
+        if self._skbio is None:
+            if self._constructor is None:
+                raise TypeError('This record does not know which skbio '
+                                'sequence type to convert to.')
+            self._skbio = self._constructor(
+                self._sequence, metadata=self._metadata, validate=False)
+        return self._skbio
+
+    def __str__(self):
+        return self._sequence
+
+    def __len__(self):
+        return len(self._sequence)
+
+    def __getitem__(self, indexable):
+        return self.to_skbio()[indexable]
+
+    def __eq__(self, other):
+        if isinstance(other, SequenceRecord):
+            other = other.to_skbio()
+        return self.to_skbio() == other
+
+    def __getattr__(self, name):
+        # Private names are never delegated, so that a record whose slots are
+        # not yet set (e.g., while being unpickled) can not recurse here.
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.to_skbio(), name)
+
+    def __repr__(self):
+        return '<%s id=%r, length=%d>' % (type(self).__name__, self.id,
+                                          len(self))
+
+
+def _parse_fasta(path, constructor=skbio.DNA, lowercase=False):
+    """Parse a FASTA file into lists of IDs, descriptions and sequences.
+
+    This reads the whole file at once and splits it in bulk, which is much
+    faster than `read_from_fasta`. It yields exactly what `read_from_fasta`
+    would, but only handles the common case: `None` is returned for files
+    that are not plain ASCII, have blank lines or whitespace within records,
+    or contain characters `constructor` would reject, so that the caller can
+    fall back to `read_from_fasta`.
+
+    """
+    with open(path, 'rb') as fh:
+        data = fh.read()
+
+    if not data.isascii():
+        return None
+    if b'\r' in data:
+        data = data.replace(b'\r\n', b'\n')
+        if b'\r' in data:
+            return None
+    if not data.strip():
+        return [], [], []
+    if not data.startswith(b'>'):
+        return None
+
+    allowed = _allowed_bytes(constructor, lowercase)
+    records = data.split(b'\n>')
+    records[0] = records[0][1:]
+    del data
+
+    ids, descriptions, sequences = [], [], []
+    for i, record in enumerate(records):
+        # Let go of each record as soon as it is parsed.
+        records[i] = None
+        parsed = _parse_fasta_record(record, allowed, lowercase)
+        if parsed is None:
+            return None
+        ids.append(parsed[0])
+        descriptions.append(parsed[1])
+        sequences.append(parsed[2])
+
+    return ids, descriptions, sequences
+
+
+def _allowed_bytes(constructor, lowercase):
+    alphabet = ''.join(constructor.alphabet)
+    if lowercase:
+        alphabet += alphabet.lower()
+    return alphabet.encode('ascii') + b'\n'
+
+
+def _parse_fasta_record(record, allowed, lowercase):
+    """Parse one record, without its leading '>', of a FASTA file.
+
+    Returns the ID, description and sequence, or `None` if the record is not
+    one that `_parse_fasta` handles.
+
+    """
+    header, _, body = record.partition(b'\n')
+
+    seq = body.strip(b'\n')
+    if (not seq or body.startswith(b'\n') or b'\n\n' in seq
+            or seq.translate(None, allowed)):
+        return None
+    seq = seq.replace(b'\n', b'').decode('ascii')
+    if lowercase:
+        seq = seq.upper()
+
+    header = header.decode('ascii').rstrip()
+    if header and header[0].isspace():
+        return '', header.lstrip(), seq
+    tokens = header.split(None, 1)
+    return (tokens[0] if tokens else '',
+            tokens[1] if len(tokens) == 2 else '', seq)
+
+
+def _iter_fasta_blocks(fh):
+    """Read a FASTA file in blocks of whole records.
+
+    Each block starts with a '>' and has its line endings normalised to '\n'.
+    `None` is yielded in place of a block that `_parse_fasta` would not
+    handle, and nothing is read after it.
+
+    """
+    chunk = fh.read(_FASTA_READ_SIZE)
+    if not chunk.startswith(b'>'):
+        yield None
+        return
+
+    pending = []
+    while pending is not None:
+        if chunk:
+            # Only split off whole records, and keep the rest of the chunk
+            # for the next block.
+            cut = chunk.rfind(b'\n>')
+            if cut == -1:
+                pending.append(chunk)
+                chunk = fh.read(_FASTA_READ_SIZE)
+                continue
+            pending.append(chunk[:cut])
+            block = b''.join(pending)
+            pending = [chunk[cut + 1:]]
+            chunk = fh.read(_FASTA_READ_SIZE)
+        else:
+            block = b''.join(pending)
+            pending = None
+
+        if not block.isascii():
+            yield None
+            return
+        if b'\r' in block:
+            # A block ends where a '\n' was cut off (or at the end of the
+            # file), so a trailing '\r' is a line ending too.
+            block = block.replace(b'\r\n', b'\n')
+            if block.endswith(b'\r'):
+                block = block[:-1]
+            if b'\r' in block:
+                yield None
+                return
+        yield block
+
+
+def _iter_fasta(path, constructor=skbio.DNA, lowercase=False):
+    """Stream the records of a FASTA file as `SequenceRecord`s.
+
+    The file is read in blocks which are split the same way `_parse_fasta`
+    splits a whole file. As soon as a record turns up that `_parse_fasta`
+    would not handle, the remaining records are taken from `read_from_fasta`
+    instead, so the same records (and errors) come out either way.
+
+    """
+    allowed = _allowed_bytes(constructor, lowercase)
+    n_records = 0
+    with open(path, 'rb') as fh:
+        for block in _iter_fasta_blocks(fh):
+            if block is None:
+                break
+            records = block.split(b'\n>')
+            records[0] = records[0][1:]
+            del block
+            for i, record in enumerate(records):
+                records[i] = None
+                parsed = _parse_fasta_record(record, allowed, lowercase)
+                if parsed is None:
+                    break
+                yield SequenceRecord(*parsed, constructor=constructor)
+                n_records += 1
+            else:
+                continue
+            break
+        else:
+            return
+
+    remaining = itertools.islice(
+        read_from_fasta(path, constructor, lowercase=lowercase),
+        n_records, None)
+    for sequence in remaining:
+        yield SequenceRecord.from_skbio(sequence)
+
+
+_HEADER_ID = re.compile(r'^>(\S*)', flags=re.MULTILINE)
+
+
+def _has_bare_cr(data):
+    step = _FASTA_READ_SIZE
+    for i in range(0, len(data), step):
+        # Each block overlaps the next by a byte, to see a '\r\n' at its end.
+        block = data[i:i + step + 1]
+        if block.count(b'\r', 0, step) != block.count(b'\r\n'):
+            return True
+    return False
+
+
+def _index_fasta(path):
+    """Find the ID, byte offset and byte length of each record of a FASTA file.
+
+    Records are split at lines starting with '>'. `None` is returned for
+    files which `read_from_fasta` would split differently, i.e., files that
+    don't start with '>', have bare '\r' line endings or non-UTF-8 headers.
+
+    """
+    ids, offsets = [], []
+    with open(path, 'rb') as fh:
+        size = os.fstat(fh.fileno()).st_size
+        if not size:
+            return [], np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if data[:1] != b'>' or _has_bare_cr(data):
+                return None
+
+            start = 0
+            while start < size:
+                # Work on blocks of whole records.
+                stop = start + _FASTA_READ_SIZE
+                if stop < size:
+                    cut = data.rfind(b'\n>', start, stop)
+                    if cut == -1:
+                        cut = data.find(b'\n>', stop - 1)
+                    stop = size if cut == -1 else cut + 1
+                else:
+                    stop = size
+                block = data[start:stop]
+
+                # Find the lines starting with '>' from the line lengths.
+                lines = block.split(b'\n')
+                line_starts = np.zeros(len(lines), dtype=np.int64)
+                np.cumsum(np.fromiter(map(len, lines), dtype=np.int64,
+                                      count=len(lines))[:-1] + 1,
+                          out=line_starts[1:])
+                line_starts = line_starts[line_starts < len(block)]
+                chars = np.frombuffer(block, dtype=np.uint8)
+                headers = np.flatnonzero(chars[line_starts] == ord('>'))
+                offsets.append(start + line_starts[headers])
+
+                try:
+                    headers = b'\n'.join([lines[i] for i in headers.tolist()])
+                    headers = headers.decode('utf-8')
+                except UnicodeDecodeError:
+                    return None
+                # The ID is everything up to the first whitespace, and empty
+                # if the header starts with whitespace.
+                ids.extend(_HEADER_ID.findall(headers))
+                start = stop
+
+    offsets = np.concatenate(offsets)
+    lengths = np.diff(offsets, append=size)
+    return ids, offsets, lengths
+
+
+def _check_fasta_index(path, index):
+    # Whether `index` could be the index of the FASTA file `path`: records
+    # must follow one another, from the start to the end of the file, and
+    # each must start with a header line.
+    ids, offsets, lengths = index
+    if not (len(ids) == len(offsets) == len(lengths)) or \
+            offsets.dtype.kind != 'i' or lengths.dtype.kind != 'i':
+        return False
+    with open(path, 'rb') as fh:
+        size = os.fstat(fh.fileno()).st_size
+        if not len(offsets):
+            return not size
+        if offsets[0] != 0 or (lengths < 1).any() or \
+                not np.array_equal(np.diff(offsets, append=size), lengths):
+            return False
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            chars = np.frombuffer(data, dtype=np.uint8)
+            try:
+                return bool((chars[offsets] == ord('>')).all()
+                            and (chars[offsets[1:] - 1] == ord('\n')).all())
+            finally:
+                del chars
+
+
+def _fasta_index(path):
+    """Like `_index_fasta`, but cached (see `_get_cache_dir`).
+
+    The index is stored with numpy (the offsets, the lengths and the
+    newline-separated IDs) and is keyed on the path, size and modification
+    time of the FASTA file, so it is rebuilt whenever the file changes. A
+    cached index is checked against the file before it is used (see
+    `_check_fasta_index`), and rebuilt if it doesn't fit it.
+
+    """
+    try:
+        cache = _cache_path(path, '.fasta-index.npz')
+    except OSError:
+        cache = None
+
+    if cache is not None and os.path.exists(cache):
+        try:
+            with np.load(cache) as index:
+                offsets, lengths = index['offsets'], index['lengths']
+                ids = index['ids'].tobytes().decode('utf-8')
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            pass
+        else:
+            index = ids.split('\n') if len(offsets) else [], offsets, lengths
+            if _check_fasta_index(path, index):
+                return index
+
+    index = _index_fasta(path)
+    if index is not None and cache is not None:
+        ids, offsets, lengths = index
+        ids = np.frombuffer('\n'.join(ids).encode('utf-8'), dtype=np.uint8)
+        # Write to a temporary file first, so that a concurrent reader never
+        # sees a partial index.
+        tmp = '%s.%d.tmp' % (cache, os.getpid())
+        try:
+            with open(tmp, 'wb') as fh:
+                np.savez(fh, offsets=offsets, lengths=lengths, ids=ids)
+            os.replace(tmp, cache)
+        except OSError:
+            pass
+    return index
+
+
+def _fasta_to_matrix(path, constructor=skbio.DNA):
+    """Read an aligned FASTA file into IDs and a 2-D array of ASCII codes.
+
+    The array has one row per sequence and is built in memory. Caching it is
+    opt-in, as it is as large as the alignment: if the
+    `Q2_TYPES_ALIGNMENT_CACHE` environment variable is set to 1, the array is
+    written to the cache (see `_get_cache_dir`) and returned as a read-only
+    `np.memmap` of it, so later reads of the same file only map it. It is
+    still built in memory if the file can't be indexed (see `_index_fasta`)
+    or the cache isn't writable.
+
+    """
+    index = _fasta_index(path)
+    records = _iter_fasta(path, constructor)
+    if index is None:
+        records = list(records)
+        ids = [record.id for record in records]
+    else:
+        ids = index[0]
+
+    cache = None
+    if index is not None and \
+            os.environ.get('Q2_TYPES_ALIGNMENT_CACHE', '0') == '1':
+        try:
+            cache = _cache_path(path, '.alignment.npy')
+            if os.path.exists(cache):
+                matrix = np.load(cache, mmap_mode='r')
+                if matrix.dtype == np.uint8 and matrix.ndim == 2 and \
+                        len(matrix) == len(ids):
+                    return ids, matrix
+        except (OSError, ValueError):
+            pass
+
+    records = iter(records)
+    first = next(records, None)
+    if first is None:
+        return ids, np.empty((0, 0), dtype=np.uint8)
+    shape = (len(ids), len(first))
+
+    matrix = tmp = None
+    if cache is not None:
+        tmp = '%s.%d.tmp' % (cache, os.getpid())
+        try:
+            matrix = np.lib.format.open_memmap(tmp, mode='w+',
+                                               dtype=np.uint8, shape=shape)
+        except OSError:
+            tmp = None
+    if matrix is None:
+        matrix = np.empty(shape, dtype=np.uint8)
+
+    try:
+        for i, record in enumerate(itertools.chain([first], records)):
+            sequence = str(record).encode('ascii')
+            if len(sequence) != shape[1]:
+                raise ValueError(
+                    'The sequences are not aligned: %r has %d positions, but '
+                    '%r has %d.' % (record.id, len(sequence), first.id,
+                                    shape[1]))
+            matrix[i] = np.frombuffer(sequence, dtype=np.uint8)
+        if tmp is not None:
+            matrix.flush()
+            del matrix
+            os.replace(tmp, cache)
+            matrix = np.load(cache, mmap_mode='r')
+    except BaseException:
+        if tmp is not None and os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return ids, matrix
+
+
+def _read_fasta_record(fh, offset, length, constructor=skbio.DNA):
+    """Read the record at `offset` of a FASTA file as a `SequenceRecord`."""
+    fh.seek(offset)
+    record = fh.read(length)
+
+    parsed = None
+    if record.isascii():
+        parsed = _parse_fasta_record(record[1:].replace(b'\r\n', b'\n'),
+                                     _allowed_bytes(constructor, False),
+                                     False)
+    if parsed is None:
+        sequence = next(read_from_fasta(io.BytesIO(record), constructor))
+        return SequenceRecord.from_skbio(sequence)
+    return SequenceRecord(*parsed, constructor=constructor)
+
+
+def _ordinal(n):
+    if 10 <= n % 100 <= 20:
+        suffix = 'th'
+    else:
+        suffix = {1: 'st', 2: 'nd', 3: 'rd'}.get(n % 10, 'th')
+    return '%d%s' % (n, suffix)
+
+
+class _FASTAWriter:
+    """Write FASTA records to a text file in large blocks.
+
+    The output is what `skbio.io.write` writes for each sequence (IDs have
+    whitespace replaced by '_' and descriptions have newlines replaced by
+    ' '), but records are formatted directly rather than going through
+    skbio's I/O registry one at a time. Use as a context manager, so that the
+    last block is written.
+
+    """
+    _whitespace = re.compile(r'\s')
+
+    def __init__(self, fh, max_width=None):
+        if max_width is not None and max_width < 1:
+            raise ValueError('Maximum line width must be greater than zero '
+                             '(max_width=%d).' % max_width)
+        self._fh = fh
+        self._max_width = max_width
+        self._buffer = []
+        self._buffered = 0
+        self._n_records = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.flush()
+
+    def write(self, id_, description, sequence):
+        self._n_records += 1
+        if not sequence:
+            raise ValueError(
+                '%s sequence does not contain any characters (i.e., it is an '
+                'empty/blank sequence). Writing empty sequences is not '
+                'supported.' % _ordinal(self._n_records))
+
+        header = self._whitespace.sub('_', '%s' % (id_,))
+        description = '%s' % (description,)
+        if description:
+            header += ' ' + description.replace('\n', ' ')
+        if self._max_width is not None:
+            width = self._max_width
+            sequence = '\n'.join(sequence[i:i + width]
+                                 for i in range(0, len(sequence), width))
+
+        self._buffer.append('>%s\n%s\n' % (header, sequence))
+        self._buffered += len(sequence)
+        if self._buffered >= _FASTA_WRITE_SIZE:
+            self.flush()
+
+    def write_sequence(self, sequence):
+        """Write an skbio sequence or a `SequenceRecord`."""
+        metadata = sequence.metadata
+        self.write(metadata.get('id', ''), metadata.get('description', ''),
+                   str(sequence))
+
+    def write_block(self, text):
+        """Write records that are already formatted as `write` would."""
+        self._buffer.append(text)
+        self._buffered += len(text)
+        if self._buffered >= _FASTA_WRITE_SIZE:
+            self.flush()
+
+    def flush(self):
+        self._fh.write(''.join(self._buffer))
+        self._buffer = []
+        self._buffered = 0
+
+
+# A header as `_FASTAWriter` writes it: the ID, then optionally a single space
+# and a description without leading or trailing whitespace.
+_CANONICAL_HEADER = re.compile(r'^>\S*(?: \S(?:.*\S)?)?$', flags=re.MULTILINE)
+
+
+def _uppercase_fasta_block(block, allowed):
+    """Uppercase the sequences of a block from `_iter_fasta_blocks`.
+
+    This only handles blocks in which every record is a header, as
+    `_FASTAWriter` would write it, followed by a single sequence line. `None`
+    is returned for any other block.
+
+    """
+    lines = block.rstrip(b'\n').split(b'\n')
+    if len(lines) % 2:
+        return None
+    n_records = len(lines) // 2
+    headers = b'\n'.join(lines[0::2])
+    sequences = b'\n'.join(lines[1::2])
+    if (headers.count(b'\n>') != n_records - 1 or b'' in lines[1::2]
+            or sequences.translate(None, allowed)):
+        return None
+    headers = headers.decode('ascii')
+    if len(_CANONICAL_HEADER.findall(headers)) != n_records:
+        return None
+
+    lines[1::2] = sequences.upper().split(b'\n')
+    lines.append(b'')
+    return b'\n'.join(lines).decode('ascii')
+
+
+def _write_uppercase_fasta(path, fh, constructor=skbio.DNA):
+    """Write a mixed-case FASTA file to `fh` with its sequences uppercased.
+
+    The output is what reading the file with `lowercase=True` and writing it
+    with `skbio.io.write` would give, but the file is streamed in blocks, and
+    blocks of one-line records that are already formatted that way only have
+    their sequence lines uppercased. Like `_iter_fasta`, the remaining records
+    are passed through skbio as soon as one needs it.
+
+    """
+    allowed = _allowed_bytes(constructor, True)
+    n_records = 0
+    with open(path, 'rb') as fin, _FASTAWriter(fh) as writer:
+        for block in _iter_fasta_blocks(fin):
+            if block is None:
+                break
+            text = _uppercase_fasta_block(block, allowed)
+            if text is not None:
+                writer.write_block(text)
+                n_records += text.count('\n') // 2
+                continue
+
+            records = block.split(b'\n>')
+            records[0] = records[0][1:]
+            del block
+            for i, record in enumerate(records):
+                records[i] = None
+                parsed = _parse_fasta_record(record, allowed, True)
+                if parsed is None:
+                    break
+                writer.write(*parsed)
+                n_records += 1
+            else:
+                continue
+            break
+        else:
+            return
+
+        remaining = itertools.islice(
+            read_from_fasta(path, constructor, lowercase=True),
+            n_records, None)
+        for sequence in remaining:
+            writer.write_sequence(sequence)
+
+
+def _write_series_to_fasta(fh, series, constructor=skbio.DNA,
+                           lowercase=False, skip_empty=False):
+    """Write a pd.Series of sequences, indexed by ID, in FASTA format.
+
+    Like building `constructor(sequence, metadata={'id': id_})` for each
+    sequence and writing it with `skbio.io.write`, but plain strings are only
+    checked against `constructor`'s alphabet. Anything else (or a string with
+    other characters) is passed to `constructor`, which converts or rejects it
+    as it always has. With `skip_empty`, falsy sequences are not written.
+
+    """
+    allowed = _allowed_bytes(constructor, lowercase)[:-1]
+    with _FASTAWriter(fh) as writer:
+        for id_, seq in series.items():
+            if skip_empty and not seq:
+                continue
+            if (isinstance(seq, str) and seq.isascii()
+                    and not seq.encode('ascii').translate(None, allowed)):
+                if lowercase:
+                    seq = seq.upper()
+            else:
+                seq = str(constructor(seq, lowercase=lowercase))
+            writer.write(id_, '', seq)
+
+
+def _duplicate_id_error(id_):
+    return ValueError("FASTA format sequence IDs must be unique. The "
+                      "following ID was found more than once: %s." % id_)
+
+
+def _check_unique_ids(ids):
+    if len(set(ids)) != len(ids):
+        seen = set()
+        for id_ in ids:
+            if id_ in seen:
+                raise _duplicate_id_error(id_)
+            seen.add(id_)
+
+
 def fasta_to_series(ff, constructor=skbio.DNA, lowercase=False):
+    records = _parse_fasta(str(ff), constructor, lowercase)
+    if records is None:
+        return _skbio_fasta_to_series(ff, constructor, lowercase)
+
+    ids, descriptions, sequences = records
+    _check_unique_ids(ids)
+    data = {}
+    for i, (id_, description) in enumerate(zip(ids, descriptions)):
+        # The characters were already checked by `_parse_fasta`.
+        data[id_] = constructor(
+            sequences[i], metadata={'id': id_, 'description': description},
+            lowercase=lowercase, validate=False)
+        sequences[i] = None
+    return pd.Series(data)
+
+
+def _fasta_to_str_series(ff, constructor=skbio.DNA, lowercase=False):
+    """Like `fasta_to_series`, but with the sequences as strings.
+
+    No skbio objects are created unless the file needs `read_from_fasta`.
+
+    """
+    records = _parse_fasta(str(ff), constructor, lowercase)
+    if records is None:
+        return _skbio_fasta_to_series(ff, constructor, lowercase).astype(str)
+
+    ids, _, sequences = records
+    _check_unique_ids(ids)
+    return pd.Series(sequences, index=ids, dtype=str)
+
+
+def _skbio_fasta_to_series(ff, constructor, lowercase):
     data = {}
     for sequence in read_from_fasta(str(ff), constructor,
                                     lowercase=lowercase):
@@ -32,13 +746,564 @@ def fasta_to_series(ff, constructor=skbio.DNA, lowercase=False):
         # relevant PR associated with this change:
         # https://github.com/qiime2/q2-types/pull/335
         if id_ in data:
-            raise ValueError("FASTA format sequence IDs must be unique. The "
-                             "following ID was found more than once: %s."
-                             % id_)
+            raise _duplicate_id_error(id_)
         data[id_] = sequence
     return pd.Series(data)
 
 
+# Files that passed validation are remembered by their first and last MiB.
+_FINGERPRINT_SIZE = 1024 * 1024
+
+
+def _fingerprint(path, size):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as fh:
+        digest.update(fh.read(_FINGERPRINT_SIZE))
+        if size > _FINGERPRINT_SIZE:
+            fh.seek(max(size - _FINGERPRINT_SIZE, _FINGERPRINT_SIZE))
+            digest.update(fh.read())
+    return digest.hexdigest()
+
+
+def _validation_cache_key(fmt):
+    path = str(fmt.path)
+    stat = os.stat(path)
+    fmt_type = type(fmt)
+    return '\0'.join([
+        __version__, '%s.%s' % (fmt_type.__module__, fmt_type.__qualname__),
+        str(getattr(fmt, 'alphabet', None)), str(stat.st_size),
+        str(stat.st_mtime_ns), _fingerprint(path, stat.st_size)])
+
+
+@contextlib.contextmanager
+def _validation_cache():
+    path = os.path.join(_get_cache_dir(), 'validation.sqlite')
+    with contextlib.closing(sqlite3.connect(path, timeout=30)) as db:
+        with db:
+            db.execute('CREATE TABLE IF NOT EXISTS passed '
+                       '(key TEXT, level TEXT, PRIMARY KEY (key, level))')
+        yield db
+
+
+def _cached_validation(validate):
+    """Skip validating files that have passed validation before.
+
+    This decorates `_validate_` methods. It is opt-in: unless the
+    `Q2_TYPES_VALIDATION_CACHE` environment variable is set to 1, every
+    validation runs. Passes are recorded in a SQLite database in the cache
+    directory, which is private to the user (see `_get_cache_dir`) so that no
+    one else can record passes. They are keyed on the version of q2-types,
+    the format, its alphabet (if it has one) and the size, modification time
+    and a fingerprint of the file; a pass at 'max' also counts for 'min'.
+    Failures are never recorded, and any problem with the cache itself
+    (including a cache directory that isn't private) just means the file is
+    validated.
+
+    Files which were just validated in parallel (see `_validated_files`) are
+    always skipped.
+
+    """
+    @functools.wraps(validate)
+    def _validate_(self, level):
+        if (str(self.path), level) in _VALIDATED_FILES.get():
+            return
+
+        key = None
+        if os.environ.get('Q2_TYPES_VALIDATION_CACHE', '0') == '1':
+            try:
+                key = _validation_cache_key(self)
+                levels = ('min', 'max') if level == 'min' else (level,)
+                with _validation_cache() as db:
+                    passed = db.execute(
+                        'SELECT 1 FROM passed WHERE key = ? AND level IN '
+                        '(%s)' % ', '.join('?' * len(levels)),
+                        (key, *levels)).fetchone()
+                if passed:
+                    return
+            except (OSError, sqlite3.Error):
+                key = None
+
+        validate(self, level)
+
+        if key is not None:
+            try:
+                with _validation_cache() as db, db:
+                    db.execute('INSERT OR IGNORE INTO passed VALUES (?, ?)',
+                               (key, level))
+            except (OSError, sqlite3.Error):
+                pass
+
+    return _validate_
+
+
+_VALIDATED_FILES = contextvars.ContextVar('_VALIDATED_FILES',
+                                          default=frozenset())
+
+
+@contextlib.contextmanager
+def _validated_files(paths, level):
+    """Treat `paths` as valid at `level` within this context."""
+    token = _VALIDATED_FILES.set(
+        _VALIDATED_FILES.get() | {(str(path), level) for path in paths})
+    try:
+        yield
+    finally:
+        _VALIDATED_FILES.reset(token)
+
+
+def _parallel_map(fn, *iterables, n_jobs=None):
+    """Return a list of `fn` applied to `iterables`, using `n_jobs` processes.
+
+    This behaves like `list(map(...))`: results are in order, and if several
+    calls fail, the exception raised is the one from the first of them in
+    that order, whichever worker finishes first; the calls still queued are
+    then cancelled. With a single job, or a single call, no processes are
+    started.
+
+    """
+    n_jobs = _get_n_jobs(n_jobs)
+    args = list(zip(*iterables))
+    if n_jobs < 2 or len(args) < 2:
+        return [fn(*arg) for arg in args]
+
+    with concurrent.futures.ProcessPoolExecutor(n_jobs) as pool:
+        futures = [pool.submit(fn, *arg) for arg in args]
+        try:
+            return [future.result() for future in futures]
+        finally:
+            # Not pool.shutdown(cancel_futures=True), which can hang after
+            # a task fails to pickle.
+            for future in futures:
+                future.cancel()
+
+
+def _validate_file(fmt_type, path, level):
+    fmt_type(path, mode='r').validate(level)
+
+
+def _validate_files(fmt_type, paths, level, n_jobs=None):
+    """Validate each of `paths` as `fmt_type`, using `n_jobs` processes.
+
+    If several files are invalid, the error raised is the one for the first
+    of them in `paths` (see `_parallel_map`).
+
+    """
+    _parallel_map(_validate_file, itertools.repeat(fmt_type), paths,
+                  itertools.repeat(level), n_jobs=n_jobs)
+
+
+_STAT_THREADS = 16
+_STAT_CHUNK_SIZE = 32
+
+
+def _exist(paths):
+    return [os.path.exists(path) for path in paths]
+
+
+def _paths_exist(paths):
+    """Return a dict mapping each of `paths` to whether it exists.
+
+    Each distinct path is checked once. The checks are spread over a pool of
+    threads, in chunks, as they are dominated by the latency of the
+    filesystem rather than by the CPU (e.g., on network storage).
+
+    """
+    paths = list(dict.fromkeys(paths))
+    chunks = [paths[i:i + _STAT_CHUNK_SIZE]
+              for i in range(0, len(paths), _STAT_CHUNK_SIZE)]
+    if len(chunks) < 2:
+        return dict(zip(paths, _exist(paths)))
+
+    with concurrent.futures.ThreadPoolExecutor(
+            min(_STAT_THREADS, len(chunks))) as pool:
+        return dict(zip(paths, itertools.chain.from_iterable(
+            pool.map(_exist, chunks))))
+
+
+_GZIP_READ_SIZE = 8 * 1024 * 1024
+_BGZF_HEADER = re.compile(rb'\x1f\x8b\x08\x04.{6}\x06\x00BC\x02\x00(..)',
+                          re.S)
+
+
+class _UnusualFASTQ(Exception):
+    pass
+
+
+def _prefetch(iterable, depth=4):
+    """Iterate over `iterable` in a background thread.
+
+    Up to `depth` items are kept ready, so that producing them (e.g.,
+    decompressing data) overlaps with consuming them. Exceptions are raised
+    in the consuming thread, in order.
+
+    """
+    items = queue.Queue(depth)
+    done = threading.Event()
+
+    def produce():
+        try:
+            for item in iterable:
+                items.put((item, None))
+                if done.is_set():
+                    return
+        except BaseException as error:
+            items.put((None, error))
+        else:
+            items.put((None, StopIteration()))
+        finally:
+            if hasattr(iterable, 'close'):
+                iterable.close()
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, error = items.get()
+            if isinstance(error, StopIteration):
+                return
+            if error is not None:
+                raise error
+            yield item
+    finally:
+        done.set()
+        while thread.is_alive():
+            try:
+                items.get(timeout=0.1)
+            except queue.Empty:
+                pass
+
+
+def _inflate_bgzf(data, sizes):
+    view = memoryview(data)
+    blocks = []
+    offset = 0
+    for size in sizes:
+        blocks.append(zlib.decompress(view[offset:offset + size], 31))
+        offset += size
+    return b''.join(blocks)
+
+
+def _iter_bgzf(path, n_jobs):
+    """Inflate a BGZF file with `n_jobs` threads, in order.
+
+    BGZF files are made of small gzip members whose headers record their
+    compressed size, so they can be inflated independently. Raises
+    `_UnusualFASTQ` as soon as the file turns out not to be BGZF.
+
+    """
+    with open(path, 'rb') as fh, \
+            concurrent.futures.ThreadPoolExecutor(n_jobs) as pool:
+        pending = collections.deque()
+        buffer = b''
+        while True:
+            chunk = fh.read(_GZIP_READ_SIZE)
+            buffer += chunk
+            sizes = []
+            offset = 0
+            while True:
+                match = _BGZF_HEADER.match(buffer, offset)
+                if match is None:
+                    break
+                size = int.from_bytes(match.group(1), 'little') + 1
+                if offset + size > len(buffer):
+                    break
+                sizes.append(size)
+                offset += size
+            if not chunk:
+                if buffer[offset:]:
+                    raise _UnusualFASTQ()
+                break
+            if not sizes and len(buffer) - offset >= 18:
+                raise _UnusualFASTQ()
+
+            pending.append(pool.submit(_inflate_bgzf, buffer[:offset], sizes))
+            buffer = buffer[offset:]
+            if len(pending) > 2 * n_jobs:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _iter_gzip(path):
+    with gzip.open(path, 'rb') as fh:
+        while data := fh.read(_GZIP_READ_SIZE):
+            yield data
+
+
+_BGZF_BLOCK_SIZE = 65280
+# Blocks are compressed in batches of this many, to amortise thread handoffs.
+_BGZF_BATCH_SIZE = 16 * _BGZF_BLOCK_SIZE
+_BGZF_EOF = bytes.fromhex(
+    '1f8b08040000000000ff0600424302001b0003000000000000000000')
+
+
+def _bgzf_compress(data, compresslevel):
+    blocks = []
+    for start in range(0, len(data), _BGZF_BLOCK_SIZE):
+        block = data[start:start + _BGZF_BLOCK_SIZE]
+        compressor = zlib.compressobj(compresslevel, zlib.DEFLATED, -15)
+        deflated = compressor.compress(block) + compressor.flush()
+        blocks.append(
+            b'\x1f\x8b\x08\x04\x00\x00\x00\x00\x00\xff\x06\x00BC\x02\x00'
+            + struct.pack('<H', len(deflated) + 25) + deflated
+            + struct.pack('<II', zlib.crc32(block), len(block)))
+    return b''.join(blocks)
+
+
+class _BGZFWriter(io.BufferedIOBase):
+    """Write a BGZF file, compressing its blocks with `n_jobs` threads.
+
+    BGZF is ordinary multi-member gzip, so any gzip reader can read the
+    result; `_iter_bgzf` can also inflate it in parallel.
+
+    """
+
+    def __init__(self, path, compresslevel=9, n_jobs=1):
+        self._fh = open(path, 'wb')
+        self._compresslevel = compresslevel
+        self._n_jobs = n_jobs
+        self._pool = concurrent.futures.ThreadPoolExecutor(n_jobs)
+        self._pending = collections.deque()
+        self._buffer = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = memoryview(data)
+        self._buffer += data
+        while len(self._buffer) >= _BGZF_BATCH_SIZE:
+            self._submit(bytes(self._buffer[:_BGZF_BATCH_SIZE]))
+            del self._buffer[:_BGZF_BATCH_SIZE]
+        return data.nbytes
+
+    def _submit(self, data):
+        self._pending.append(
+            self._pool.submit(_bgzf_compress, data, self._compresslevel))
+        while len(self._pending) > 2 * self._n_jobs:
+            self._fh.write(self._pending.popleft().result())
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            if self._buffer:
+                self._submit(bytes(self._buffer))
+                self._buffer.clear()
+            while self._pending:
+                self._fh.write(self._pending.popleft().result())
+            self._fh.write(_BGZF_EOF)
+        finally:
+            self._pool.shutdown()
+            self._fh.close()
+            super().close()
+
+
+def _open_gzip_writer(path, compresslevel=None, n_jobs=None):
+    """Open `path` for writing gzipped data.
+
+    `compresslevel` and `n_jobs` default to the `Q2_TYPES_GZIP_LEVEL` and
+    `Q2_TYPES_N_JOBS` environment variables (see `_get_gzip_level` and
+    `_get_n_jobs`). With more than one job the file is written as BGZF by a
+    `_BGZFWriter`, otherwise as a single gzip member.
+
+    """
+    compresslevel = _get_gzip_level(compresslevel)
+    n_jobs = _get_n_jobs(n_jobs)
+    if n_jobs > 1:
+        return _BGZFWriter(path, compresslevel, n_jobs)
+    return gzip.open(path, 'wb', compresslevel)
+
+
+# The Linux FICLONE ioctl, which shares the data of a file with another on
+# filesystems supporting it (btrfs, XFS, ...).
+_FICLONE = 0x40049409
+_COPY_SIZE = 1024 * 1024 * 1024
+
+_DUPLICATE_STATS = collections.Counter()
+_DUPLICATE_STATS_LOCK = threading.Lock()
+
+
+def _count_duplicate(strategy, bytes_copied=0):
+    with _DUPLICATE_STATS_LOCK:
+        _DUPLICATE_STATS[strategy] += 1
+        _DUPLICATE_STATS['bytes_copied'] += bytes_copied
+
+
+def _duplicate_stats():
+    """Return how the files duplicated by `_duplicate` were duplicated.
+
+    The counts are of files per strategy ('reflink', 'hardlink' and 'copy'),
+    and of the bytes physically copied ('bytes_copied'), in this process.
+
+    """
+    with _DUPLICATE_STATS_LOCK:
+        return collections.Counter(_DUPLICATE_STATS)
+
+
+def _reflink(src_fh, dst_fh):
+    try:
+        import fcntl
+        fcntl.ioctl(dst_fh.fileno(), _FICLONE, src_fh.fileno())
+    except (ImportError, OSError):
+        return False
+    return True
+
+
+def _sendfile(src_fd, dst_fd, count):
+    return os.sendfile(dst_fd, src_fd, None, count)
+
+
+# Errors meaning a kernel copy is not possible between two files.
+_KERNEL_COPY_ERRNOS = frozenset({
+    errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP,
+    errno.EBADF, errno.EPERM, errno.ENOTSOCK})
+
+
+def _kernel_copy(src_fh, dst_fh):
+    # Copies what is left of `src_fh` to `dst_fh` without going through
+    # userspace, if the platform and filesystems allow it.
+    for copy in (getattr(os, 'copy_file_range', None), _sendfile):
+        if copy is None:
+            continue
+        try:
+            while copy(src_fh.fileno(), dst_fh.fileno(), _COPY_SIZE):
+                pass
+        except OSError as e:
+            if e.errno not in _KERNEL_COPY_ERRNOS:
+                raise
+        else:
+            return True
+    return False
+
+
+def _duplicate(src, dst, overwrite=False):
+    """Duplicate the file `src` as `dst`, as cheaply as possible.
+
+    As with `qiime2.util.duplicate`, `FileExistsError` is raised if `dst`
+    exists, unless `overwrite` is true: `dst` is then replaced, unless it
+    already is `src`. In order, the data of `src` is shared with `dst` by a
+    reflink, `dst` is made a hard link to `src`, or the data is copied, in
+    the kernel (`copy_file_range`, then `sendfile`) or through a buffer. A
+    hard link means `src` must not be modified afterwards. See
+    `_duplicate_stats` for monitoring.
+
+    """
+    src = os.fspath(src)
+    dst = os.fspath(dst)
+    if overwrite and os.path.exists(dst):
+        # Replacing dst in place could truncate src if they are linked.
+        if os.path.samefile(src, dst):
+            return
+        os.remove(dst)
+
+    # dst is created exclusively, so that an existing one is never written
+    # to, and its leftovers are only removed once it has been created here.
+    with open(src, 'rb') as src_fh, open(dst, 'xb') as dst_fh:
+        if _reflink(src_fh, dst_fh):
+            _count_duplicate('reflink')
+            return
+
+    os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        pass
+    else:
+        _count_duplicate('hardlink')
+        return
+
+    with open(src, 'rb') as src_fh, open(dst, 'xb') as dst_fh:
+        if not _kernel_copy(src_fh, dst_fh):
+            shutil.copyfileobj(src_fh, dst_fh)
+        _count_duplicate('copy', dst_fh.tell())
+
+
+def _check_fastq_records(lines, n=None):
+    zipper = itertools.zip_longest(*[lines] * 4)
+    if n is None:
+        file_ = enumerate(zipper)
+    else:
+        file_ = zip(range(1, n), zipper)
+    for i, record in file_:
+        header, seq, sep, qual = record
+
+        if not header.startswith('@'):
+            raise ValidationError('Header on line %d is not FASTQ, '
+                                  'records may be misaligned' %
+                                  (i * 4 + 1))
+
+        if seq is None or seq == '\n':
+            raise ValidationError('Missing sequence for record '
+                                  'beginning on line %d'
+                                  % (i * 4 + 1))
+        elif not seq.isupper():
+            raise ValidationError('Lowercase case sequence on line %d'
+                                  % (i * 4 + 2))
+
+        if sep is None:
+            raise ValidationError('Missing separator for record '
+                                  'beginning on line %d'
+                                  % (i * 4 + 1))
+        elif not sep.startswith('+'):
+            raise ValidationError('Invalid separator on line %d'
+                                  % (i * 4 + 3))
+
+        if qual is None:
+            raise ValidationError('Missing quality for record '
+                                  'beginning on line %d'
+                                  % (i * 4 + 1))
+        elif len(qual) != len(seq):
+            raise ValidationError('Quality score length doesn\'t '
+                                  'match sequence length for record '
+                                  'beginning on line %d'
+                                  % (i * 4 + 1))
+
+
+def _check_fastq_gz(path, n_jobs=None):
+    """Validate every record of a gzipped FASTQ file, working on bytes.
+
+    Decompression happens in a background thread (several, for BGZF files
+    when `n_jobs` > 1) while whole records are checked here a block at a
+    time. Raises `_UnusualFASTQ` as soon as anything looks wrong, or could be
+    read differently in text mode (non-ASCII bytes or carriage returns), so
+    that the caller can produce the error with `_check_fastq_records`.
+
+    """
+    n_jobs = _get_n_jobs(n_jobs)
+    with open(path, 'rb') as fh:
+        bgzf = _BGZF_HEADER.match(fh.read(18)) is not None
+    blocks = _iter_bgzf(path, n_jobs) if bgzf and n_jobs > 1 else \
+        _iter_gzip(path)
+
+    repeat = itertools.repeat
+    leftover = b''
+    try:
+        for data in _prefetch(blocks):
+            if not data.isascii() or b'\r' in data:
+                raise _UnusualFASTQ()
+            lines = (leftover + data).split(b'\n')
+            n_lines = (len(lines) - 1) // 4 * 4
+            leftover = b'\n'.join(lines[n_lines:])
+
+            headers = lines[0:n_lines:4]
+            seqs = lines[1:n_lines:4]
+            seps = lines[2:n_lines:4]
+            quals = lines[3:n_lines:4]
+            if not (all(map(bytes.startswith, headers, repeat(b'@')))
+                    and all(map(bytes.isupper, seqs))
+                    and all(map(bytes.startswith, seps, repeat(b'+')))
+                    and list(map(len, seqs)) == list(map(len, quals))):
+                raise _UnusualFASTQ()
+    except (EOFError, OSError, zlib.error):
+        # a damaged file, which the text-mode reader reports
+        raise _UnusualFASTQ()
+
+    # whatever is left is an incomplete record
+    if leftover:
+        raise _UnusualFASTQ()
+
+
 # These classes and their helper functions are located in this module to avoid
 # circular imports.
 class FastqGzFormat(model.BinaryFileFormat):
@@ -48,46 +1313,15 @@ class FastqGzFormat(model.BinaryFileFormat):
     """
 
     def _check_n_records(self, n=None):
+        if n is None:
+            try:
+                return _check_fastq_gz(str(self))
+            except _UnusualFASTQ:
+                pass
         with gzip.open(str(self), mode='rt', encoding='ascii') as fh:
-            zipper = itertools.zip_longest(*[fh] * 4)
-            if n is None:
-                file_ = enumerate(zipper)
-            else:
-                file_ = zip(range(1, n), zipper)
-            for i, record in file_:
-                header, seq, sep, qual = record
-
-                if not header.startswith('@'):
-                    raise ValidationError('Header on line %d is not FASTQ, '
-                                          'records may be misaligned' %
-                                          (i * 4 + 1))
-
-                if seq is None or seq == '\n':
-                    raise ValidationError('Missing sequence for record '
-                                          'beginning on line %d'
-                                          % (i * 4 + 1))
-                elif not seq.isupper():
-                    raise ValidationError('Lowercase case sequence on line %d'
-                                          % (i * 4 + 2))
-
-                if sep is None:
-                    raise ValidationError('Missing separator for record '
-                                          'beginning on line %d'
-                                          % (i * 4 + 1))
-                elif not sep.startswith('+'):
-                    raise ValidationError('Invalid separator on line %d'
-                                          % (i * 4 + 3))
-
-                if qual is None:
-                    raise ValidationError('Missing quality for record '
-                                          'beginning on line %d'
-                                          % (i * 4 + 1))
-                elif len(qual) != len(seq):
-                    raise ValidationError('Quality score length doesn\'t '
-                                          'match sequence length for record '
-                                          'beginning on line %d'
-                                          % (i * 4 + 1))
+            _check_fastq_records(fh, n)
 
+    @_cached_validation
     def _validate_(self, level):
         with self.open() as fh:
             if fh.peek(2)[:2] != b'\x1f\x8b':
@@ -97,6 +1331,87 @@ class FastqGzFormat(model.BinaryFileFormat):
         self._check_n_records(record_count_map[level])
 
 
+def _get_n_jobs(n_jobs=None):
+    """Resolve the number of worker processes to use.
+
+    When `n_jobs` is None, the `Q2_TYPES_N_JOBS` environment variable is
+    consulted, defaulting to 1 (i.e., no parallelism). A value of 0 means one
+    worker per available CPU.
+
+    """
+    if n_jobs is None:
+        value = os.environ.get('Q2_TYPES_N_JOBS', '1')
+        try:
+            n_jobs = int(value)
+        except ValueError:
+            raise ValueError('Q2_TYPES_N_JOBS must be a non-negative '
+                             'integer, found %r.' % value)
+
+    if n_jobs < 0:
+        raise ValueError('The number of jobs must be a non-negative '
+                         'integer, found %r.' % n_jobs)
+    if n_jobs == 0:
+        return os.cpu_count() or 1
+    return n_jobs
+
+
+def _get_gzip_level(compresslevel=None):
+    """Resolve the gzip compression level to use.
+
+    When `compresslevel` is None, the `Q2_TYPES_GZIP_LEVEL` environment
+    variable is consulted, defaulting to 9 (gzip's own default). Lower levels
+    are much faster, for slightly larger files.
+
+    """
+    if compresslevel is None:
+        value = os.environ.get('Q2_TYPES_GZIP_LEVEL', '9')
+        try:
+            compresslevel = int(value)
+        except ValueError:
+            raise ValueError('Q2_TYPES_GZIP_LEVEL must be an integer from 0 '
+                             'to 9, found %r.' % value)
+
+    if not 0 <= compresslevel <= 9:
+        raise ValueError('The gzip compression level must be an integer '
+                         'from 0 to 9, found %r.' % compresslevel)
+    return compresslevel
+
+
+def _get_cache_dir():
+    """Return the directory in which to cache data derived from files.
+
+    This is the `Q2_TYPES_CACHE_DIR` environment variable if it is set, and a
+    'q2-types' directory in the user's cache directory (`XDG_CACHE_HOME`, or
+    '~/.cache') otherwise. It is created readable by its owner only, and
+    `PermissionError` is raised if it belongs to another user or others may
+    write to it, as anything found there is trusted.
+
+    """
+    path = os.environ.get('Q2_TYPES_CACHE_DIR')
+    if not path:
+        cache_home = os.environ.get('XDG_CACHE_HOME') or \
+            os.path.join(os.path.expanduser('~'), '.cache')
+        path = os.path.join(cache_home, 'q2-types')
+    os.makedirs(path, mode=0o700, exist_ok=True)
+
+    stat = os.stat(path)
+    if hasattr(os, 'getuid') and (stat.st_uid != os.getuid()
+                                  or stat.st_mode & 0o022):
+        raise PermissionError(
+            errno.EACCES, 'The q2-types cache directory must belong to the '
+            'current user and not be writable by others', path)
+    return path
+
+
+def _cache_path(path, suffix):
+    """Return the path at which to cache data derived from the file `path`."""
+    stat = os.stat(path)
+    key = '%s\0%d\0%d' % (os.path.realpath(path), stat.st_size,
+                          stat.st_mtime_ns)
+    digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+    return os.path.join(_get_cache_dir(), digest + suffix)
+
+
 def _validate_num_partitions(
         num_samples: int, num_partitions: int, sample_type: str = "sample"
 ) -> int:
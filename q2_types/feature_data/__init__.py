@@ -35,7 +35,8 @@ from ._types import (
 from ._objects import (
     NucleicAcidIterator, DNAIterator, PairedDNAIterator, AlignedDNAIterator,
     ProteinIterator, AlignedProteinIterator, RNAIterator, AlignedRNAIterator,
-    PairedRNAIterator)
+    PairedRNAIterator, SequenceRecord, IndexedDNASequences,
+    AlignedSequenceMatrix)
 
 __all__ = [
     'TaxonomyFormat', 'TaxonomyDirectoryFormat', 'HeaderlessTSVTaxonomyFormat',
@@ -53,7 +54,9 @@ __all__ = [
     'AlignedProteinIterator', 'RNAIterator', 'AlignedRNAIterator',
     'RNAFASTAFormat', 'AlignedRNAFASTAFormat', 'RNASequencesDirectoryFormat',
     'AlignedRNASequencesDirectoryFormat', 'RNASequence', 'AlignedRNASequence',
-    'PairedRNAIterator', 'PairedRNASequencesDirectoryFormat',
+    'PairedRNAIterator', 'SequenceRecord', 'IndexedDNASequences',
+    'AlignedSequenceMatrix',
+    'PairedRNASequencesDirectoryFormat',
     'PairedEndRNASequence', 'BLAST6Format', 'BLAST6DirectoryFormat', 'BLAST6',
     'MixedCaseDNAFASTAFormat', 'MixedCaseDNASequencesDirectoryFormat',
     'MixedCaseRNAFASTAFormat', 'MixedCaseRNASequencesDirectoryFormat',
@@ -15,7 +15,10 @@ import skbio
 import qiime2
 
 from q2_types.feature_table import BIOMV210Format
-from q2_types._util import fasta_to_series, read_from_fasta
+from q2_types._util import (
+    fasta_to_series, _fasta_to_str_series, _iter_fasta,
+    _write_series_to_fasta, _FASTAWriter, _write_uppercase_fasta
+)
 
 from .. import (
     TaxonomyFormat, HeaderlessTSVTaxonomyFormat, TSVTaxonomyFormat,
@@ -28,7 +31,7 @@ from .. import (
     SequenceCharacteristicsFormat,
     DNAIterator, PairedDNAIterator, AlignedDNAIterator,
     ProteinIterator, AlignedProteinIterator, RNAIterator, AlignedRNAIterator,
-    PairedRNAIterator
+    PairedRNAIterator, IndexedDNASequences, AlignedSequenceMatrix
 )
 
 from ...plugin_setup import plugin
@@ -276,43 +279,52 @@ def _30(ff: BIOMV210Format) -> DNAFASTAFormat:
 # common to all FASTA transformers
 
 def _fastaformats_to_metadata(ff, constructor=skbio.DNA, lowercase=False):
-    df = fasta_to_series(ff, constructor,
-                         lowercase=lowercase).to_frame()
-    df = df.astype(str)
+    df = _fasta_to_str_series(ff, constructor,
+                              lowercase=lowercase).to_frame()
     df.index.name, df.columns = 'Feature ID', ['Sequence']
     return qiime2.Metadata(df)
 
 
 def _series_to_fasta_format(ff, data, sequence_type="DNA", lowercase=False):
+    constructors = {'DNA': skbio.DNA, 'RNA': skbio.RNA,
+                    'protein': skbio.Protein}
+    if sequence_type not in constructors:
+        raise NotImplementedError(
+            "pd.Series can only be converted to DNA or "
+            "protein FASTA format.")
     with ff.open() as f:
-        for id_, seq in data.items():
-            if sequence_type == "protein":
-                sequence = skbio.Protein(seq, metadata={'id': id_},
-                                         lowercase=lowercase)
-            elif sequence_type == "DNA":
-                sequence = skbio.DNA(seq, metadata={'id': id_},
-                                     lowercase=lowercase)
-            elif sequence_type == "RNA":
-                sequence = skbio.RNA(seq, metadata={'id': id_},
-                                     lowercase=lowercase)
-            else:
-                raise NotImplementedError(
-                    "pd.Series can only be converted to DNA or "
-                    "protein FASTA format.")
-            skbio.io.write(sequence, format='fasta', into=f)
+        _write_series_to_fasta(f, data, constructors[sequence_type],
+                               lowercase=lowercase)
+
+
+def _iterator_to_fasta_format(ff, data):
+    with ff.open() as f, _FASTAWriter(f) as writer:
+        for sequence in data:
+            writer.write_sequence(sequence)
+
+
+def _paired_iterator_to_fasta_formats(ff_left, ff_right, data):
+    with ff_left.open() as lfile, ff_right.open() as rfile, \
+            _FASTAWriter(lfile) as lwriter, _FASTAWriter(rfile) as rwriter:
+        for lseq, rseq in data:
+            if rseq.metadata['id'] != lseq.metadata['id']:
+                raise ValueError(lseq.metadata['id'] + ' and ' +
+                                 rseq.metadata['id'] + ' differ')
+            lwriter.write_sequence(lseq)
+            rwriter.write_sequence(rseq)
 
 
 # DNA Transformers
 @plugin.register_transformer
 def _9(ff: DNAFASTAFormat) -> DNAIterator:
-    generator = read_from_fasta(str(ff), skbio.DNA)
+    generator = _iter_fasta(str(ff), skbio.DNA)
     return DNAIterator(generator)
 
 
 @plugin.register_transformer
 def _10(data: DNAIterator) -> DNAFASTAFormat:
     ff = DNAFASTAFormat()
-    skbio.io.write(iter(data), format='fasta', into=str(ff))
+    _iterator_to_fasta_format(ff, data)
     return ff
 
 
@@ -341,25 +353,29 @@ def _12(data: PairedDNAIterator) -> PairedDNASequencesDirectoryFormat:
     ff_left = DNAFASTAFormat()
     ff_right = DNAFASTAFormat()
 
-    with ff_left.open() as lfile, ff_right.open() as rfile:
-        for lseq, rseq in data:
-            if rseq.metadata['id'] != lseq.metadata['id']:
-                raise ValueError(lseq.metadata['id'] + ' and ' +
-                                 rseq.metadata['id'] + ' differ')
-            skbio.io.write(lseq, format='fasta', into=lfile)
-            skbio.io.write(rseq, format='fasta', into=rfile)
+    _paired_iterator_to_fasta_formats(ff_left, ff_right, data)
 
     df.left_dna_sequences.write_data(ff_left, DNAFASTAFormat)
     df.right_dna_sequences.write_data(ff_right, DNAFASTAFormat)
     return df
 
 
+@plugin.register_transformer
+def _231(ff: DNAFASTAFormat) -> IndexedDNASequences:
+    return IndexedDNASequences(ff)
+
+
 @plugin.register_transformer
 def _13(ff: AlignedDNAFASTAFormat) -> skbio.TabularMSA:
     return skbio.TabularMSA.read(str(ff), constructor=skbio.DNA,
                                  format='fasta')
 
 
+@plugin.register_transformer
+def _232(ff: AlignedDNAFASTAFormat) -> AlignedSequenceMatrix:
+    return AlignedSequenceMatrix.read(ff, skbio.DNA)
+
+
 @plugin.register_transformer
 def _14(data: skbio.TabularMSA) -> AlignedDNAFASTAFormat:
     ff = AlignedDNAFASTAFormat()
@@ -386,14 +402,14 @@ def _16(data: pd.Series) -> DNAFASTAFormat:
 
 @plugin.register_transformer
 def _18(ff: AlignedDNAFASTAFormat) -> AlignedDNAIterator:
-    generator = read_from_fasta(str(ff), skbio.DNA)
+    generator = _iter_fasta(str(ff), skbio.DNA)
     return AlignedDNAIterator(generator)
 
 
 @plugin.register_transformer
 def _19(data: AlignedDNAIterator) -> AlignedDNAFASTAFormat:
     ff = AlignedDNAFASTAFormat()
-    skbio.io.write(iter(data), format='fasta', into=str(ff))
+    _iterator_to_fasta_format(ff, data)
     return ff
 
 
@@ -416,21 +432,21 @@ def _35(data: pd.Series) -> AlignedDNAFASTAFormat:
 
 @plugin.register_transformer
 def _36(fmt: AlignedDNAFASTAFormat) -> DNAIterator:
-    generator = read_from_fasta(str(fmt), skbio.DNA)
+    generator = _iter_fasta(str(fmt), skbio.DNA)
     return DNAIterator(generator)
 
 
 # Protein FASTA transformers
 @plugin.register_transformer
 def _37(ff: ProteinFASTAFormat) -> ProteinIterator:
-    generator = read_from_fasta(str(ff), skbio.Protein)
+    generator = _iter_fasta(str(ff), skbio.Protein)
     return ProteinIterator(generator)
 
 
 @plugin.register_transformer
 def _38(data: ProteinIterator) -> ProteinFASTAFormat:
     ff = ProteinFASTAFormat()
-    skbio.io.write(iter(data), format='fasta', into=str(ff))
+    _iterator_to_fasta_format(ff, data)
     return ff
 
 
@@ -440,6 +456,11 @@ def _39(ff: AlignedProteinFASTAFormat) -> skbio.TabularMSA:
                                  format='fasta')
 
 
+@plugin.register_transformer
+def _233(ff: AlignedProteinFASTAFormat) -> AlignedSequenceMatrix:
+    return AlignedSequenceMatrix.read(ff, skbio.Protein)
+
+
 @plugin.register_transformer
 def _40(data: skbio.TabularMSA) -> AlignedProteinFASTAFormat:
     ff = AlignedProteinFASTAFormat()
@@ -466,14 +487,14 @@ def _43(data: pd.Series) -> ProteinFASTAFormat:
 
 @plugin.register_transformer
 def _44(ff: AlignedProteinFASTAFormat) -> AlignedProteinIterator:
-    generator = read_from_fasta(str(ff), skbio.Protein)
+    generator = _iter_fasta(str(ff), skbio.Protein)
     return AlignedProteinIterator(generator)
 
 
 @plugin.register_transformer
 def _45(data: AlignedProteinIterator) -> AlignedProteinFASTAFormat:
     ff = AlignedProteinFASTAFormat()
-    skbio.io.write(iter(data), format='fasta', into=str(ff))
+    _iterator_to_fasta_format(ff, data)
     return ff
 
 
@@ -496,21 +517,21 @@ def _48(data: pd.Series) -> AlignedProteinFASTAFormat:
 
 @plugin.register_transformer
 def _49(fmt: AlignedProteinFASTAFormat) -> ProteinIterator:
-    generator = read_from_fasta(str(fmt), skbio.Protein)
+    generator = _iter_fasta(str(fmt), skbio.Protein)
     return ProteinIterator(generator)
 
 
 # RNA Transformers
 @plugin.register_transformer
 def _50(ff: RNAFASTAFormat) -> RNAIterator:
-    generator = read_from_fasta(str(ff), constructor=skbio.RNA)
+    generator = _iter_fasta(str(ff), constructor=skbio.RNA)
     return RNAIterator(generator)
 
 
 @plugin.register_transformer
 def _51(data: RNAIterator) -> RNAFASTAFormat:
     ff = RNAFASTAFormat()
-    skbio.io.write(iter(data), format='fasta', into=str(ff))
+    _iterator_to_fasta_format(ff, data)
     return ff
 
 
@@ -520,6 +541,11 @@ def _52(ff: AlignedRNAFASTAFormat) -> skbio.TabularMSA:
                                  format='fasta')
 
 
+@plugin.register_transformer
+def _234(ff: AlignedRNAFASTAFormat) -> AlignedSequenceMatrix:
+    return AlignedSequenceMatrix.read(ff, skbio.RNA)
+
+
 @plugin.register_transformer
 def _53(data: skbio.TabularMSA) -> AlignedRNAFASTAFormat:
     ff = AlignedRNAFASTAFormat()
@@ -546,14 +572,14 @@ def _56(data: pd.Series) -> RNAFASTAFormat:
 
 @plugin.register_transformer
 def _57(ff: AlignedRNAFASTAFormat) -> AlignedRNAIterator:
-    generator = read_from_fasta(str(ff), constructor=skbio.RNA)
+    generator = _iter_fasta(str(ff), constructor=skbio.RNA)
     return AlignedRNAIterator(generator)
 
 
 @plugin.register_transformer
 def _58(data: AlignedRNAIterator) -> AlignedRNAFASTAFormat:
     ff = AlignedRNAFASTAFormat()
-    skbio.io.write(iter(data), format='fasta', into=str(ff))
+    _iterator_to_fasta_format(ff, data)
     return ff
 
 
@@ -576,7 +602,7 @@ def _61(data: pd.Series) -> AlignedRNAFASTAFormat:
 
 @plugin.register_transformer
 def _62(fmt: AlignedRNAFASTAFormat) -> RNAIterator:
-    generator = read_from_fasta(str(fmt), constructor=skbio.RNA)
+    generator = _iter_fasta(str(fmt), constructor=skbio.RNA)
     return RNAIterator(generator)
 
 
@@ -605,13 +631,7 @@ def _64(data: PairedRNAIterator) -> PairedRNASequencesDirectoryFormat:
     ff_left = RNAFASTAFormat()
     ff_right = RNAFASTAFormat()
 
-    with ff_left.open() as lfile, ff_right.open() as rfile:
-        for lseq, rseq in data:
-            if rseq.metadata['id'] != lseq.metadata['id']:
-                raise ValueError(lseq.metadata['id'] + ' and ' +
-                                 rseq.metadata['id'] + ' differ')
-            skbio.io.write(lseq, format='fasta', into=lfile)
-            skbio.io.write(rseq, format='fasta', into=rfile)
+    _paired_iterator_to_fasta_formats(ff_left, ff_right, data)
 
     df.left_rna_sequences.write_data(ff_left, RNAFASTAFormat)
     df.right_rna_sequences.write_data(ff_right, RNAFASTAFormat)
@@ -628,8 +648,8 @@ def _64(data: PairedRNAIterator) -> PairedRNASequencesDirectoryFormat:
 
 @plugin.register_transformer
 def _69(fmt: MixedCaseDNAFASTAFormat) -> DNAIterator:
-    generator = read_from_fasta(str(fmt), constructor=skbio.DNA,
-                                lowercase=True)
+    generator = _iter_fasta(str(fmt), constructor=skbio.DNA,
+                            lowercase=True)
     return DNAIterator(generator)
 
 
@@ -647,18 +667,16 @@ def _71(ff: MixedCaseDNAFASTAFormat) -> qiime2.Metadata:
 
 @plugin.register_transformer
 def _72(ff: MixedCaseDNAFASTAFormat) -> DNAFASTAFormat:
-    generator = read_from_fasta(str(ff), constructor=skbio.DNA,
-                                lowercase=True)
-    data = DNAIterator(generator)
     dff = DNAFASTAFormat()
-    skbio.io.write(iter(data), format='fasta', into=str(dff))
+    with dff.open() as fh:
+        _write_uppercase_fasta(str(ff), fh, constructor=skbio.DNA)
     return dff
 
 
 @plugin.register_transformer
 def _73(fmt: MixedCaseRNAFASTAFormat) -> RNAIterator:
-    generator = read_from_fasta(str(fmt), constructor=skbio.RNA,
-                                lowercase=True)
+    generator = _iter_fasta(str(fmt), constructor=skbio.RNA,
+                            lowercase=True)
     return RNAIterator(generator)
 
 
@@ -676,18 +694,16 @@ def _75(ff: MixedCaseRNAFASTAFormat) -> qiime2.Metadata:
 
 @plugin.register_transformer
 def _76(ff: MixedCaseRNAFASTAFormat) -> RNAFASTAFormat:
-    generator = read_from_fasta(str(ff), constructor=skbio.RNA,
-                                lowercase=True)
-    data = RNAIterator(generator)
     dff = RNAFASTAFormat()
-    skbio.io.write(iter(data), format='fasta', into=str(dff))
+    with dff.open() as fh:
+        _write_uppercase_fasta(str(ff), fh, constructor=skbio.RNA)
     return dff
 
 
 @plugin.register_transformer
 def _77(fmt: MixedCaseAlignedDNAFASTAFormat) -> AlignedDNAIterator:
-    generator = read_from_fasta(str(fmt), constructor=skbio.DNA,
-                                lowercase=True)
+    generator = _iter_fasta(str(fmt), constructor=skbio.DNA,
+                            lowercase=True)
     return AlignedDNAIterator(generator)
 
 
@@ -705,18 +721,16 @@ def _79(ff: MixedCaseAlignedDNAFASTAFormat) -> qiime2.Metadata:
 
 @plugin.register_transformer
 def _80(ff: MixedCaseAlignedDNAFASTAFormat) -> AlignedDNAFASTAFormat:
-    generator = read_from_fasta(str(ff), constructor=skbio.DNA,
-                                lowercase=True)
-    data = AlignedDNAIterator(generator)
     dff = AlignedDNAFASTAFormat()
-    skbio.io.write(iter(data), format='fasta', into=str(dff))
+    with dff.open() as fh:
+        _write_uppercase_fasta(str(ff), fh, constructor=skbio.DNA)
     return dff
 
 
 @plugin.register_transformer
 def _81(fmt: MixedCaseAlignedRNAFASTAFormat) -> AlignedRNAIterator:
-    generator = read_from_fasta(str(fmt), constructor=skbio.RNA,
-                                lowercase=True)
+    generator = _iter_fasta(str(fmt), constructor=skbio.RNA,
+                            lowercase=True)
     return AlignedRNAIterator(generator)
 
 
@@ -734,11 +748,9 @@ def _83(ff: MixedCaseAlignedRNAFASTAFormat) -> qiime2.Metadata:
 
 @plugin.register_transformer
 def _84(ff: MixedCaseAlignedRNAFASTAFormat) -> AlignedRNAFASTAFormat:
-    generator = read_from_fasta(str(ff), constructor=skbio.RNA,
-                                lowercase=True)
-    data = AlignedRNAIterator(generator)
     dff = AlignedRNAFASTAFormat()
-    skbio.io.write(iter(data), format='fasta', into=str(dff))
+    with dff.open() as fh:
+        _write_uppercase_fasta(str(ff), fh, constructor=skbio.RNA)
     return dff
 
 
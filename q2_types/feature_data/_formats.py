@@ -5,8 +5,12 @@
 #
 # The full license is in the file LICENSE, distributed with this software.
 # ----------------------------------------------------------------------------
+import concurrent.futures
+import itertools
+import os
 import re
 
+import numpy as np
 import pandas as pd
 import skbio
 
@@ -14,6 +18,8 @@ import qiime2.plugin.model as model
 from qiime2.plugin import ValidationError
 import qiime2
 
+from q2_types._util import _cached_validation, _get_n_jobs
+
 
 class TaxonomyFormat(model.TextFileFormat):
     """Legacy format for any 2+ column TSV file, with or without a header.
@@ -134,6 +140,7 @@ class TSVTaxonomyFormat(model.TextFileFormat):
                 raise ValidationError('No taxonomy records found, only blank '
                                       'lines and/or a header row.')
 
+    @_cached_validation
     def _validate_(self, level):
         self._check_n_records(n={'min': 10, 'max': None}[level])
 
@@ -142,13 +149,524 @@ TSVTaxonomyDirectoryFormat = model.SingleFileDirectoryFormat(
     'TSVTaxonomyDirectoryFormat', 'taxonomy.tsv', TSVTaxonomyFormat)
 
 
-def _construct_validator_from_alphabet(alphabet_str):
-    if alphabet_str:
-        Validator = re.compile(fr'[{alphabet_str}]+\r?\n?')
-        ValidationSet = frozenset(alphabet_str)
-    else:
-        Validator, ValidationSet = None, None
-    return Validator, ValidationSet
+_BOM = b'\xef\xbb\xbf'
+_DESCRIPTION = re.compile(rb'\n>[^\n]*')
+
+_HASH_K = np.uint64(0x9E3779B97F4A7C15)
+_HASH_K1 = np.uint64(0xBF58476D1CE4E5B9)
+_HASH_K2 = np.uint64(0x94D049BB133111EB)
+
+
+def _hash_ids(ids):
+    """Hash each ID in `ids` to a non-zero 64-bit integer.
+
+    Unlike `hash`, the result does not depend on the process, so hashes
+    computed in different worker processes can be compared.
+
+    """
+    if not ids:
+        return np.empty(0, dtype=np.uint64)
+    try:
+        ids = np.array(ids, dtype='S')
+    except UnicodeEncodeError:
+        ids = np.array([id_.encode('utf-8') for id_ in ids], dtype='S')
+
+    # View each ID as little-endian 64-bit words, zero-padded at the end.
+    # Zero words add nothing to the hash, so the padding doesn't matter.
+    width = -(-ids.dtype.itemsize // 8) * 8
+    words = ids.astype(f'S{width}').view('<u8').reshape(len(ids), -1)
+
+    hashes = np.zeros(len(ids), dtype=np.uint64)
+    weight = _HASH_K
+    with np.errstate(over='ignore'):
+        for column in words.T:
+            mixed = column * _HASH_K1
+            mixed ^= mixed >> np.uint64(32)
+            mixed *= weight
+            hashes += mixed
+            weight = weight * _HASH_K
+        hashes ^= hashes >> np.uint64(29)
+        hashes *= _HASH_K2
+        hashes ^= hashes >> np.uint64(32)
+    hashes[hashes == 0] = 1
+    return hashes
+
+
+class _IDSet:
+    """Compact set of sequence IDs for duplicate detection.
+
+    Only the 64-bit hash of each ID (see `_hash_ids`) is kept, in a NumPy
+    open-addressing table with linear probing, which takes a small fraction
+    of the memory of a `set` of strings. Membership is therefore only
+    probable: callers must confirm a match against the IDs themselves.
+
+    """
+    MAX_LOAD = 0.7
+
+    def __init__(self):
+        self.slots = np.zeros(1 << 16, dtype=np.uint64)
+        self.size = 0
+
+    def contains(self, hashes):
+        # Returns a boolean array flagging the hashes already in the set.
+        mask = np.uint64(len(self.slots) - 1)
+        found = np.zeros(len(hashes), dtype=bool)
+        pending = np.arange(len(hashes))
+        index = hashes & mask
+        while pending.size:
+            slot = self.slots[index]
+            wanted = hashes[pending]
+            found[pending[slot == wanted]] = True
+            keep = (slot != wanted) & (slot != 0)
+            pending = pending[keep]
+            index = (index[keep] + np.uint64(1)) & mask
+        return found
+
+    def add(self, hashes):
+        # `hashes` are expected to be distinct; repeated ones are stored
+        # once but may make the table grow a little early.
+        if self.size + len(hashes) > self.MAX_LOAD * len(self.slots):
+            capacity = len(self.slots)
+            while self.size + len(hashes) > self.MAX_LOAD * capacity / 2:
+                capacity *= 2
+            old = self.hashes()
+            self.slots = np.zeros(capacity, dtype=np.uint64)
+            self.size = 0
+            self._insert(old)
+        self._insert(hashes)
+
+    def hashes(self):
+        return self.slots[self.slots != 0]
+
+    def _insert(self, pending):
+        mask = np.uint64(len(self.slots) - 1)
+        index = pending & mask
+        while pending.size:
+            slot = self.slots[index]
+            empty = slot == 0
+            # When several hashes go for the same empty slot, only one of the
+            # writes sticks; the others move on at the next iteration.
+            self.slots[index[empty]] = pending[empty]
+            stored = np.zeros_like(empty)
+            stored[empty] = self.slots[index[empty]] == pending[empty]
+            self.size += int(np.count_nonzero(stored))
+
+            keep = ~stored & (slot != pending)
+            advance = ~empty[keep]
+            pending, index = pending[keep], index[keep]
+            index[advance] = (index[advance] + np.uint64(1)) & mask
+
+
+def _iter_descriptions(data):
+    # Yields the offset and ID of each line in `data` that `_FASTAValidator`
+    # would treat as a description, skipping those it would reject.
+    pos = data.find(b'>')
+    while pos != -1:
+        start = data.rfind(b'\n', 0, pos) + 1
+        end = data.find(b'\n', pos)
+        if end == -1:
+            end = len(data)
+        line = data[start:end].strip()
+        if line.startswith(_BOM):
+            line = line[len(_BOM):]
+        if line.startswith(b'>'):
+            try:
+                yield start, line.decode('utf-8').split()[0]
+            except UnicodeDecodeError:
+                pass
+        pos = data.find(b'>', end)
+
+
+class _FASTAValidator:
+    """Byte-level validation engine behind `FASTAFormat`.
+
+    The file is read in large blocks. For each block, the description lines
+    are located with a single scan, the sequence lines in between are checked
+    in bulk with `bytes.translate`, and only the IDs are handled one at a
+    time. A block is only accepted this way when it is entirely valid;
+    otherwise it is replayed run by run (and, where needed, line by line) so
+    that the first error is reported exactly as a line-by-line validator
+    would report it.
+
+    """
+    BLOCK_SIZE = 8 * 1024 * 1024
+    # Files are only validated in parallel when each worker gets at least
+    # this much data.
+    MIN_CHUNK_SIZE = 32 * 1024 * 1024
+
+    def __init__(self, fmt, level):
+        self.fmt = fmt
+        self.max_lines = {'min': 100, 'max': float('inf')}[level]
+
+        if fmt.alphabet:
+            self.alphabet = fmt.alphabet.encode('ascii')
+            self.validation_set = frozenset(fmt.alphabet)
+
+            # Sequence lines can only be checked in bulk when stripping each
+            # line would be a no-op and none of them is blank.
+            self.run_alphabet = self.alphabet + b'\r\n'
+            edge_ws = [bytes([c]) for c in b' \t\x0b\x0c'
+                       if c in self.alphabet]
+            self.run_bad_starts = (b'\n', b'\r', *edge_ws)
+            self.run_bad_ends = tuple(edge_ws)
+            self.run_bad_substrings = (
+                b'\n\n',
+                *(b'\n' + w for w in edge_ws),
+                *(w + b'\n' for w in edge_ws),
+                *(w + b'\r' for w in edge_ws))
+        else:
+            self.alphabet = self.validation_set = None
+
+        self.line_number = 0
+        self.last_line_was_ID = False
+
+        # IDs of the blocks validated so far are only kept hashed. Those of
+        # the block being replayed are kept as is, along with the IDs whose
+        # hash was already seen, which may be duplicates.
+        self.ids = _IDSet()
+        self.block_ids = {}
+        self.candidate_ids = frozenset()
+        self.start = self.block_start = 0
+
+        self.seq_len = 0
+        self.prev_seq_len = 0
+        self.prev_seq_start_line = 0
+
+    def validate(self, fh):
+        if self.max_lines == float('inf'):
+            self.validate_blocks(fh)
+        else:
+            for line_number, line in enumerate(fh, 1):
+                if line_number >= self.max_lines:
+                    return
+                self._validate_line(line, line_number)
+
+        if self.fmt.aligned:
+            self.fmt._validate_line_lengths(
+                self.seq_len, self.prev_seq_len, self.prev_seq_start_line)
+
+    def validate_blocks(self, fh, size=None):
+        # Validates (up to `size` bytes of) `fh` from its current position,
+        # leaving the final alignment check to the caller.
+        self.start = self.block_start = fh.tell()
+        for block in self._read_blocks(fh, size):
+            if not self._validate_clean_block(block):
+                self._validate_block(block)
+            self.block_start += len(block)
+
+    def _read_blocks(self, fh, size=None):
+        # Blocks always end on a line boundary, except for the final one when
+        # the file (or the requested range) lacks a trailing newline.
+        remaining = float('inf') if size is None else size
+        pending = []
+        while remaining > 0:
+            chunk = fh.read(min(self.BLOCK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+
+            end = chunk.rfind(b'\n') + 1
+            if not end:
+                pending.append(chunk)
+                continue
+            pending.append(chunk[:end])
+            yield b''.join(pending)
+            pending = [chunk[end:]]
+
+        tail = b''.join(pending)
+        if tail:
+            yield tail
+
+    def _validate_clean_block(self, data):
+        # Returns False, without touching any state, if anything in `data`
+        # would need to be reported.
+        spans = [m.span() for m in _DESCRIPTION.finditer(data)]
+        if data.startswith(b'>'):
+            end = data.find(b'\n')
+            spans.insert(0, (-1, end if end != -1 else len(data)))
+
+        # segments[i] holds the sequence lines preceding the i-th description
+        # and segments[-1] those following the last one.
+        segments, pos = [], 0
+        for start, end in spans:
+            segments.append(data[pos:start + 1])
+            pos = end + 1
+        segments.append(data[pos:])
+
+        if not all(segments[1:-1]):
+            return False
+        if spans and self.last_line_was_ID and not segments[0]:
+            return False
+        joined = b''.join(segments)
+        if not self._is_clean_run(joined):
+            return False
+
+        try:
+            ids = [data[start + 1:end].decode('ascii').split(None, 1)[0]
+                   for start, end in spans]
+        except UnicodeDecodeError:
+            return False
+        if '>' in ids:
+            return False
+
+        newlines = [s.count(b'\n') for s in segments]
+        line_number = self.line_number
+        id_lines = []
+        for n in newlines[:-1]:
+            line_number += n + 1
+            id_lines.append(line_number)
+
+        hashes = _hash_ids(ids)
+        if len(set(ids)) != len(ids) or self.ids.contains(hashes).any():
+            return False
+
+        aligned = self.alphabet is not None and self.fmt.aligned
+        if aligned:
+            lengths = [len(s) - n for s, n in zip(segments, newlines)]
+            if b'\r' in joined:
+                lengths = [n - s.count(b'\r')
+                           for s, n in zip(segments, lengths)]
+            seq_len = self.seq_len
+            prev_seq_len = self.prev_seq_len + lengths[0]
+            prev_seq_start_line = self.prev_seq_start_line
+            if segments[0] and prev_seq_start_line == 0:
+                prev_seq_start_line = self.line_number + 1
+            for line_number, length in zip(id_lines, lengths[1:]):
+                if seq_len == 0:
+                    seq_len = prev_seq_len
+                try:
+                    self.fmt._validate_line_lengths(
+                        seq_len, prev_seq_len, prev_seq_start_line)
+                except ValidationError:
+                    return False
+                prev_seq_len, prev_seq_start_line = length, line_number + 1
+            self.seq_len, self.prev_seq_len = seq_len, prev_seq_len
+
+        last = segments[-1]
+        self.ids.add(hashes)
+        if spans:
+            self.last_line_was_ID = not last
+            self.prev_seq_start_line = id_lines[-1] + 1 if last else 0
+            self.line_number = id_lines[-1]
+        else:
+            self.last_line_was_ID = False
+            if self.prev_seq_start_line == 0:
+                self.prev_seq_start_line = self.line_number + 1
+        self.line_number += newlines[-1]
+        if last and not last.endswith(b'\n'):
+            self.line_number += 1
+        return True
+
+    def _is_clean_run(self, run):
+        if self.alphabet is None:
+            # Anything ASCII is acceptable, as long as there is no indented
+            # description hiding in the run.
+            return run.isascii() and b'>' not in run
+
+        if (run.translate(None, self.run_alphabet)
+                or run.startswith(self.run_bad_starts)
+                or run.endswith(self.run_bad_ends)
+                or any(s in run for s in self.run_bad_substrings)):
+            return False
+        if b'\r' in run and (b'\n\r' in run
+                             or run.count(b'\r') != run.count(b'\r\n')):
+            return False
+        return self.fmt._is_valid_sequence_run(run)
+
+    def _validate_block(self, data):
+        ids = [id_ for _, id_ in _iter_descriptions(data)]
+        seen = self.ids.contains(_hash_ids(ids))
+        self.candidate_ids = {id_ for id_, s in zip(ids, seen) if s}
+
+        self._validate_runs(data)
+
+        self.ids.add(_hash_ids(list(self.block_ids)))
+        self.block_ids = {}
+        self.candidate_ids = frozenset()
+
+    def _find_first_line(self, id_):
+        # Confirms that `id_` was seen before the current block, returning
+        # the line it was first seen on. This takes a second pass over the
+        # file, but only happens for duplicates and hash collisions.
+        line_number = 0
+        with open(str(self.fmt.path), 'rb') as fh:
+            fh.seek(self.start)
+            for block in self._read_blocks(fh,
+                                           self.block_start - self.start):
+                pos = 0
+                for offset, other in _iter_descriptions(block):
+                    line_number += block.count(b'\n', pos, offset)
+                    pos = offset
+                    if other == id_:
+                        return line_number + 1
+                line_number += block.count(b'\n', pos)
+        return None
+
+    def _validate_runs(self, data):
+        pos, size = 0, len(data)
+        while pos < size:
+            if data[pos] == ord(b'>'):
+                end = data.find(b'\n', pos) + 1 or size
+                self.line_number += 1
+                self._validate_line(data[pos:end], self.line_number)
+            else:
+                end = data.find(b'\n>', pos) + 1 or size
+                self._validate_run(data[pos:end])
+            pos = end
+
+    def _validate_run(self, run):
+        # `run` holds one or more complete lines, none of which starts with
+        # '>'.
+        if not self._is_clean_run(run):
+            lines = run.split(b'\n')
+            if run.endswith(b'\n'):
+                lines.pop()
+            for line in lines:
+                self.line_number += 1
+                self._validate_line(line, self.line_number)
+            return
+
+        n_newlines = run.count(b'\n')
+        if self.alphabet is not None:
+            if self.prev_seq_start_line == 0:
+                self.prev_seq_start_line = self.line_number + 1
+            self.prev_seq_len += len(run) - n_newlines - run.count(b'\r')
+
+        self.last_line_was_ID = False
+        self.line_number += n_newlines + (not run.endswith(b'\n'))
+
+    def _validate_line(self, line, line_number):
+        line = line.strip()
+        if line.startswith(_BOM):
+            line = line[len(_BOM):]
+
+        if line.startswith(b'>'):
+            self._validate_description(line, line_number)
+
+        elif self.alphabet is not None:
+            # Blank lines within a sequence are ignored.
+            if not line:
+                return
+
+            if line.translate(None, self.alphabet):
+                self._raise_invalid_character(line, line_number)
+            self.fmt._validate_sequence_line(line, line_number)
+
+            if self.prev_seq_start_line == 0:
+                self.prev_seq_start_line = line_number
+
+            self.prev_seq_len += len(line)
+            self.last_line_was_ID = False
+
+        else:
+            if not line.isascii():
+                self._decode(line, line_number)
+            self.last_line_was_ID = False
+
+    def _validate_description(self, line, line_number):
+        line = self._decode(line, line_number)
+
+        if self.alphabet is not None:
+            if self.seq_len == 0:
+                self.seq_len = self.prev_seq_len
+
+            if self.fmt.aligned:
+                self.fmt._validate_line_lengths(
+                    self.seq_len, self.prev_seq_len, self.prev_seq_start_line)
+
+            self.prev_seq_len = 0
+            self.prev_seq_start_line = 0
+
+        if self.last_line_was_ID:
+            raise ValidationError('Multiple consecutive descriptions '
+                                  f'starting on line {line_number-1!r}')
+
+        line = line.split()
+
+        if line[0] == '>':
+            if len(line) == 1:
+                raise ValidationError(
+                    f'Description on line {line_number} is missing an ID.')
+            else:
+                raise ValidationError(
+                    f'ID on line {line_number} starts with a space. IDs may '
+                    'not start with spaces')
+
+        id_ = line[0]
+        first_line = None
+        if id_ in self.candidate_ids:
+            first_line = self._find_first_line(id_)
+        if first_line is None:
+            first_line = self.block_ids.get(id_)
+        if first_line is not None:
+            raise ValidationError(
+                f'ID on line {line_number} is a duplicate of another ID on '
+                f'line {first_line}.')
+
+        self.block_ids[id_] = line_number
+        self.last_line_was_ID = True
+
+    def _raise_invalid_character(self, line, line_number):
+        line = self._decode(line, line_number)
+        for position, character in enumerate(line):
+            if character not in self.validation_set:
+                raise ValidationError(
+                    f"Invalid character '{character}' at position "
+                    f"{position} on line {line_number} (does not match "
+                    "IUPAC characters for this sequence type). Allowed "
+                    f"characters are {self.fmt.alphabet}.")
+
+    def _decode(self, line, line_number):
+        try:
+            return line.decode('utf-8')
+        except UnicodeDecodeError as e:
+            raise ValidationError(f'utf-8 cannot decode byte on line '
+                                  f'{line_number}') from e
+
+
+def _find_record_boundaries(path, n_chunks):
+    """Split `path` into roughly `n_chunks` byte ranges.
+
+    Every range but the first starts at the beginning of a description line,
+    so no record is ever split across two ranges. Returns the sorted offsets
+    delimiting the ranges, starting with 0 and ending with the file size.
+
+    """
+    size = os.path.getsize(path)
+    bounds = [0]
+    with open(path, 'rb') as fh:
+        for i in range(1, n_chunks):
+            # Start one byte early so that a description starting exactly at
+            # the offset is found too.
+            pos = max(size * i // n_chunks, bounds[-1] + 1) - 1
+            fh.seek(pos)
+            buf = b''
+            while True:
+                data = fh.read(1024 * 1024)
+                if not data:
+                    return bounds + [size]
+                buf = buf[-1:] + data
+                found = buf.find(b'\n>')
+                if found != -1:
+                    break
+                pos += len(buf) - 1
+            bounds.append(pos + found + 1)
+    return bounds + [size]
+
+
+def _validate_FASTA_chunk(fmt_type, path, start, end):
+    # Runs in a worker process. Returns what is needed to check that the
+    # chunks fit together, or None if the chunk is invalid by itself.
+    fmt = fmt_type(path, mode='r')
+    validator = _FASTAValidator(fmt, 'max')
+    with open(path, 'rb') as fh:
+        fh.seek(start)
+        try:
+            validator.validate_blocks(fh, end - start)
+        except ValidationError:
+            return None
+    return (validator.ids.hashes(), validator.last_line_was_ID,
+            validator.seq_len, validator.prev_seq_len)
 
 
 class FASTAFormat(model.TextFileFormat):
@@ -157,10 +675,9 @@ class FASTAFormat(model.TextFileFormat):
         self.aligned = False
         self.alphabet = None
 
+    @_cached_validation
     def _validate_(self, level):
-        FASTAValidator, ValidationSet = _construct_validator_from_alphabet(
-            self.alphabet)
-        self._validate_FASTA(level, FASTAValidator, ValidationSet)
+        self._validate_FASTA(level)
 
     def _validate_line_lengths(
             self, seq_len, prev_seq_len, prev_seq_start_line):
@@ -171,105 +688,92 @@ class FASTAFormat(model.TextFileFormat):
                                   f'were length {seq_len}. All sequences must '
                                   'be the same length for AlignedFASTAFormat.')
 
-    def _validate_FASTA(self, level, FASTAValidator=None, ValidationSet=None):
-        last_line_was_ID = False
-        ids = {}
+    def _validate_sequence_line(self, line, line_number):
+        # Subclasses can check each sequence line (stripped, and made of
+        # alphabet characters) further, raising a ValidationError.
+        pass
 
-        seq_len = 0
-        prev_seq_len = 0
-        prev_seq_start_line = 0
+    def _is_valid_sequence_run(self, run):
+        # The bulk counterpart of `_validate_sequence_line`, on a run of
+        # whole sequence lines: returning False has them validated line by
+        # line instead.
+        return True
 
-        level_map = {'min': 100, 'max': float('inf')}
-        max_lines = level_map[level]
+    def _validate_FASTA(self, level, n_jobs=None):
+        """Validate the file, using `n_jobs` processes at level 'max'.
 
-        with self.path.open('rb') as fh:
-            try:
-                first = fh.read(6)
-                if first[:3] == b'\xEF\xBB\xBF':
-                    first = first[3:]
+        `n_jobs` defaults to the `Q2_TYPES_N_JOBS` environment variable (see
+        `q2_types._util._get_n_jobs`). Parallel validation only kicks in for
+        files large enough to be worth splitting; if it turns up a problem,
+        the file is validated again serially so that the error reported is
+        the first one in the file, with its global line number.
 
-                # Empty files should validate
-                if first.strip() == b'':
-                    return
-
-                if first[0] != ord(b'>'):
-                    raise ValidationError("First line of file is not a valid "
-                                          "description. Descriptions must "
-                                          "start with '>'")
-                fh.seek(0)
-
-                for line_number, line in enumerate(fh, 1):
-                    line = line.strip()
-                    if line_number >= max_lines:
-                        return
-                    line = line.decode('utf-8-sig')
-
-                    if line.startswith('>'):
-                        if FASTAValidator and ValidationSet:
-                            if seq_len == 0:
-                                seq_len = prev_seq_len
-
-                            if self.aligned:
-                                self._validate_line_lengths(
-                                    seq_len, prev_seq_len, prev_seq_start_line)
-
-                            prev_seq_len = 0
-                            prev_seq_start_line = 0
-
-                        if last_line_was_ID:
-                            raise ValidationError('Multiple consecutive '
-                                                  'descriptions starting on '
-                                                  f'line {line_number-1!r}')
-
-                        line = line.split()
-
-                        if line[0] == '>':
-                            if len(line) == 1:
-                                raise ValidationError(
-                                    f'Description on line {line_number} is '
-                                    'missing an ID.')
-                            else:
-                                raise ValidationError(
-                                    f'ID on line {line_number} starts with a '
-                                    'space. IDs may not start with spaces')
-
-                        if line[0] in ids:
-                            raise ValidationError(
-                                f'ID on line {line_number} is a duplicate of '
-                                f'another ID on line {ids[line[0]]}.')
-
-                        ids[line[0]] = line_number
-                        last_line_was_ID = True
-
-                    elif FASTAValidator and ValidationSet:
-                        if re.fullmatch(FASTAValidator, line):
-                            if prev_seq_start_line == 0:
-                                prev_seq_start_line = line_number
-
-                            prev_seq_len += len(line)
-                            last_line_was_ID = False
-
-                        else:
-                            for position, character in enumerate(line):
-                                if character not in ValidationSet:
-                                    raise ValidationError(
-                                        f"Invalid character '{character}' at "
-                                        f"position {position} on line "
-                                        f"{line_number} (does not match IUPAC "
-                                        "characters for this sequence type). "
-                                        "Allowed characters are "
-                                        f"{self.alphabet}.")
-
-                    else:
-                        last_line_was_ID = False
-
-            except UnicodeDecodeError as e:
-                raise ValidationError(f'utf-8 cannot decode byte on line '
-                                      f'{line_number}') from e
+        """
+        with self.path.open('rb') as fh:
+            first = fh.read(6)
+            if first[:3] == _BOM:
+                first = first[3:]
+
+            # Empty files should validate
+            if first.strip() == b'':
+                return
+
+            if first[0] != ord(b'>'):
+                raise ValidationError("First line of file is not a valid "
+                                      "description. Descriptions must "
+                                      "start with '>'")
+            fh.seek(0)
+
+            if level == 'max' and self._validate_FASTA_in_parallel(n_jobs):
+                return
+
+            _FASTAValidator(self, level).validate(fh)
+
+    def _validate_FASTA_in_parallel(self, n_jobs):
+        # Returns True only when the chunks are valid and known to fit
+        # together; anything else is left to a serial pass.
+        n_jobs = _get_n_jobs(n_jobs)
+        n_chunks = min(n_jobs * 4,
+                       self.path.stat().st_size
+                       // _FASTAValidator.MIN_CHUNK_SIZE)
+        if n_jobs < 2 or n_chunks < 2:
+            return False
+
+        path = str(self.path)
+        bounds = _find_record_boundaries(path, n_chunks)
+        if len(bounds) < 3:
+            return False
+
+        with concurrent.futures.ProcessPoolExecutor(n_jobs) as pool:
+            summaries = list(pool.map(
+                _validate_FASTA_chunk, itertools.repeat(type(self)),
+                itertools.repeat(path), bounds[:-1], bounds[1:]))
+
+        if None in summaries:
+            return False
+
+        # Hash matches between chunks are left for the serial pass to
+        # confirm.
+        seen_ids = _IDSet()
+        for hashes, _, _, _ in summaries:
+            if seen_ids.contains(hashes).any():
+                return False
+            seen_ids.add(hashes)
+        # A chunk ending on a description means two consecutive ones.
+        if any(summary[1] for summary in summaries[:-1]):
+            return False
 
         if self.aligned:
-            self._validate_line_lengths(
-                seq_len, prev_seq_len, prev_seq_start_line)
+            # Within a chunk, each record was compared with the chunk's first
+            # one, and the last record of each chunk is left unchecked.
+            length = summaries[0][3]
+            if length == 0:
+                return False
+            for _, _, seq_len, prev_seq_len in summaries:
+                if prev_seq_len != length or seq_len not in (0, length):
+                    return False
+
+        return True
 
 
 class DNAFASTAFormat(FASTAFormat):
@@ -8,13 +8,40 @@
 
 import collections
 
+import pandas as pd
+import skbio
+
+from q2_types._util import (
+    SequenceRecord, _fasta_index, _iter_fasta, _read_fasta_record,
+    _fasta_to_matrix
+)
+
+
+def _to_skbio(item):
+    if isinstance(item, SequenceRecord):
+        return item.to_skbio()
+    if isinstance(item, tuple):
+        return tuple(_to_skbio(i) for i in item)
+    return item
+
 
 class NucleicAcidIterator(collections.abc.Iterable):
-    def __init__(self, generator):
+    """Iterates over the sequences of a FASTA file.
+
+    Sequences read from a file are yielded as `SequenceRecord`s, which only
+    become skbio sequences when needed. Pass `skbio_objects=True` (or set the
+    attribute before iterating) to get skbio sequences instead.
+
+    """
+    def __init__(self, generator, skbio_objects=False):
         self.generator = generator
+        self.skbio_objects = skbio_objects
 
     def __iter__(self):
-        yield from self.generator
+        if self.skbio_objects:
+            yield from map(_to_skbio, self.generator)
+        else:
+            yield from self.generator
 
 
 class DNAIterator(NucleicAcidIterator):
@@ -42,12 +69,108 @@ class AlignedRNAIterator(NucleicAcidIterator):
 
 
 class ProteinIterator(collections.abc.Iterable):
-    def __init__(self, generator):
+    """Iterates over the sequences of a protein FASTA file.
+
+    See `NucleicAcidIterator` for what is yielded.
+
+    """
+    def __init__(self, generator, skbio_objects=False):
         self.generator = generator
+        self.skbio_objects = skbio_objects
 
     def __iter__(self):
-        yield from self.generator
+        if self.skbio_objects:
+            yield from map(_to_skbio, self.generator)
+        else:
+            yield from self.generator
 
 
 class AlignedProteinIterator(ProteinIterator):
     pass
+
+
+class IndexedDNASequences(collections.abc.Mapping):
+    """Random access, by ID, to the sequences of a DNA FASTA file.
+
+    Sequences are read from the file as they are requested, using an index of
+    the file that is built on first use and cached, so that later views of the
+    same file can skip building it. They are returned as `SequenceRecord`s.
+
+    """
+    constructor = skbio.DNA
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._rows = None
+
+    def _load(self):
+        if self._rows is not None:
+            return
+        index = _fasta_index(self.path)
+        if index is None:
+            # The file can only be split by skbio, so hold it in memory.
+            self._records = list(_iter_fasta(self.path, self.constructor))
+            ids = [record.id for record in self._records]
+        else:
+            ids, self._offsets, self._lengths = index
+            self._records = None
+        self._rows = dict(zip(ids, range(len(ids))))
+
+    def _read_rows(self, rows):
+        if self._records is not None:
+            for row in rows:
+                yield self._records[row]
+            return
+        with open(self.path, 'rb') as fh:
+            for row in rows:
+                yield _read_fasta_record(fh, self._offsets[row],
+                                         self._lengths[row], self.constructor)
+
+    def __getitem__(self, id_):
+        self._load()
+        return next(self._read_rows([self._rows[id_]]))
+
+    def __iter__(self):
+        self._load()
+        return iter(self._rows)
+
+    def __len__(self):
+        self._load()
+        return len(self._rows)
+
+    def subset(self, ids):
+        """Return the sequences with the given IDs as a `DNAIterator`.
+
+        The sequences are read in the order they appear in the file, which
+        need not be the order of `ids`. A KeyError is raised for unknown IDs
+        before anything is read.
+
+        """
+        self._load()
+        rows = sorted(self._rows[id_] for id_ in ids)
+        return DNAIterator(self._read_rows(rows))
+
+
+class AlignedSequenceMatrix:
+    """An alignment as a 2-D array, with one row of ASCII codes per sequence.
+
+    `ids` holds the sequence IDs in row order and `matrix` the `np.uint8`
+    array, so that column-wise operations (e.g., finding gap-only columns
+    with `(matrix == ord('-')).all(axis=0)`) can be vectorized. When read from
+    a file with the alignment cache enabled (see `_fasta_to_matrix`), `matrix`
+    is a read-only `np.memmap` of a cached copy, so copy it before modifying
+    it. `constructor` is the skbio sequence type of the rows.
+
+    """
+    def __init__(self, ids, matrix, constructor=skbio.DNA):
+        self.ids = pd.Index(ids, dtype=object)
+        self.matrix = matrix
+        self.constructor = constructor
+
+    @classmethod
+    def read(cls, path, constructor=skbio.DNA):
+        ids, matrix = _fasta_to_matrix(str(path), constructor)
+        return cls(ids, matrix, constructor)
+
+    def __len__(self):
+        return len(self.ids)
@@ -10,6 +10,9 @@ import os
 import os.path
 import shutil
 import unittest
+from unittest import mock
+
+import numpy as np
 
 from q2_types.feature_data import (
     TaxonomyFormat, TaxonomyDirectoryFormat, HeaderlessTSVTaxonomyFormat,
@@ -33,6 +36,7 @@ from q2_types.feature_data import (
     MixedCaseAlignedRNASequencesDirectoryFormat,
     SequenceCharacteristicsDirectoryFormat, SequenceCharacteristicsFormat
 )
+from q2_types.feature_data._formats import _FASTAValidator, _IDSet, _hash_ids
 from qiime2.plugin.testing import TestPluginBase
 from qiime2.plugin import ValidationError
 
@@ -701,6 +705,172 @@ class TestNucleicAcidFASTAFormats(TestPluginBase):
         with self.assertRaisesRegex(ValidationError, '1 starts with a space'):
             format.validate()
 
+    # Block-level validation tests
+    def _write_fasta(self, content):
+        filepath = os.path.join(self.temp_dir.name, 'seqs.fasta')
+        with open(filepath, 'wb') as fh:
+            fh.write(content)
+        return filepath
+
+    def test_dna_fasta_format_crlf_passes(self):
+        filepath = self._write_fasta(
+            b'>s1 desc\r\nACGT\r\nAC\r\n>s2\r\nNNNN\r\n')
+        format = DNAFASTAFormat(filepath, mode='r')
+
+        format.validate()
+
+    def test_dna_fasta_format_wrapped_passes_small_blocks(self):
+        records = [b'>s%d\nACGTACGT\nACGT\n' % i for i in range(50)]
+        filepath = self._write_fasta(b''.join(records))
+        format = DNAFASTAFormat(filepath, mode='r')
+
+        with mock.patch.object(_FASTAValidator, 'BLOCK_SIZE', 7):
+            format.validate()
+
+    def test_dna_fasta_format_invalid_character_late_in_file(self):
+        records = [b'>s%d\nACGTACGT\nACGT\n' % i for i in range(50)]
+        records.append(b'>bad\nACGT\nACGTXACGT\n')
+        filepath = self._write_fasta(b''.join(records))
+        format = DNAFASTAFormat(filepath, mode='r')
+
+        for block_size in (7, 64, _FASTAValidator.BLOCK_SIZE):
+            with mock.patch.object(_FASTAValidator, 'BLOCK_SIZE', block_size):
+                with self.assertRaisesRegex(
+                        ValidationError,
+                        "Invalid character 'X' at position 4 on line 153"):
+                    format.validate()
+
+    def test_dna_fasta_format_duplicate_ids_across_blocks(self):
+        records = [b'>s%d\nACGTACGT\n' % i for i in range(50)]
+        records.append(b'>s3\nACGT\n')
+        filepath = self._write_fasta(b''.join(records))
+        format = DNAFASTAFormat(filepath, mode='r')
+
+        with mock.patch.object(_FASTAValidator, 'BLOCK_SIZE', 16):
+            with self.assertRaisesRegex(
+                    ValidationError,
+                    'ID on line 101 is a duplicate of another ID on line 7'):
+                format.validate()
+
+    def test_dna_fasta_format_blank_line_after_description(self):
+        filepath = self._write_fasta(b'>s1\nACGT\n>s2\n\n>s3\nACGT\n')
+        format = DNAFASTAFormat(filepath, mode='r')
+
+        with self.assertRaisesRegex(
+                ValidationError, 'consecutive descriptions.*line 4'):
+            format.validate()
+
+    def test_aligned_dna_fasta_format_unaligned_across_blocks(self):
+        records = [b'>s%d\nACGT-\nAC\n' % i for i in range(50)]
+        records.append(b'>s50\nACGT-\nA\n')
+        filepath = self._write_fasta(b''.join(records))
+        format = AlignedDNAFASTAFormat(filepath, mode='r')
+
+        with mock.patch.object(_FASTAValidator, 'BLOCK_SIZE', 16):
+            with self.assertRaisesRegex(ValidationError,
+                                        'line 152.*length 6.*length 7'):
+                format.validate()
+
+    def test_dna_fasta_format_hash_collisions_are_not_duplicates(self):
+        records = [b'>s%d\nACGTACGT\n' % i for i in range(50)]
+        filepath = self._write_fasta(b''.join(records))
+        format = DNAFASTAFormat(filepath, mode='r')
+
+        def collide(ids):
+            return np.ones(len(ids), dtype=np.uint64)
+
+        with mock.patch('q2_types.feature_data._formats._hash_ids', collide):
+            with mock.patch.object(_FASTAValidator, 'BLOCK_SIZE', 16):
+                format.validate()
+
+    def test_dna_fasta_format_duplicate_ids_with_hash_collisions(self):
+        records = [b'>s%d\nACGTACGT\n' % i for i in range(50)]
+        records.append(b'>s3\nACGT\n')
+        filepath = self._write_fasta(b''.join(records))
+        format = DNAFASTAFormat(filepath, mode='r')
+
+        def collide(ids):
+            return np.ones(len(ids), dtype=np.uint64)
+
+        with mock.patch('q2_types.feature_data._formats._hash_ids', collide):
+            with mock.patch.object(_FASTAValidator, 'BLOCK_SIZE', 16):
+                with self.assertRaisesRegex(
+                        ValidationError,
+                        'ID on line 101 is a duplicate of another ID on '
+                        'line 7'):
+                    format.validate()
+
+    def test_id_set(self):
+        ids = ['>s%d' % i for i in range(100000)]
+        id_set = _IDSet()
+        id_set.add(_hash_ids(ids[:50000]))
+
+        found = id_set.contains(_hash_ids(ids))
+        self.assertTrue(found[:50000].all())
+        self.assertFalse(found[50000:].any())
+
+        id_set.add(_hash_ids(ids[50000:]))
+        self.assertEqual(id_set.size, 100000)
+        self.assertTrue(id_set.contains(_hash_ids(ids)).all())
+
+    def test_hash_ids_independent_of_batch(self):
+        alone = _hash_ids(['>s1', '>é'])
+        batched = _hash_ids(['>a-much-longer-identifier', '>s1', '>é'])
+
+        np.testing.assert_array_equal(alone, batched[1:])
+        self.assertNotEqual(alone[0], alone[1])
+
+    # Parallel validation tests
+    def test_dna_fasta_format_parallel_passes(self):
+        records = [b'>s%d\nACGTACGT\nACGT\n' % i for i in range(50)]
+        filepath = self._write_fasta(b''.join(records))
+        format = DNAFASTAFormat(filepath, mode='r')
+
+        with mock.patch.object(_FASTAValidator, 'MIN_CHUNK_SIZE', 64):
+            self.assertTrue(format._validate_FASTA_in_parallel(n_jobs=2))
+            format._validate_FASTA('max', n_jobs=2)
+
+    def test_dna_fasta_format_parallel_too_small(self):
+        filepath = self.get_data_path('dna-sequences.fasta')
+        format = DNAFASTAFormat(filepath, mode='r')
+
+        self.assertFalse(format._validate_FASTA_in_parallel(n_jobs=2))
+
+    def test_dna_fasta_format_parallel_invalid_character(self):
+        records = [b'>s%d\nACGTACGT\nACGT\n' % i for i in range(50)]
+        records.append(b'>bad\nACGT\nACGTXACGT\n')
+        filepath = self._write_fasta(b''.join(records))
+        format = DNAFASTAFormat(filepath, mode='r')
+
+        with mock.patch.object(_FASTAValidator, 'MIN_CHUNK_SIZE', 64):
+            with self.assertRaisesRegex(
+                    ValidationError,
+                    "Invalid character 'X' at position 4 on line 153"):
+                format._validate_FASTA('max', n_jobs=2)
+
+    def test_dna_fasta_format_parallel_duplicate_ids_across_chunks(self):
+        records = [b'>s%d\nACGTACGT\n' % i for i in range(50)]
+        records.append(b'>s3\nACGT\n')
+        filepath = self._write_fasta(b''.join(records))
+        format = DNAFASTAFormat(filepath, mode='r')
+
+        with mock.patch.object(_FASTAValidator, 'MIN_CHUNK_SIZE', 64):
+            with self.assertRaisesRegex(
+                    ValidationError,
+                    'ID on line 101 is a duplicate of another ID on line 7'):
+                format._validate_FASTA('max', n_jobs=2)
+
+    def test_aligned_dna_fasta_format_parallel_unaligned_across_chunks(self):
+        records = [b'>s%d\nACGT-\nAC\n' % i for i in range(50)]
+        records.append(b'>s50\nACGT-\nA\n')
+        filepath = self._write_fasta(b''.join(records))
+        format = AlignedDNAFASTAFormat(filepath, mode='r')
+
+        with mock.patch.object(_FASTAValidator, 'MIN_CHUNK_SIZE', 64):
+            with self.assertRaisesRegex(ValidationError,
+                                        'line 152.*length 6.*length 7'):
+                format._validate_FASTA('max', n_jobs=2)
+
 
 class TestDifferentialFormat(TestPluginBase):
     package = 'q2_types.feature_data.tests'
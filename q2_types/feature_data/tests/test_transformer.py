@@ -9,6 +9,7 @@
 import filecmp
 import os.path
 import unittest
+from unittest.mock import patch
 
 import pandas as pd
 import pandas.errors
@@ -30,7 +31,7 @@ from q2_types.feature_data import (
     RNAIterator, AlignedRNAIterator, BLAST6Format, MixedCaseDNAFASTAFormat,
     MixedCaseRNAFASTAFormat, MixedCaseAlignedDNAFASTAFormat,
     MixedCaseAlignedRNAFASTAFormat,
-    SequenceCharacteristicsFormat
+    SequenceCharacteristicsFormat, IndexedDNASequences, AlignedSequenceMatrix
 )
 from q2_types.feature_data._deferred_setup._transformers import (
     _taxonomy_formats_to_dataframe, _dataframe_to_tsv_taxonomy_format,
@@ -550,6 +551,35 @@ class TestDNAFASTAFormatTransformers(TestPluginBase):
         for observed, expected in zip(obs, exp):
             self.assertEqual(observed, expected)
 
+    def test_dna_fasta_format_to_dna_iterator_skbio_objects(self):
+        _, obs = self.transform_format(DNAFASTAFormat, DNAIterator,
+                                       filename='dna-sequences.fasta')
+
+        obs.skbio_objects = True
+        for observed in obs:
+            self.assertIsInstance(observed, skbio.DNA)
+
+    def test_dna_fasta_format_to_indexed_dna_sequences(self):
+        with patch.dict(os.environ,
+                        {'Q2_TYPES_CACHE_DIR': self.temp_dir.name}):
+            input, obs = self.transform_format(
+                DNAFASTAFormat, IndexedDNASequences,
+                filename='dna-sequences.fasta')
+            exp = list(skbio.read(str(input), format='fasta',
+                                  constructor=skbio.DNA))
+
+            self.assertIsInstance(obs, IndexedDNASequences)
+            self.assertEqual(list(obs), [seq.metadata['id'] for seq in exp])
+            self.assertEqual(obs[exp[3].metadata['id']], exp[3])
+
+            subset = obs.subset([exp[5].metadata['id'],
+                                 exp[1].metadata['id']])
+            self.assertIsInstance(subset, DNAIterator)
+            self.assertEqual(list(subset), [exp[1], exp[5]])
+
+            with self.assertRaises(KeyError):
+                obs.subset(['not-an-id'])
+
     def test_dna_iterator_to_dna_fasta_format(self):
         transformer = self.get_transformer(DNAIterator, DNAFASTAFormat)
         filepath = self.get_data_path('dna-sequences.fasta')
@@ -574,6 +604,21 @@ class TestDNAFASTAFormatTransformers(TestPluginBase):
         for observed, expected in zip(obs, exp):
             self.assertEqual(observed, expected)
 
+    def test_aln_dna_fasta_format_to_aligned_sequence_matrix(self):
+        filename = 'aligned-dna-sequences.fasta'
+        with patch.dict(os.environ,
+                        {'Q2_TYPES_CACHE_DIR': self.temp_dir.name}):
+            input, obs = self.transform_format(AlignedDNAFASTAFormat,
+                                               AlignedSequenceMatrix,
+                                               filename=filename)
+
+        exp = skbio.TabularMSA.read(str(input), constructor=skbio.DNA,
+                                    format='fasta')
+        self.assertIs(obs.constructor, skbio.DNA)
+        self.assertEqual(list(obs.ids), [seq.metadata['id'] for seq in exp])
+        self.assertEqual([row.tobytes().decode('ascii') for row in obs.matrix],
+                         [str(seq) for seq in exp])
+
     def test_aln_dna_iterator_to_aln_dna_fasta_format(self):
         transformer = self.get_transformer(AlignedDNAIterator,
                                            AlignedDNAFASTAFormat)
@@ -622,6 +667,22 @@ class TestDNAFASTAFormatTransformers(TestPluginBase):
             self.assertEqual(act, exp)
         self.assertIsInstance(obs, PairedDNASequencesDirectoryFormat)
 
+    def test_pair_dna_iterator_of_records_round_trip(self):
+        filenames = ('left-dna-sequences.fasta', 'right-dna-sequences.fasta')
+        _, records = self.transform_format(PairedDNASequencesDirectoryFormat,
+                                           PairedDNAIterator,
+                                           filenames=filenames)
+        transformer = self.get_transformer(PairedDNAIterator,
+                                           PairedDNASequencesDirectoryFormat)
+
+        obs = transformer(records)
+        obs_l = skbio.read('%s/left-dna-sequences.fasta' % str(obs),
+                           format='fasta', constructor=skbio.DNA)
+        exp_l = skbio.read(self.get_data_path(filenames[0]),
+                           format='fasta', constructor=skbio.DNA)
+
+        self.assertEqual(list(obs_l), list(exp_l))
+
     def test_aligned_dna_fasta_format_to_skbio_tabular_msa(self):
         filename = 'aligned-dna-sequences.fasta'
         input, obs = self.transform_format(AlignedDNAFASTAFormat,
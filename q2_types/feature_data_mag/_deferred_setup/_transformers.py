@@ -8,11 +8,13 @@
 import glob
 import os.path
 
-from itertools import repeat
+from itertools import groupby, repeat
 
 import pandas as pd
 import skbio
-from q2_types._util import fasta_to_series
+from q2_types._util import (
+    _fasta_to_str_series, _write_series_to_fasta, _FASTAWriter
+)
 
 from .. import MAGSequencesDirFmt, MAGIterator
 from ...plugin_setup import plugin
@@ -31,17 +33,15 @@ def _get_filename(full_path):
 def _series_to_fasta(series, ff, seq_type='DNA'):
     fp = os.path.join(str(ff), f'{series.name}.fasta')
     with open(fp, 'w') as fh:
-        for id_, seq in series.items():
-            if seq:
-                sequence = CONSTRUCTORS[seq_type](seq, metadata={'id': id_})
-                skbio.io.write(sequence, format='fasta', into=fh)
+        _write_series_to_fasta(fh, series, CONSTRUCTORS[seq_type],
+                               skip_empty=True)
 
 
 def _fastafiles_to_dataframe(ff):
     data = {}
     for fp in sorted(glob.glob(os.path.join(str(ff), '*.fa*'))):
         fname = _get_filename(fp)
-        data[fname] = fasta_to_series(fp, constructor=skbio.DNA)
+        data[fname] = _fasta_to_str_series(fp, constructor=skbio.DNA)
     df = pd.DataFrame.from_dict(data, orient='index')
     df.index.name = 'Feature ID'
     df = df.astype(str).replace({'nan': None})
@@ -75,8 +75,9 @@ def _4(ff: MAGSequencesDirFmt) -> MAGIterator:
 @plugin.register_transformer
 def _5(data: MAGIterator) -> MAGSequencesDirFmt:
     result = MAGSequencesDirFmt()
-    for fn, seq in data:
+    for fn, seqs in groupby(data, key=lambda item: item[0]):
         fp = os.path.join(str(result), f'{fn}.fasta')
-        with open(fp, 'a') as fin:
-            skbio.io.write(seq, format='fasta', into=fin)
+        with open(fp, 'a') as fin, _FASTAWriter(fin) as writer:
+            for _, seq in seqs:
+                writer.write_sequence(seq)
     return result
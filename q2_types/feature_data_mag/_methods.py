@@ -8,9 +8,10 @@
 import os
 
 import numpy as np
-from qiime2.util import duplicate
 
-from q2_types._util import _validate_num_partitions, _validate_mag_ids
+from q2_types._util import (
+    _duplicate, _validate_num_partitions, _validate_mag_ids
+)
 from q2_types.feature_data_mag import MAGSequencesDirFmt
 
 
@@ -40,7 +41,7 @@ def partition_feature_data_mags(
         result = MAGSequencesDirFmt()
 
         for mag_fp, mag_id in _mag:
-            duplicate(mag_fp, result.path / os.path.basename(mag_fp))
+            _duplicate(mag_fp, result.path / os.path.basename(mag_fp))
 
         # If num_partitions == num_mags we will only have gone through one
         # MAG in the above loop and will use its id as a key. Otherwise, we
@@ -58,6 +59,6 @@ def collate_feature_data_mags(mags: MAGSequencesDirFmt) -> MAGSequencesDirFmt:
     collated_mags = MAGSequencesDirFmt()
     for mag in mags:
         for fp in mag.path.iterdir():
-            duplicate(fp, collated_mags.path / fp.name)
+            _duplicate(fp, collated_mags.path / fp.name)
 
     return collated_mags
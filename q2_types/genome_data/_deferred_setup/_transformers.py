@@ -15,6 +15,7 @@ import qiime2
 import skbio
 from skbio.io import read
 
+from q2_types._util import _write_series_to_fasta
 from .. import (
     GenesDirectoryFormat, ProteinsDirectoryFormat, GFF3Format,
     OrthologFileFmt, OrthologAnnotationDirFmt, IntervalMetadataIterator
@@ -31,10 +32,8 @@ CONSTRUCTORS = {
 def _series_to_fasta(series, ff, seq_type='DNA'):
     fp = os.path.join(ff.path, f'{series.name}.fasta')
     with open(fp, 'w') as fh:
-        for id_, seq in series.items():
-            if seq:
-                sequence = CONSTRUCTORS[seq_type](seq, metadata={'id': id_})
-                skbio.io.write(sequence, format='fasta', into=fh)
+        _write_series_to_fasta(fh, series, CONSTRUCTORS[seq_type],
+                               skip_empty=True)
 
 
 def _multi_sequences_to_df(seq_iter_view):
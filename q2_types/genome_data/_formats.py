@@ -11,6 +11,7 @@ from collections import defaultdict
 import qiime2.plugin.model as model
 from qiime2.plugin import ValidationError
 
+from q2_types._util import _cached_validation
 from q2_types.feature_data import DNAFASTAFormat, ProteinFASTAFormat
 
 
@@ -177,6 +178,7 @@ class GFF3Format(model.TextFileFormat):
                 f'{line_number} was {line_elements[7]}.'
             )
 
+    @_cached_validation
     def _validate_(self, level):
         level_map = {'min': 100, 'max': float('inf')}
         max_lines = level_map[level]
@@ -10,7 +10,7 @@ import os
 import warnings
 
 import numpy as np
-from qiime2.util import duplicate
+from q2_types._util import _duplicate
 
 from q2_types.genome_data import SeedOrthologDirFmt, OrthologAnnotationDirFmt
 
@@ -20,7 +20,7 @@ def collate_orthologs(orthologs: SeedOrthologDirFmt) -> SeedOrthologDirFmt:
 
     for ortholog in orthologs:
         for fp in ortholog.path.iterdir():
-            duplicate(fp, result.path / os.path.basename(fp))
+            _duplicate(fp, result.path / os.path.basename(fp))
 
     return result
 
@@ -60,7 +60,7 @@ def partition_orthologs(
         result = SeedOrthologDirFmt()
 
         for sample_id, sample_fp in samples:
-            duplicate(sample_fp, result.path / os.path.basename(sample_fp))
+            _duplicate(sample_fp, result.path / os.path.basename(sample_fp))
 
         # If num_partitions == num_samples we will only have gone through one
         # sample in the above loop and will use its id as a key. Otherwise we
@@ -83,6 +83,6 @@ def collate_ortholog_annotations(
     # Copy annotations into output
     for anno in ortholog_annotations:
         for fp in anno.path.iterdir():
-            duplicate(fp, collated_annotations.path / fp.name)
+            _duplicate(fp, collated_annotations.path / fp.name)
 
     return collated_annotations
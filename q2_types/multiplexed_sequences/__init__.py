@@ -23,7 +23,7 @@ from ._types import (MultiplexedSingleEndBarcodeInSequence,
                      EMPPairedEndSequences,
                      ErrorCorrectionDetails)
 from ._objects import (BarcodePairedSequenceFastqIterator,
-                       BarcodeSequenceFastqIterator)
+                       BarcodeSequenceFastqIterator, FastqBatch)
 
 __all__ = [
     'MultiplexedSingleEndBarcodeInSequence',
@@ -38,5 +38,5 @@ __all__ = [
     'EMPSingleEndCasavaDirFmt', 'EMPPairedEndDirFmt',
     'EMPPairedEndCasavaDirFmt',
     'BarcodePairedSequenceFastqIterator',
-    'BarcodeSequenceFastqIterator'
+    'BarcodeSequenceFastqIterator', 'FastqBatch'
 ]
@@ -6,16 +6,15 @@
 # The full license is in the file LICENSE, distributed with this software.
 # ----------------------------------------------------------------------------
 
+import functools
 import gzip
-import shutil
 import itertools
 
 import pandas as pd
-import skbio.io
 
 from qiime2 import Metadata
 
-from q2_types._util import FastqGzFormat
+from q2_types._util import FastqGzFormat, _duplicate, _prefetch
 
 from .. import (
     MultiplexedFastaQualDirFmt,
@@ -29,32 +28,58 @@ from .. import (
     BarcodePairedSequenceFastqIterator,
     BarcodeSequenceFastqIterator
 )
+from .._util import _write_fasta_qual_to_fastq
 from ...plugin_setup import plugin
 
 
+_FASTQ_READ_SIZE = 8 * 1024 * 1024
+# Blocks each reader may decompress ahead of the records being consumed.
+_FASTQ_PREFETCH_DEPTH = 2
+
+
+def _read_fastq_blocks(filepath):
+    # Yields lists of the records in a gzipped FASTQ file, as
+    # _read_fastq_seqs would yield them one at a time, reading the file in
+    # large chunks of text rather than line by line.
+    with gzip.open(filepath, 'rt') as fh:
+        lines = []
+        leftover = ''
+        for chunk in iter(functools.partial(fh.read, _FASTQ_READ_SIZE), ''):
+            lines.extend((leftover + chunk).split('\n'))
+            leftover = lines.pop()
+            n_lines = len(lines) // 4 * 4
+            block = list(map(str.strip, lines[:n_lines]))
+            del lines[:n_lines]
+            if block:
+                yield list(zip(block[0::4], block[1::4], block[2::4],
+                               block[3::4]))
+
+        if leftover:
+            lines.append(leftover)
+        if lines:
+            # A partial last record fails as it did when reading by line.
+            yield [(seq_header.strip(), seq.strip(), qual_header.strip(),
+                    qual.strip())
+                   for seq_header, seq, qual_header, qual
+                   in itertools.zip_longest(*[iter(lines)] * 4)]
+
+
 def _read_fastq_seqs(filepath):
-    # This function is adapted from @jairideout's SO post:
-    # http://stackoverflow.com/a/39302117/3424666
-    fh = gzip.open(filepath, 'rt')
-    for seq_header, seq, qual_header, qual in itertools.zip_longest(*[fh] * 4):
-        yield (seq_header.strip(), seq.strip(), qual_header.strip(),
-               qual.strip())
+    # Each file is decompressed in its own thread, a few blocks ahead, so
+    # that iterating over several files in step (e.g., barcodes, forward
+    # and reverse reads) waits on the slowest of them rather than on all
+    # of them in turn. Dropping the iterator stops the thread.
+    return itertools.chain.from_iterable(
+        _prefetch(_read_fastq_blocks(filepath), depth=_FASTQ_PREFETCH_DEPTH))
 
 
 @plugin.register_transformer
 def _1(df: MultiplexedFastaQualDirFmt) -> \
      MultiplexedSingleEndBarcodeInSequenceDirFmt:
-    seqs = open(df.sequences.path_maker())
-    qual = open(df.quality.path_maker())
-
     result = MultiplexedSingleEndBarcodeInSequenceDirFmt()
-
-    with open(result.path / 'forward.fastq.gz', 'wb') as fh:
-        for seq in skbio.io.read(seqs, qual=qual, format='fasta',
-                                 verify=False):
-            seq.write(fh, format='fastq', variant='illumina1.8',
-                      compression='gzip')
-
+    _write_fasta_qual_to_fastq(str(df.sequences.path_maker()),
+                               str(df.quality.path_maker()),
+                               str(result.path / 'forward.fastq.gz'))
     return result
 
 
@@ -67,8 +92,8 @@ def _18(dirfmt: EMPSingleEndCasavaDirFmt) -> EMPSingleEndDirFmt:
 
     sequences_fp = str(result / 'sequences.fastq.gz')
     barcodes_fp = str(result / 'barcodes.fastq.gz')
-    shutil.copyfile(str(dirfmt.sequences.view(FastqGzFormat)), sequences_fp)
-    shutil.copyfile(str(dirfmt.barcodes.view(FastqGzFormat)), barcodes_fp)
+    _duplicate(str(dirfmt.sequences.view(FastqGzFormat)), sequences_fp)
+    _duplicate(str(dirfmt.barcodes.view(FastqGzFormat)), barcodes_fp)
 
     return result
 
@@ -81,9 +106,9 @@ def _19(dirfmt: EMPPairedEndCasavaDirFmt) -> EMPPairedEndDirFmt:
     forward_fp = str(root / 'forward.fastq.gz')
     reverse_fp = str(root / 'reverse.fastq.gz')
     barcodes_fp = str(root / 'barcodes.fastq.gz')
-    shutil.copyfile(str(dirfmt.forward.view(FastqGzFormat)), forward_fp)
-    shutil.copyfile(str(dirfmt.reverse.view(FastqGzFormat)), reverse_fp)
-    shutil.copyfile(str(dirfmt.barcodes.view(FastqGzFormat)), barcodes_fp)
+    _duplicate(str(dirfmt.forward.view(FastqGzFormat)), forward_fp)
+    _duplicate(str(dirfmt.reverse.view(FastqGzFormat)), reverse_fp)
+    _duplicate(str(dirfmt.barcodes.view(FastqGzFormat)), barcodes_fp)
 
     return result
 
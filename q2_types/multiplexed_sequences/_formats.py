@@ -6,12 +6,17 @@
 # The full license is in the file LICENSE, distributed with this software.
 # ----------------------------------------------------------------------------
 
+import itertools
+
 import qiime2.plugin.model as model
 from qiime2.plugin import ValidationError
 
 from q2_types.feature_data import FASTAFormat, DNAFASTAFormat
 from q2_types.per_sample_sequences import FastqGzFormat
 
+from ._util import (_MAX_QUAL_SCORE, _count_bases, _count_scores,
+                    _first_invalid_score, _iter_record_sizes)
+
 
 # MultiplexedSingleEndBarcodeInSequenceDirFmt &
 # MultiplexedPairedEndBarcodeInSequenceDirFmt represent multiplexed sequences
@@ -35,11 +40,53 @@ class QualFormat(FASTAFormat):
         super().__init__(*args, **kwargs)
         self.alphabet = "0123456789 "
 
+    # Scores are range-checked in the same pass as the rest of the file (see
+    # FASTAFormat._validate_sequence_line).
+    def _validate_sequence_line(self, line, line_number):
+        score = _first_invalid_score(line)
+        if score is not None:
+            raise ValidationError(
+                'Quality score %d on line %d is not a PHRED score: PHRED '
+                'scores range from 0 to %d.'
+                % (score, line_number, _MAX_QUAL_SCORE))
+
+    def _is_valid_sequence_run(self, run):
+        return _first_invalid_score(run) is None
+
 
 class MultiplexedFastaQualDirFmt(model.DirectoryFormat):
     sequences = model.File('reads.fasta', format=DNAFASTAFormat)
     quality = model.File('reads.qual', format=QualFormat)
 
+    def _validate_(self, level):
+        # Both files are read in step, checking that each read has as many
+        # quality scores as it has bases. This reads both files in full, so
+        # it is only done at level 'max'.
+        if level != 'max':
+            return
+
+        records = itertools.zip_longest(
+            _iter_record_sizes(str(self.sequences.path_maker()),
+                               _count_bases),
+            _iter_record_sizes(str(self.quality.path_maker()),
+                               _count_scores))
+        for n, (read, scores) in enumerate(records, 1):
+            if read is None or scores is None:
+                raise ValidationError(
+                    'reads.fasta has %s records than reads.qual.'
+                    % ('fewer' if read is None else 'more'))
+            (id_, n_bases), (qual_id, n_scores) = read, scores
+            if id_ != qual_id:
+                raise ValidationError(
+                    'Record %d is %r in reads.fasta but %r in reads.qual.'
+                    % (n, id_.decode('utf-8', 'replace'),
+                       qual_id.decode('utf-8', 'replace')))
+            if n_bases != n_scores:
+                raise ValidationError(
+                    'Read %r has %d bases in reads.fasta but %d quality '
+                    'scores in reads.qual.'
+                    % (id_.decode('utf-8', 'replace'), n_bases, n_scores))
+
 
 # TODO: deprecate this and alias it
 class EMPMultiplexedDirFmt(model.DirectoryFormat):
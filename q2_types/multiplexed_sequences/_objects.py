@@ -8,6 +8,9 @@
 
 import collections
 import itertools
+import operator
+
+import numpy as np
 
 
 FastqHeader = collections.namedtuple('FastqHeader', ['id', 'description'])
@@ -35,6 +38,125 @@ def _record_to_fastq_header(record):
     return FastqHeader(id=id, description=description)
 
 
+def _trim_header(header):
+    # The trimmed id and description of a header line at once, as
+    # _record_to_fastq_header, _trim_id and _trim_description give them.
+    id, space, description = header[1:].partition(' ')
+    if not space:
+        return id.rsplit('/', 1)[0], None
+    if ':' in description:
+        description = description.split(':', 1)[1]
+    return id.rsplit('/', 1)[0], description.rsplit('/', 1)[0]
+
+
+def _headers_match(headers, ignore_description_mismatch):
+    # Whether the iterators below would accept these headers together.
+    # Reads of the same cluster often have identical headers, which need
+    # no trimming at all.
+    if headers.count(headers[0]) == len(headers):
+        return True
+    trimmed = list(map(_trim_header, headers))
+    if ignore_description_mismatch:
+        return all(id == trimmed[0][0] for id, _ in trimmed)
+    return trimmed.count(trimmed[0]) == len(trimmed)
+
+
+class FastqBatch(collections.namedtuple(
+        'FastqBatch', ['headers', 'separators', 'sequences',
+                       'sequence_offsets', 'qualities', 'quality_offsets'])):
+    """A batch of FASTQ records, with sequences and qualities as buffers
+
+    The i-th sequence is ``sequences[sequence_offsets[i]:
+    sequence_offsets[i + 1]]`` (UTF-8 encoded) and likewise for qualities.
+    """
+    __slots__ = ()
+
+    def record(self, i):
+        """The i-th record as the iterators above yield it"""
+        return (self.headers[i],
+                self.sequences[self.sequence_offsets[i]:
+                               self.sequence_offsets[i + 1]].decode(),
+                self.separators[i],
+                self.qualities[self.quality_offsets[i]:
+                               self.quality_offsets[i + 1]].decode())
+
+
+_HEADER, _SEQUENCE, _SEPARATOR, _QUALITY = map(operator.itemgetter, range(4))
+
+
+def _encode_column(strings):
+    # The strings as one UTF-8 buffer and the offsets of each in it.
+    buffer = ''.join(strings)
+    if buffer.isascii():
+        lengths = list(map(len, strings))
+        buffer = buffer.encode('ascii')
+    else:
+        encoded = [string.encode() for string in strings]
+        lengths = list(map(len, encoded))
+        buffer = b''.join(encoded)
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return buffer, offsets
+
+
+def _encode_barcodes(barcodes):
+    try:
+        return np.array(barcodes, dtype=np.bytes_)
+    except UnicodeEncodeError:
+        return np.array([barcode.encode() for barcode in barcodes],
+                        dtype=np.bytes_)
+
+
+def _first_mismatched_headers(headers, ignore_description_mismatch):
+    # The index of the first row of headers (one sequence of header lines
+    # per file) that _headers_match would reject, or None. Whole columns
+    # are compared at once, rows only once we know one of them differs.
+    if all(column == headers[0] for column in headers[1:]):
+        return None
+    keys = [list(map(_trim_header, column)) for column in headers]
+    if ignore_description_mismatch:
+        keys = [list(map(operator.itemgetter(0), column)) for column in keys]
+    if all(column == keys[0] for column in keys[1:]):
+        return None
+    for row, key in enumerate(zip(*keys)):
+        if key.count(key[0]) != len(key):
+            return row
+
+
+def _iter_record_batches(generators, batch_size, ignore_description_mismatch,
+                         check_headers, exhausted_errors):
+    # Aligned batches of records from generators, raising the errors of
+    # the iterators below for the first read they would have rejected.
+    if isinstance(batch_size, bool) or not isinstance(batch_size, int) \
+            or batch_size < 1:
+        raise ValueError('batch_size must be a positive integer, not %r.'
+                         % (batch_size,))
+    generators = [iter(generator) for generator in generators]
+    while True:
+        batch = [list(itertools.islice(generator, batch_size))
+                 for generator in generators]
+        lengths = [len(records) for records in batch]
+        n_records = min(lengths)
+        if n_records:
+            row = _first_mismatched_headers(
+                [list(map(_HEADER, records[:n_records]))
+                 for records in batch], ignore_description_mismatch)
+            if row is not None:
+                check_headers(*(records[row] for records in batch))
+        if max(lengths) != n_records:
+            raise ValueError(exhausted_errors[lengths.index(n_records)])
+        if not n_records:
+            return
+
+        batches = [_encode_barcodes(list(map(_SEQUENCE, batch[0])))]
+        for records in batch[1:]:
+            batches.append(FastqBatch(
+                list(map(_HEADER, records)), list(map(_SEPARATOR, records)),
+                *_encode_column(list(map(_SEQUENCE, records))),
+                *_encode_column(list(map(_QUALITY, records)))))
+        yield tuple(batches)
+
+
 class BarcodeSequenceFastqIterator(collections.abc.Iterable):
     def __init__(self, barcode_generator, sequence_generator,
                  ignore_description_mismatch=False):
@@ -50,42 +172,62 @@ class BarcodeSequenceFastqIterator(collections.abc.Iterable):
                 raise ValueError('More sequences were provided than barcodes.')
             if sequence_record is None:
                 raise ValueError('More barcodes were provided than sequences.')
-            # The id or description fields may end with "/read-number", which
-            # will differ between the sequence and barcode reads. Confirm that
-            # they are identical up until the last /
-            barcode_header = _record_to_fastq_header(barcode_record)
-            sequence_header = _record_to_fastq_header(sequence_record)
-
-            # confirm that the id fields are equal
-            if _trim_id(barcode_header.id) != \
-               _trim_id(sequence_header.id):
-                raise ValueError(
-                    'Mismatched sequence ids: %s and %s' %
-                    (_trim_id(barcode_header.id),
-                     _trim_id(sequence_header.id)))
-
-            if not self.ignore_description_mismatch:
-                # if a description field is present, confirm that they're equal
-                if barcode_header.description is None and \
-                   sequence_header.description is None:
-                    pass
-                elif barcode_header.description is None:
-                    raise ValueError(
-                        'Barcode header lines do not contain description '
-                        'fields but sequence header lines do.')
-                elif sequence_header.description is None:
-                    raise ValueError(
-                        'Sequence header lines do not contain description '
-                        'fields but barcode header lines do.')
-                elif _trim_description(barcode_header.description) != \
-                        _trim_description(sequence_header.description):
-                    raise ValueError(
-                        'Mismatched sequence descriptions: %s and %s' %
-                        (_trim_description(barcode_header.description),
-                         _trim_description(sequence_header.description)))
+            if not _headers_match((barcode_record[0], sequence_record[0]),
+                                  self.ignore_description_mismatch):
+                self._check_headers(barcode_record, sequence_record)
 
             yield barcode_record, sequence_record
 
+    def iter_batches(self, batch_size):
+        """Iterate over the reads batch_size at a time
+
+        Yields ``(barcodes, sequences)`` pairs, where ``barcodes`` is a
+        fixed-width bytes array of the barcode sequences and ``sequences``
+        is a ``FastqBatch`` of the aligned sequence records. Headers are
+        checked as when iterating, but for a whole batch before it is
+        yielded.
+        """
+        return _iter_record_batches(
+            (self.barcode_generator, self.sequence_generator), batch_size,
+            self.ignore_description_mismatch, self._check_headers,
+            ('More sequences were provided than barcodes.',
+             'More barcodes were provided than sequences.'))
+
+    def _check_headers(self, barcode_record, sequence_record):
+        # The id or description fields may end with "/read-number", which
+        # will differ between the sequence and barcode reads. Confirm that
+        # they are identical up until the last /
+        barcode_header = _record_to_fastq_header(barcode_record)
+        sequence_header = _record_to_fastq_header(sequence_record)
+
+        # confirm that the id fields are equal
+        if _trim_id(barcode_header.id) != \
+           _trim_id(sequence_header.id):
+            raise ValueError(
+                'Mismatched sequence ids: %s and %s' %
+                (_trim_id(barcode_header.id),
+                 _trim_id(sequence_header.id)))
+
+        if not self.ignore_description_mismatch:
+            # if a description field is present, confirm that they're equal
+            if barcode_header.description is None and \
+               sequence_header.description is None:
+                pass
+            elif barcode_header.description is None:
+                raise ValueError(
+                    'Barcode header lines do not contain description '
+                    'fields but sequence header lines do.')
+            elif sequence_header.description is None:
+                raise ValueError(
+                    'Sequence header lines do not contain description '
+                    'fields but barcode header lines do.')
+            elif _trim_description(barcode_header.description) != \
+                    _trim_description(sequence_header.description):
+                raise ValueError(
+                    'Mismatched sequence descriptions: %s and %s' %
+                    (_trim_description(barcode_header.description),
+                     _trim_description(sequence_header.description)))
+
 
 class BarcodePairedSequenceFastqIterator(collections.abc.Iterable):
     def __init__(self, barcode_generator, forward_generator,
@@ -109,48 +251,72 @@ class BarcodePairedSequenceFastqIterator(collections.abc.Iterable):
             elif reverse_record is None:
                 raise ValueError('More barcodes were provided than '
                                  'reverse-sequences.')
-            # The id or description fields may end with "/read-number", which
-            # will differ between the sequence and barcode reads. Confirm that
-            # they are identical up until the last /
-            barcode_header = _record_to_fastq_header(barcode_record)
-            forward_header = _record_to_fastq_header(forward_record)
-            reverse_header = _record_to_fastq_header(reverse_record)
-
-            # confirm that the id fields are equal
-            if not (_trim_id(barcode_header.id) ==
-                    _trim_id(forward_header.id) ==
-                    _trim_id(reverse_header.id)):
-                raise ValueError(
-                    'Mismatched sequence ids: %s, %s, and %s' %
-                    (_trim_id(barcode_header.id),
-                     _trim_id(forward_header.id),
-                     _trim_id(reverse_header.id)))
-
-            if not self.ignore_description_mismatch:
-                # if a description field is present, confirm that they're equal
-                if barcode_header.description is None and \
-                   forward_header.description is None and \
-                   reverse_header.description is None:
-                    pass
-                elif barcode_header.description is None:
-                    raise ValueError(
-                        'Barcode header lines do not contain description '
-                        'fields but sequence header lines do.')
-                elif forward_header.description is None:
-                    raise ValueError(
-                        'Forward-read header lines do not contain description '
-                        'fields but barcode header lines do.')
-                elif reverse_header.description is None:
-                    raise ValueError(
-                        'Reverse-read header lines do not contain description '
-                        'fields but barcode header lines do.')
-                elif not (_trim_description(barcode_header.description) ==
-                          _trim_description(forward_header.description) ==
-                          _trim_description(reverse_header.description)):
-                    raise ValueError(
-                        'Mismatched sequence descriptions: %s, %s, and %s' %
-                        (_trim_description(barcode_header.description),
-                         _trim_description(forward_header.description),
-                         _trim_description(reverse_header.description)))
+            if not _headers_match((barcode_record[0], forward_record[0],
+                                   reverse_record[0]),
+                                  self.ignore_description_mismatch):
+                self._check_headers(barcode_record, forward_record,
+                                    reverse_record)
 
             yield barcode_record, forward_record, reverse_record
+
+    def iter_batches(self, batch_size):
+        """Iterate over the reads batch_size at a time
+
+        Yields ``(barcodes, forward, reverse)`` tuples, where ``barcodes``
+        is a fixed-width bytes array of the barcode sequences and
+        ``forward`` and ``reverse`` are ``FastqBatch``es of the aligned
+        sequence records. Headers are checked as when iterating, but for a
+        whole batch before it is yielded.
+        """
+        return _iter_record_batches(
+            (self.barcode_generator, self.forward_generator,
+             self.reverse_generator), batch_size,
+            self.ignore_description_mismatch, self._check_headers,
+            ('More sequences were provided than barcodes.',
+             'More barcodes were provided than forward-sequences.',
+             'More barcodes were provided than reverse-sequences.'))
+
+    def _check_headers(self, barcode_record, forward_record, reverse_record):
+        # The id or description fields may end with "/read-number", which
+        # will differ between the sequence and barcode reads. Confirm that
+        # they are identical up until the last /
+        barcode_header = _record_to_fastq_header(barcode_record)
+        forward_header = _record_to_fastq_header(forward_record)
+        reverse_header = _record_to_fastq_header(reverse_record)
+
+        # confirm that the id fields are equal
+        if not (_trim_id(barcode_header.id) ==
+                _trim_id(forward_header.id) ==
+                _trim_id(reverse_header.id)):
+            raise ValueError(
+                'Mismatched sequence ids: %s, %s, and %s' %
+                (_trim_id(barcode_header.id),
+                 _trim_id(forward_header.id),
+                 _trim_id(reverse_header.id)))
+
+        if not self.ignore_description_mismatch:
+            # if a description field is present, confirm that they're equal
+            if barcode_header.description is None and \
+               forward_header.description is None and \
+               reverse_header.description is None:
+                pass
+            elif barcode_header.description is None:
+                raise ValueError(
+                    'Barcode header lines do not contain description '
+                    'fields but sequence header lines do.')
+            elif forward_header.description is None:
+                raise ValueError(
+                    'Forward-read header lines do not contain description '
+                    'fields but barcode header lines do.')
+            elif reverse_header.description is None:
+                raise ValueError(
+                    'Reverse-read header lines do not contain description '
+                    'fields but barcode header lines do.')
+            elif not (_trim_description(barcode_header.description) ==
+                      _trim_description(forward_header.description) ==
+                      _trim_description(reverse_header.description)):
+                raise ValueError(
+                    'Mismatched sequence descriptions: %s, %s, and %s' %
+                    (_trim_description(barcode_header.description),
+                     _trim_description(forward_header.description),
+                     _trim_description(reverse_header.description)))
@@ -0,0 +1,281 @@
+# ----------------------------------------------------------------------------
+# Copyright (c) 2016-2023, QIIME 2 development team.
+#
+# Distributed under the terms of the Modified BSD License.
+#
+# The full license is in the file LICENSE, distributed with this software.
+# ----------------------------------------------------------------------------
+
+import functools
+import itertools
+import re
+
+import numpy as np
+import skbio
+
+from q2_types._util import _open_gzip_writer
+
+
+_FASTA_QUAL_READ_SIZE = 8 * 1024 * 1024
+# Records are paired up and written this many at a time.
+_FASTQ_WRITE_BATCH = 10000
+# skbio writes 'illumina1.8' scores up to this one, clipping (and warning
+# about) any above it.
+_MAX_PHRED = 62
+# What a FASTA or QUAL file may contain to be read here rather than by
+# skbio: printable ASCII, tabs and newlines.
+_PLAIN_TEXT = b'\t\n' + bytes(range(32, 127))
+# skbio strips lines before looking for headers, so these are headers too.
+_INDENTED_HEADER = re.compile(rb'\n[ \t]+>')
+# The highest PHRED score that Phred+33 can encode.
+_MAX_QUAL_SCORE = 93
+# Where a record starts, once a newline is put in front of the file: the
+# FASTA validator strips lines, and any BOM, before looking for '>'.
+_RECORD_START = re.compile(rb'\n[ \t\r\x0b\x0c]*(?:\xef\xbb\xbf)?>')
+_WHITESPACE = b' \t\n\r\x0b\x0c'
+_BOM = b'\xef\xbb\xbf'
+_SCORE = re.compile(rb'[0-9]+')
+
+
+class _UnusualFastaQual(Exception):
+    pass
+
+
+def _parse_header(header):
+    # skbio's _parse_fasta_like_header, on the bytes following '>'.
+    header = header.rstrip()
+    if not header:
+        return b'', b''
+    if header[:1].isspace():
+        return b'', header.lstrip()
+    tokens = header.split(None, 1)
+    if len(tokens) == 1:
+        return tokens[0], b''
+    return tokens[0], tokens[1]
+
+
+def _iter_fasta_like_blocks(fh):
+    """Yield the records of a FASTA or QUAL file, a block at a time.
+
+    Records are pairs of the (id, description) of their header and their
+    stripped data lines, as skbio parses them. Raises `_UnusualFastaQual`
+    for anything skbio could read differently or reject (blank lines within
+    records, headers without data, non-ASCII or control characters, ...).
+
+    """
+    # Every header follows a newline, including the first one.
+    leftover = b'\n'
+    first = True
+    for data in itertools.chain(
+            iter(functools.partial(fh.read, _FASTA_QUAL_READ_SIZE), b''),
+            [None]):
+        if data is None:
+            data, leftover = leftover, b''
+        else:
+            data, leftover = leftover + data, b''
+            cut = data.rfind(b'\n>')
+            if cut < 1:
+                leftover = data
+                continue
+            data, leftover = data[:cut], data[cut:]
+        if data.translate(None, _PLAIN_TEXT) or \
+                _INDENTED_HEADER.search(data):
+            raise _UnusualFastaQual()
+
+        records = data.split(b'\n>')
+        if records.pop(0).strip() or (first and not records):
+            # a first non-blank line that isn't a header, or no records
+            raise _UnusualFastaQual()
+        first = False
+
+        block = []
+        for record in records:
+            header, _, body = record.partition(b'\n')
+            lines = [line.strip() for line in body.split(b'\n')]
+            while lines and not lines[-1]:
+                lines.pop()
+            if not lines or not all(lines):
+                raise _UnusualFastaQual()
+            block.append((_parse_header(header), lines))
+        yield block
+
+
+def _iter_fasta_records(fh):
+    # Yields the (id, description) and sequence of each record.
+    for block in _iter_fasta_like_blocks(fh):
+        yield from ((header, b''.join(lines).replace(b' ', b''))
+                    for header, lines in block)
+
+
+def _find_scores(data):
+    # The digits of `data`, and where each run of them starts and ends.
+    digits = np.frombuffer(data, dtype=np.uint8) - ord('0')
+    bounds = np.diff((digits < 10).astype(np.int8), prepend=0, append=0)
+    return digits, np.flatnonzero(bounds == 1), np.flatnonzero(bounds == -1)
+
+
+def _parse_scores(data):
+    """Parse the runs of digits in `data` as integers, all at once.
+
+    Returns the scores and the offset at which each of them starts. Anything
+    but a digit separates scores.
+
+    """
+    digits, starts, ends = _find_scores(data)
+    lengths = ends - starts
+
+    scores = digits[starts].astype(np.int64)
+    longer = lengths > 1
+    scores[longer] = scores[longer] * 10 + digits[starts[longer] + 1]
+    # Scores of three digits or more are rare enough to parse one by one.
+    limit = np.iinfo(np.int64).max
+    for i in np.flatnonzero(lengths > 2):
+        scores[i] = min(int(data[starts[i]:ends[i]]), limit)
+    return scores, starts
+
+
+def _encode_quality_scores(scores):
+    """Parse whitespace-separated PHRED scores as Phred+33 characters.
+
+    Returns the characters and the offset at which each score starts in
+    `scores`. Raises `_UnusualFastaQual` for anything but scores from 0 to
+    `_MAX_PHRED`.
+
+    """
+    if scores.translate(None, b'0123456789 \t'):
+        raise _UnusualFastaQual()
+    values, starts = _parse_scores(scores)
+    if (values > _MAX_PHRED).any():
+        raise _UnusualFastaQual()
+    return (values + 33).astype(np.uint8).tobytes(), starts
+
+
+def _iter_qual_records(fh):
+    # Yields the (id, description) and Phred+33 qualities of each record,
+    # with the scores of a whole block parsed at once.
+    for block in _iter_fasta_like_blocks(fh):
+        scores = [b' '.join(lines) for _, lines in block]
+        qualities, starts = _encode_quality_scores(b' '.join(scores))
+        # the offset of each record's scores, in the joined scores
+        offsets = np.cumsum([0] + [len(score) + 1 for score in scores])
+        offsets = np.searchsorted(starts, offsets).tolist()
+        yield from ((header, qualities[start:end])
+                    for (header, _), start, end
+                    in zip(block, offsets, offsets[1:]))
+
+
+def _iter_fastq_records(fasta, qual):
+    # Pairs up the records of the two files as skbio does, raising
+    # _UnusualFastaQual where skbio would raise an error.
+    for fasta_record, qual_record in itertools.zip_longest(
+            _iter_fasta_records(fasta), _iter_qual_records(qual)):
+        if fasta_record is None or qual_record is None:
+            raise _UnusualFastaQual()
+        (header, seq), (qual_header, quality) = fasta_record, qual_record
+        if header != qual_header or len(seq) != len(quality):
+            raise _UnusualFastaQual()
+        id_, desc = header
+        yield b'@%s%s%s\n%s\n+\n%s\n' % (id_, b' ' if desc else b'', desc,
+                                         seq, quality)
+
+
+def _write_fasta_qual_to_fastq(fasta_path, qual_path, fastq_path):
+    """Write the reads of a 454-style FASTA and QUAL pair as gzipped FASTQ.
+
+    The output is what skbio writes when reading the pair and writing each
+    record as 'illumina1.8' FASTQ, but both files are parsed in step here on
+    bytes, with the scores of a whole block of records encoded at once. If
+    anything turns up that skbio would treat differently (see
+    `_iter_fasta_like_blocks`, `_encode_quality_scores`), or would reject,
+    the whole conversion is left to skbio instead.
+
+    """
+    try:
+        with open(fasta_path, 'rb') as fasta, open(qual_path, 'rb') as qual, \
+                _open_gzip_writer(fastq_path) as fh:
+            records = _iter_fastq_records(fasta, qual)
+            for batch in iter(lambda: list(itertools.islice(
+                    records, _FASTQ_WRITE_BATCH)), []):
+                fh.write(b''.join(batch))
+        return
+    except _UnusualFastaQual:
+        pass
+
+    with open(fasta_path) as fasta, open(qual_path) as qual, \
+            open(fastq_path, 'wb') as fh:
+        for seq in skbio.io.read(fasta, qual=qual, format='fasta',
+                                 verify=False):
+            seq.write(fh, format='fastq', variant='illumina1.8',
+                      compression='gzip')
+
+
+def _may_exceed_max_qual_score(data):
+    # Whether `data` has a run of three digits or more, or one of 94 to 99.
+    data = np.frombuffer(data, dtype=np.uint8)
+    is_digit = (data - ord('0')) < 10
+    return bool((is_digit[:-2] & is_digit[1:-1] & is_digit[2:]).any()
+                or ((data[:-1] == ord('9')) & (data[1:] >= ord('4'))
+                    & is_digit[1:]).any())
+
+
+def _first_invalid_score(data):
+    """Find the first score in `data` that is not a PHRED score.
+
+    `data` holds whole lines of a QUAL file, without their descriptions.
+    Returns the first score above `_MAX_QUAL_SCORE`, or None. `data` is first
+    checked for anything that could be out of range, and only then parsed
+    with `_parse_scores`.
+
+    """
+    if not _may_exceed_max_qual_score(data):
+        return None
+    scores, starts = _parse_scores(data)
+    invalid = np.flatnonzero(scores > _MAX_QUAL_SCORE)
+    if not len(invalid):
+        return None
+    # parsed again, as _parse_scores caps what it returns
+    return int(_SCORE.match(data, starts[invalid[0]]).group())
+
+
+def _count_bases(bodies):
+    # A BOM may start any line, as far as FASTAFormat is concerned.
+    return [len(body.translate(None, _WHITESPACE)) - 3 * body.count(_BOM)
+            for body in bodies]
+
+
+def _count_scores(bodies):
+    _, starts, _ = _find_scores(b'\n'.join(bodies))
+    offsets = np.cumsum([0] + [len(body) + 1 for body in bodies])
+    return np.diff(np.searchsorted(starts, offsets)).tolist()
+
+
+def _iter_record_sizes(path, count):
+    """Yield the ID and the size of each record of a FASTA-like file.
+
+    Records are read a block at a time, and `count` gives the sizes of the
+    bodies (the lines following the description) of a block of records at
+    once, e.g. `_count_bases` or `_count_scores`. Records are delimited as
+    by `FASTAFormat` validation, which the file is expected to have passed.
+
+    """
+    with open(path, 'rb') as fh:
+        # Every description follows a newline, including the first one.
+        leftover = b'\n'
+        for data in itertools.chain(
+                iter(functools.partial(fh.read, _FASTA_QUAL_READ_SIZE), b''),
+                [None]):
+            if data is None:
+                records = _RECORD_START.split(leftover)
+            else:
+                records = _RECORD_START.split(leftover + data)
+                if len(records) < 2:
+                    leftover += data
+                    continue
+                # the last record may continue in the next block
+                leftover = b'\n>' + records.pop()
+            ids, bodies = [], []
+            for record in records[1:]:
+                description, _, body = record.partition(b'\n')
+                ids.append((description.split(None, 1) or [b''])[0])
+                bodies.append(body)
+            yield from zip(ids, count(bodies))
@@ -10,6 +10,7 @@ import os
 import shutil
 import unittest
 
+from qiime2.plugin import ValidationError
 from qiime2.plugin.testing import TestPluginBase
 
 from q2_types.multiplexed_sequences import (
@@ -17,6 +18,7 @@ from q2_types.multiplexed_sequences import (
     MultiplexedPairedEndBarcodeInSequenceDirFmt,
     MultiplexedFastaQualDirFmt
 )
+from q2_types.multiplexed_sequences._formats import QualFormat
 
 
 class TestMultiplexedSingleEndBarcodeInSequenceDirFmt(TestPluginBase):
@@ -69,6 +71,75 @@ class TestMultiplexedFastaQualDirFmt(TestPluginBase):
         # Should not error.
         format.validate()
 
+    def _write_fasta_qual(self, fasta, qual):
+        for fn, contents in [('reads.fasta', fasta), ('reads.qual', qual)]:
+            with open(os.path.join(self.temp_dir.name, fn), 'w') as fh:
+                fh.write(contents)
+        return MultiplexedFastaQualDirFmt(self.temp_dir.name, mode='r')
+
+    def test_format_records_in_step(self):
+        format = self._write_fasta_qual(
+            '>s1 a\nACG\nT\n\n>s2\nA\n',
+            '>s1 a\n0 93\n\n 40 40 \n>s2\n37\n')
+
+        format.validate()
+
+    def test_format_length_mismatch(self):
+        format = self._write_fasta_qual('>s1\nACGT\n>s2\nAC\n',
+                                        '>s1\n1 2 3 4\n>s2\n1 2 3\n')
+
+        # the files are only checked against each other at level 'max'
+        format.validate(level='min')
+        with self.assertRaisesRegex(ValidationError,
+                                    "'s2' has 2 bases.*but 3 quality"):
+            format.validate()
+
+    def test_format_id_mismatch(self):
+        format = self._write_fasta_qual('>s1\nAC\n>s2\nAC\n',
+                                        '>s1\n1 2\n>s3\n1 2\n')
+
+        with self.assertRaisesRegex(ValidationError,
+                                    "Record 2 is 's2'.*but 's3'"):
+            format.validate()
+
+    def test_format_record_count_mismatch(self):
+        format = self._write_fasta_qual('>s1\nAC\n',
+                                        '>s1\n1 2\n>s2\n1 2\n')
+
+        with self.assertRaisesRegex(ValidationError, 'fewer records'):
+            format.validate()
+
+
+class TestQualFormat(TestPluginBase):
+    package = 'q2_types.multiplexed_sequences.tests'
+
+    def test_qual_format(self):
+        format = QualFormat(self.get_data_path('reads.qual'), mode='r')
+
+        format.validate()
+
+    def test_qual_format_scores_out_of_range(self):
+        fp = os.path.join(self.temp_dir.name, 'reads.qual')
+        with open(fp, 'w') as fh:
+            fh.write('>s1 length=100\n0 93\n0093 1\n>s2\n40 94 120\n')
+        format = QualFormat(fp, mode='r')
+
+        with self.assertRaisesRegex(ValidationError,
+                                    'score 94 on line 5.*0 to 93'):
+            format.validate()
+
+    def test_qual_format_first_problem_is_reported(self):
+        fp = os.path.join(self.temp_dir.name, 'reads.qual')
+        with open(fp, 'w') as fh:
+            fh.write('>s1\n40 40\n1 100\n>s1\n40\n')
+        format = QualFormat(fp, mode='r')
+
+        # scores are checked in the same pass as the rest of the file
+        for level in ('min', 'max'):
+            with self.assertRaisesRegex(ValidationError,
+                                        'score 100 on line 3'):
+                format.validate(level=level)
+
 
 # TODO: write the following tests
 class TestEMPMultiplexedDirFmt(TestPluginBase):
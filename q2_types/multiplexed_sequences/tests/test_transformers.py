@@ -6,10 +6,14 @@
 # The full license is in the file LICENSE, distributed with this software.
 # ----------------------------------------------------------------------------
 
+import gzip
+import itertools
 import unittest
 import os
 import string
 import tempfile
+import threading
+from unittest.mock import patch
 
 import pandas as pd
 import pandas.testing as pdt
@@ -24,9 +28,13 @@ from q2_types.multiplexed_sequences import (
     MultiplexedSingleEndBarcodeInSequenceDirFmt,
     ErrorCorrectionDetailsFmt,
     EMPSingleEndDirFmt, EMPSingleEndCasavaDirFmt,
-    BarcodeSequenceFastqIterator
+    BarcodeSequenceFastqIterator, BarcodePairedSequenceFastqIterator
 
 )
+from q2_types.multiplexed_sequences._deferred_setup._transformers import (
+    _read_fastq_seqs
+)
+from q2_types.multiplexed_sequences._util import _write_fasta_qual_to_fastq
 
 from q2_types.per_sample_sequences import (
     SingleLanePerSampleSingleEndFastqDirFmt,
@@ -85,6 +93,43 @@ class TestMultiplexedSequencesTransformers(TestPluginBase):
             list(sequences[2].positional_metadata['quality'][-5:]),
             [36, 36, 36, 36, 36])
 
+    def _write_fasta_qual(self, fasta, qual):
+        fasta_fp = os.path.join(self.temp_dir.name, 'reads.fasta')
+        qual_fp = os.path.join(self.temp_dir.name, 'reads.qual')
+        fastq_fp = os.path.join(self.temp_dir.name, 'reads.fastq.gz')
+        with open(fasta_fp, 'w') as fh:
+            fh.write(fasta)
+        with open(qual_fp, 'w') as fh:
+            fh.write(qual)
+        _write_fasta_qual_to_fastq(fasta_fp, qual_fp, fastq_fp)
+        with gzip.open(fastq_fp, 'rt') as fh:
+            return fh.read()
+
+    def test_write_fasta_qual_to_fastq(self):
+        obs = self._write_fasta_qual(
+            '\n>s1 length=5  x\nAC GT\nn\n\n>s2\nA\n',
+            '>s1 length=5  x\n0 9 10\n 40  62\n>s2\n\t37\n')
+        self.assertEqual(obs, '@s1 length=5  x\nACGTn\n+\n!*+I_\n'
+                              '@s2\nA\n+\nF\n')
+
+        # left to skbio, which clips scores above 62
+        with self.assertWarnsRegex(UserWarning, 'Phred score 63'):
+            obs = self._write_fasta_qual('>s1\nAC\n', '>s1\n63 0\n')
+        self.assertEqual(obs, '@s1\nAC\n+\n_!\n')
+
+    def test_write_fasta_qual_to_fastq_errors(self):
+        with self.assertRaisesRegex(skbio.io.FASTAFormatError,
+                                    'IDs do not match'):
+            self._write_fasta_qual('>s1\nAC\n', '>s2\n1 2\n')
+        with self.assertRaisesRegex(ValueError, 'with ID \'s1\''):
+            self._write_fasta_qual('>s1\nAC\n', '>s1\n1 2 3\n')
+        with self.assertRaisesRegex(skbio.io.FASTAFormatError,
+                                    'more records than QUAL'):
+            self._write_fasta_qual('>s1\nAC\n>s2\nA\n', '>s1\n1 2\n')
+        with self.assertRaisesRegex(skbio.io.FASTAFormatError,
+                                    'blank or whitespace-only'):
+            self._write_fasta_qual('>s1\nAC\n\nA\n', '>s1\n1 2 3\n')
+
 
 # NOTE: we are really only interested in the manifest, since these transformers
 # primarily transform the V2 TSV manifests to the (older) CSV manifests. The
@@ -464,6 +509,161 @@ class BarcodeSequenceFastqIteratorTests(unittest.TestCase):
         with self.assertRaises(ValueError):
             list(bsi)
 
+    def test_iter_batches(self):
+        barcodes = [('@s1/2 abc/2', 'AAAA', '+', 'YYYY'),
+                    ('@s2/2 abc/2', 'AAAA', '+', 'PPPP'),
+                    ('@s3/2 abc/2', 'AAC', '+', 'PPP')]
+
+        sequences = [('@s1/1 abc/1', 'GGG', '+', 'YYY'),
+                     ('@s2/1 abc/1', '', '+', ''),
+                     ('@s3/1 abc/1', 'AAAAA', '+', 'PPPPP')]
+
+        bsi = BarcodeSequenceFastqIterator(barcodes, sequences)
+        obs = list(bsi.iter_batches(2))
+
+        self.assertEqual(len(obs), 2)
+        self.assertEqual(obs[0][0].tolist(), [b'AAAA', b'AAAA'])
+        self.assertEqual(obs[1][0].tolist(), [b'AAC'])
+        self.assertEqual(obs[0][1].sequences, b'GGG')
+        self.assertEqual(obs[0][1].sequence_offsets.tolist(), [0, 3, 3])
+        self.assertEqual(obs[0][1].qualities, b'YYY')
+        self.assertEqual(obs[0][1].quality_offsets.tolist(), [0, 3, 3])
+        self.assertEqual([batch.record(i) for _, batch in obs
+                          for i in range(len(batch.headers))], sequences)
+
+    def test_iter_batches_errors(self):
+        barcodes = [('@s1/2 abc/2', 'AAAA', '+', 'YYYY'),
+                    ('@s2/2 abc/2', 'AAAA', '+', 'PPPP'),
+                    ('@s3/2 abc/2', 'AACC', '+', 'PPPP')]
+
+        sequences = [('@s1/1 abc/1', 'GGG', '+', 'YYY'),
+                     ('@s2/1 abc/1', 'CCC', '+', 'PPP'),
+                     ('@s3/1 abc/1', 'AAA', '+', 'PPP'),
+                     ('@s4/1 abc/1', 'TTT', '+', 'PPP')]
+
+        bsi = BarcodeSequenceFastqIterator(barcodes, sequences)
+        with self.assertRaisesRegex(ValueError, 'sequences were provided'):
+            list(bsi.iter_batches(3))
+
+        sequences[2] = ('@s3/1 xyz/1', 'AAA', '+', 'PPP')
+        bsi = BarcodeSequenceFastqIterator(barcodes, sequences)
+        with self.assertRaisesRegex(ValueError, 'descriptions: abc and xyz'):
+            list(bsi.iter_batches(10))
+
+        bsi = BarcodeSequenceFastqIterator(barcodes, sequences,
+                                           ignore_description_mismatch=True)
+        with self.assertRaisesRegex(ValueError, 'sequences were provided'):
+            list(bsi.iter_batches(10))
+
+        with self.assertRaisesRegex(ValueError, 'positive integer'):
+            list(bsi.iter_batches(0))
+
+
+class BarcodePairedSequenceFastqIteratorTests(unittest.TestCase):
+
+    def setUp(self):
+        self.barcodes = [('@s1/3 1:N:0:0/3', 'AAAA', '+', 'YYYY'),
+                         ('@s2/3 1:N:0:0/3', 'AAAA', '+', 'PPPP')]
+        self.forward = [('@s1/1 1:N:0:0/1', 'GGG', '+', 'YYY'),
+                        ('@s2/1 1:N:0:0/1', 'CCC', '+', 'PPP')]
+        self.reverse = [('@s1/2 2:N:0:0/2', 'TTT', '+', 'YYY'),
+                        ('@s2/2 2:N:0:0/2', 'AAA', '+', 'PPP')]
+
+    def test_valid(self):
+        bpsi = BarcodePairedSequenceFastqIterator(
+            self.barcodes, self.forward, self.reverse)
+        self.assertEqual(list(bpsi),
+                         list(zip(self.barcodes, self.forward, self.reverse)))
+
+    def test_mismatched_id(self):
+        self.reverse[1] = ('@s3/2 2:N:0:0/2', 'AAA', '+', 'PPP')
+        bpsi = BarcodePairedSequenceFastqIterator(
+            self.barcodes, self.forward, self.reverse)
+        with self.assertRaisesRegex(ValueError, 'ids: s2, s2, and s3'):
+            list(bpsi)
+
+    def test_mismatched_description(self):
+        self.reverse[1] = ('@s2/2 2:N:0:1/2', 'AAA', '+', 'PPP')
+        bpsi = BarcodePairedSequenceFastqIterator(
+            self.barcodes, self.forward, self.reverse)
+        with self.assertRaisesRegex(
+                ValueError, 'descriptions: N:0:0, N:0:0, and N:0:1'):
+            list(bpsi)
+
+        bpsi = BarcodePairedSequenceFastqIterator(
+            self.barcodes, self.forward, self.reverse,
+            ignore_description_mismatch=True)
+        self.assertEqual(len(list(bpsi)), 2)
+
+    def test_missing_description(self):
+        self.reverse[0] = ('@s1/2', 'TTT', '+', 'YYY')
+        bpsi = BarcodePairedSequenceFastqIterator(
+            self.barcodes, self.forward, self.reverse)
+        with self.assertRaisesRegex(ValueError, 'Reverse-read header lines'):
+            list(bpsi)
+
+    def test_iter_batches(self):
+        bpsi = BarcodePairedSequenceFastqIterator(
+            self.barcodes, self.forward, self.reverse)
+        (barcodes, forward, reverse), = bpsi.iter_batches(2)
+
+        self.assertEqual(barcodes.tolist(), [b'AAAA', b'AAAA'])
+        self.assertEqual([forward.record(i) for i in range(2)], self.forward)
+        self.assertEqual([reverse.record(i) for i in range(2)], self.reverse)
+
+    def test_iter_batches_errors(self):
+        self.reverse[1] = ('@s3/2 2:N:0:0/2', 'AAA', '+', 'PPP')
+        bpsi = BarcodePairedSequenceFastqIterator(
+            self.barcodes, self.forward, self.reverse)
+        with self.assertRaisesRegex(ValueError, 'ids: s2, s2, and s3'):
+            list(bpsi.iter_batches(1))
+
+        bpsi = BarcodePairedSequenceFastqIterator(
+            self.barcodes, self.forward, self.reverse[:1])
+        with self.assertRaisesRegex(ValueError, 'reverse-sequences'):
+            list(bpsi.iter_batches(2))
+
+
+class ReadFastqSeqsTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory(
+            prefix='q2-types-test-temp-')
+        self.fp = os.path.join(self.temp_dir.name, 'reads.fastq.gz')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_read_fastq_seqs(self):
+        with gzip.open(self.fp, 'wt', newline='') as fh:
+            fh.write('@s1 abc\nACGT\n+\nIIII\n'
+                     '@s2 abc \r\nAC\n+s2\n\nII\n'
+                     '@s3\nA\n+\nI')
+
+        exp = [('@s1 abc', 'ACGT', '+', 'IIII'),
+               ('@s2 abc', 'AC', '+s2', ''),
+               ('II', '@s3', 'A', '+')]
+        for read_size in (1, 5, 1024):
+            with patch('q2_types.multiplexed_sequences._deferred_setup.'
+                       '_transformers._FASTQ_READ_SIZE', read_size):
+                obs = _read_fastq_seqs(self.fp)
+                self.assertEqual(list(itertools.islice(obs, 3)), exp)
+                # a partial last record fails as it always has
+                with self.assertRaises(AttributeError):
+                    next(obs)
+
+    def test_read_fastq_seqs_early_exit(self):
+        with gzip.open(self.fp, 'wt') as fh:
+            fh.write('@s1\nACGT\n+\nIIII\n' * 1000)
+
+        n_threads = threading.active_count()
+        with patch('q2_types.multiplexed_sequences._deferred_setup.'
+                   '_transformers._FASTQ_READ_SIZE', 64):
+            obs = _read_fastq_seqs(self.fp)
+            self.assertEqual(next(obs), ('@s1', 'ACGT', '+', 'IIII'))
+            self.assertEqual(threading.active_count(), n_threads + 1)
+            del obs
+        self.assertEqual(threading.active_count(), n_threads)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -7,16 +7,12 @@
 # ----------------------------------------------------------------------------
 
 import os
-import shutil
 import functools
-import re
 import warnings
-import skbio
 import yaml
 import pandas as pd
 
-import qiime2.util
-
+from q2_types._util import _duplicate
 from q2_types.feature_data import DNAFASTAFormat
 
 from .. import (
@@ -50,6 +46,7 @@ from .._util import (
     _fastq_manifest_helper,
     _phred64_warning,
     _write_phred64_to_phred33,
+    _write_qiime1_demux_fasta,
     _manifest_v2_to_v1,
     _manifest_to_df,
     _mag_manifest_helper
@@ -146,8 +143,7 @@ def _7(dirfmt: SingleLanePerSamplePairedEndFastqDirFmt) \
     result = SingleLanePerSampleSingleEndFastqDirFmt()
     result.manifest.write_data(output_manifest, FastqManifestFormat)
     for _, _, filename, _ in output_df.itertuples():
-        qiime2.util.duplicate(str(dirfmt.path / filename),
-                              str(result.path / filename))
+        _duplicate(str(dirfmt.path / filename), str(result.path / filename))
 
     metadata = YamlFormat()
     metadata.path.write_text(yaml.dump({'phred-offset': 33}))
@@ -194,24 +190,11 @@ def _12(dirfmt: SingleLanePerSampleSingleEndFastqDirFmt) \
             fh, single_end=True, absolute=False)
 
     result = QIIME1DemuxDirFmt()
-    fp = str(result.path / 'seqs.fna')
-    with open(fp, 'w') as fh:
-        i = 0
-        for r in input_manifest.iterrows():
-            sample_id = r[1]['sample-id']
-            filename = r[1]['filename']
-            if re.search(r"\s", sample_id) is not None:
-                raise ValueError(
-                    "Whitespace was found in the ID for sample %s. Sample "
-                    "IDs with whitespace are incompatible with FASTA."
-                    % sample_id)
-            fq_reader = skbio.io.read('%s/%s' % (str(dirfmt), filename),
-                                      format='fastq', constructor=skbio.DNA,
-                                      phred_offset=33, verify=False)
-            for seq in fq_reader:
-                seq.metadata['id'] = '%s_%d' % (sample_id, i)
-                seq.write(fh)
-                i += 1
+    _write_qiime1_demux_fasta(
+        [(sample_id, '%s/%s' % (str(dirfmt), filename))
+         for sample_id, filename in zip(input_manifest['sample-id'],
+                                        input_manifest['filename'])],
+        str(result.path / 'seqs.fna'))
 
     return result
 
@@ -287,7 +270,7 @@ def _21(dirfmt: MultiMAGSequencesDirFmt) \
     for sample_id, mag in dirfmt.sample_dict().items():
         os.makedirs(os.path.join(result.path, sample_id))
         for mag_id, mag_fp in mag.items():
-            shutil.copy(
+            _duplicate(
                 mag_fp, os.path.join(result.path, sample_id, f"{mag_id}.fa")
             )
     return result
@@ -10,7 +10,6 @@ import os
 import re
 import itertools
 import collections
-import pathlib
 import subprocess
 
 import pandas as pd
@@ -24,8 +23,10 @@ from qiime2.plugin import ValidationError
 
 from q2_types.bowtie2 import Bowtie2IndexDirFmt
 from q2_types.feature_data import DNAFASTAFormat
-from ._util import _parse_sequence_filename, _manifest_to_df
-from .._util import FastqGzFormat
+from .._util import (
+    FastqGzFormat, _get_n_jobs, _paths_exist, _validate_files,
+    _validated_files
+)
 
 
 class FastqAbsolutePathManifestFormatV2(model.TextFileFormat):
@@ -51,16 +52,23 @@ class FastqAbsolutePathManifestFormatV2(model.TextFileFormat):
             except ValueError as md_exc:
                 raise ValidationError(md_exc) from md_exc
 
+        columns = {column_name: column.to_series()
+                   for column_name, column in md_cols.items()}
+        # The filepaths are looked up all at once, and concurrently, before
+        # the records are checked in order.
+        exists = _paths_exist(
+            os.path.expandvars(fp) for column in columns.values()
+            for fp in column.dropna())
+
         filepaths = dict()
-        for column_name, column in md_cols.items():
-            column = column.to_series()
+        for column_name, column in columns.items():
             for i, (id_, fp) in enumerate(column.items(), start=1):
                 # QIIME 2 represents empty cells as np.nan once normalized
                 if pd.isna(fp):
                     raise ValidationError(
                         'Missing filepath on line %d and column "%s".'
                         % (i, column_name))
-                if not os.path.exists(os.path.expandvars(fp)):
+                if not exists[os.path.expandvars(fp)]:
                     raise ValidationError(
                         'Filepath on line %d and column "%s" could not '
                         'be found (%s) for sample "%s".'
@@ -229,7 +237,32 @@ class YamlFormat(model.TextFileFormat):
         return True
 
 
-class CasavaOneEightSingleLanePerSampleDirFmt(model.DirectoryFormat):
+class _ParallelValidationMixin:
+    """Validate the `sequences` of a directory format in parallel.
+
+    With more than one job (see `q2_types._util._get_n_jobs`), the files in
+    the `sequences` collection are validated by a pool of processes before
+    the rest of the directory, which then does not validate them again. If
+    several files are invalid, the error is reported for the one with the
+    lowest filename.
+
+    """
+    def validate(self, level='max'):
+        n_jobs = _get_n_jobs()
+        if n_jobs < 2 or not self.path.is_dir():
+            return super().validate(level)
+
+        paths = sorted(
+            p for p in self.path.iterdir()
+            if p.is_file() and not p.name.startswith('.')
+            and re.fullmatch(self.sequences.pathspec, p.name))
+        _validate_files(self.sequences.format, paths, level, n_jobs)
+        with _validated_files(paths, level):
+            return super().validate(level)
+
+
+class CasavaOneEightSingleLanePerSampleDirFmt(_ParallelValidationMixin,
+                                              model.DirectoryFormat):
     _CHECK_PAIRED = True
     _REQUIRE_PAIRED = False
 
@@ -248,14 +281,33 @@ class CasavaOneEightSingleLanePerSampleDirFmt(model.DirectoryFormat):
 
     @property
     def manifest(self):
-        tmp_manifest = FastqManifestFormat()
-        with tmp_manifest.open() as fh:
-            fh.write('sample-id,filename,direction\n')
-            for fp, _ in self.sequences.iter_views(FastqGzFormat):
-                sample_id, _, _, _, direction = _parse_sequence_filename(fp)
-                fh.write('%s,%s,%s\n' % (sample_id, fp.name, direction))
-
-        df = _manifest_to_df(tmp_manifest, self.path.parent)
+        # Built from a single listing of the directory, and rebuilt only
+        # when its modification time changes.
+        mtime = self.path.stat().st_mtime_ns
+        cached = getattr(self, '_manifest', None)
+        if cached is None or cached[0] != mtime:
+            self._manifest = cached = (mtime, self._build_manifest())
+        return cached[1].copy()
+
+    def _build_manifest(self):
+        pathspec = re.compile(self.sequences.pathspec)
+        filenames = pd.Series(sorted(
+            entry.name for entry in os.scandir(self.path)
+            if entry.is_file() and pathspec.fullmatch(entry.name)),
+            dtype=object)
+
+        # Parsed as _parse_sequence_filename does
+        fields = filenames.str.replace('.fastq.gz', '', regex=False) \
+            .str.rsplit('_', n=4)
+        manifest = pd.DataFrame({
+            'sample-id': fields.str[0],
+            'direction': fields.str[3].map({'R1': 'forward',
+                                            'R2': 'reverse'}),
+            'filename': str(self.path) + os.sep + filenames})
+
+        df = manifest.pivot(index='sample-id', columns='direction',
+                            values='filename')
+        df.columns.name = None
 
         if 'reverse' not in df:
             df['reverse'] = None
@@ -263,14 +315,6 @@ class CasavaOneEightSingleLanePerSampleDirFmt(model.DirectoryFormat):
         if 'forward' not in df:
             df['forward'] = None
 
-        def munge_fn_closure(val):
-            if val is not None:
-                return str(self.path / pathlib.Path(val).name)
-            return val
-
-        for column in {'forward', 'reverse'}:
-            df[column] = df[column].apply(munge_fn_closure)
-
         return df
 
     def _validate_(self, level):
@@ -327,7 +371,8 @@ class SingleLanePerSamplePairedEndFastqDirFmt(_SingleLanePerSampleFastqDirFmt):
     _REQUIRE_PAIRED = True
 
 
-class CasavaOneEightLanelessPerSampleDirFmt(model.DirectoryFormat):
+class CasavaOneEightLanelessPerSampleDirFmt(_ParallelValidationMixin,
+                                            model.DirectoryFormat):
     sequences = model.FileCollection(r'.+_.+_R[12]_001\.fastq\.gz',
                                      format=FastqGzFormat)
 
@@ -6,13 +6,11 @@
 # The full license is in the file LICENSE, distributed with this software.
 # ----------------------------------------------------------------------------
 import os
-import shutil
 
 import numpy as np
 import pandas as pd
-from qiime2.util import duplicate
 
-from q2_types._util import _validate_num_partitions
+from q2_types._util import _duplicate, _validate_num_partitions
 from q2_types.per_sample_sequences import MultiMAGSequencesDirFmt
 
 
@@ -43,7 +41,7 @@ def partition_sample_data_mags(
             for sample_id, mag_dict in sample_dict.items():
                 for mag_id, mag_fp in mag_dict.items():
                     os.makedirs(result.path / sample_id, exist_ok=True)
-                    duplicate(
+                    _duplicate(
                         mag_fp,
                         result.path / sample_id / os.path.basename(mag_fp)
                     )
@@ -77,13 +75,15 @@ def collate_sample_data_mags(
 
                 # For every mag in the sample
                 for mag in sample.iterdir():
-                    duplicate(mag, collated_mags.path / sample.name / mag.name)
+                    _duplicate(mag,
+                               collated_mags.path / sample.name / mag.name)
 
             # If its a file, it should be the manifest
             # Since its present many times it will be overwritten, but that ok
             else:
                 manifest = file_or_dir
                 # Overwrite is necessary
-                shutil.copy(manifest, collated_mags.path / manifest.name)
+                _duplicate(manifest, collated_mags.path / manifest.name,
+                           overwrite=True)
 
     return collated_mags
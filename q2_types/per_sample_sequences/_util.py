@@ -6,17 +6,26 @@
 # The full license is in the file LICENSE, distributed with this software.
 # ----------------------------------------------------------------------------
 
+import bz2
 import collections
+import functools
 import gzip
+import io
+import itertools
 import os
 import re
 import shutil
+import tempfile
 
 import pandas as pd
 import qiime2.util
 import skbio
 import yaml
 
+from q2_types._util import (
+    _duplicate, _get_n_jobs, _open_gzip_writer, _parallel_map, _paths_exist
+)
+
 
 # Note: we DI all of the formats into these utils so that we don't wind
 # up in circular import mayhem. That is all.
@@ -87,7 +96,7 @@ def _dirfmt_to_casava(dirfmt_in, manifest_fmt, abs_manifest_fmt, fastq_fmt,
     for fastq, _ in dirfmt_in.sequences.iter_views(fastq_fmt):
         from_fp = str(dirfmt_in.path / fastq.name)
         to_fp = str(dirfmt_out.path / fastq.name)
-        qiime2.util.duplicate(from_fp, to_fp)
+        _duplicate(from_fp, to_fp)
     return dirfmt_out
 
 
@@ -104,30 +113,44 @@ def _parse_and_validate_manifest(manifest_fh, single_end, absolute,
                        absolute else manifest_fmt.EXPECTED_HEADER)
     _validate_header(manifest, expected_header)
 
-    for idx in manifest.index:
-        record = manifest.loc[idx]
-        if record.isnull().any():
+    # The records are checked column-wise, but the error raised is still the
+    # one for the first invalid record: empty cells and misplaced paths are
+    # found up front, and only the files listed before those are looked up.
+    filepath = expected_header[1]
+    empty = manifest.isnull().any(axis=1)
+    paths = manifest[filepath].fillna('').map(os.path.expandvars)
+    misplaced = paths.map(os.path.isabs) != absolute
+    invalid = (empty | misplaced).to_numpy()
+    first_invalid = invalid.argmax() if invalid.any() else len(manifest)
+
+    checked = paths.iloc[:first_invalid]
+    if not absolute:
+        checked = checked.map(functools.partial(
+            os.path.join, os.path.dirname(manifest_fh.name)))
+    exists = checked.map(_paths_exist(checked)).to_numpy(dtype=bool)
+    if not exists.all():
+        raise FileNotFoundError(
+            'A path specified in the manifest does not exist '
+            'or is not accessible: '
+            '%s' % checked.iloc[exists.argmin()])
+
+    if first_invalid < len(manifest):
+        if empty.iloc[first_invalid]:
             raise ValueError('Empty cells are not supported in '
                              'manifest files. Found one or more '
                              'empty cells in this record: %s'
-                             % ','.join(map(str, record)))
-        record[expected_header[1]] = \
-            os.path.expandvars(record[expected_header[1]])
-        path = record[expected_header[1]]
+                             % ','.join(map(str,
+                                            manifest.iloc[first_invalid])))
+        path = paths.iloc[first_invalid]
         if absolute:
-            if not os.path.isabs(path):
-                raise ValueError('All paths provided in manifest must be '
-                                 'absolute but found relative path: %s' % path)
+            raise ValueError('All paths provided in manifest must be '
+                             'absolute but found relative path: %s' % path)
         else:
-            if os.path.isabs(path):
-                raise ValueError('All paths provided in manifest must be '
-                                 'relative but found absolute path: %s' % path)
-            path = os.path.join(os.path.dirname(manifest_fh.name), path)
-        if not os.path.exists(path):
-            raise FileNotFoundError(
-                'A path specified in the manifest does not exist '
-                'or is not accessible: '
-                '%s' % path)
+            raise ValueError('All paths provided in manifest must be '
+                             'relative but found absolute path: %s' % path)
+
+    # Later steps use the paths with their environment variables expanded.
+    manifest[filepath] = paths
 
     if single_end:
         _validate_single_end_fastq_manifest_directions(manifest)
@@ -225,17 +248,17 @@ def _validate_paired_end_fastq_manifest_directions(manifest):
                              % ', '.join(reverse_but_no_forward))
 
 
-def _copy_with_compression(src, dst):
+def _copy_with_compression(src, dst, compresslevel=None, n_jobs=None):
     with open(src, 'rb') as src_fh:
         if src_fh.read(2)[:2] != b'\x1f\x8b':
             src_fh.seek(0)
             # SO: http://stackoverflow.com/a/27069578/579416
             # shutil.copyfileobj will pick a pretty good chunksize for us
-            with gzip.open(dst, 'wb') as dst_fh:
+            with _open_gzip_writer(dst, compresslevel, n_jobs) as dst_fh:
                 shutil.copyfileobj(src_fh, dst_fh)
                 return
 
-    qiime2.util.duplicate(src, dst)
+    _duplicate(src, dst)
 
 
 def _fastq_manifest_helper(fmt, fastq_copy_fn, single_end, se_fmt, pe_fmt,
@@ -254,6 +277,8 @@ def _fastq_manifest_helper(fmt, fastq_copy_fn, single_end, se_fmt, pe_fmt,
         result = pe_fmt()
 
     output_manifest_data = []
+    input_fastq_fps = []
+    output_fastq_fps = []
     for idx, sample_id, input_fastq_fp, direction in \
             input_manifest.itertuples():
         read_number = direction_to_read_number[direction]
@@ -267,7 +292,18 @@ def _fastq_manifest_helper(fmt, fastq_copy_fn, single_end, se_fmt, pe_fmt,
                                         read_number=read_number)
         output_manifest_data.append(
             [sample_id, output_fastq_fp.name, direction])
-        fastq_copy_fn(input_fastq_fp, str(output_fastq_fp))
+        input_fastq_fps.append(input_fastq_fp)
+        output_fastq_fps.append(str(output_fastq_fp))
+
+    # The files are independent, so they are copied (and compressed or
+    # converted) by a pool of processes when Q2_TYPES_N_JOBS allows. Jobs
+    # left over once each file has a process go to compressing each file
+    # with several threads.
+    n_jobs = _get_n_jobs()
+    fastq_copy_fn = functools.partial(
+        fastq_copy_fn, n_jobs=max(n_jobs // len(input_fastq_fps), 1))
+    _parallel_map(fastq_copy_fn, input_fastq_fps, output_fastq_fps,
+                  n_jobs=n_jobs)
 
     output_manifest = manifest_fmt()
     output_manifest_df = \
@@ -283,20 +319,235 @@ def _fastq_manifest_helper(fmt, fastq_copy_fn, single_end, se_fmt, pe_fmt,
     return result
 
 
-_phred64_warning = ('Importing of PHRED 64 data is slow as it is converted '
-                    'internally to PHRED 33. Working with the imported data '
-                    'will not be slower than working with PHRED 33 data.')
-
-
-def _write_phred64_to_phred33(phred64_path, phred33_path):
-    with open(phred64_path, 'rb') as phred64_fh, \
-         open(phred33_path, 'wb') as phred33_fh:
-        for seq in skbio.io.read(phred64_fh, format='fastq',
-                                 variant='illumina1.3'):
-            skbio.io.write(seq, into=phred33_fh,
-                           format='fastq',
-                           variant='illumina1.8',
-                           compression='gzip')
+_phred64_warning = ('PHRED 64 data is converted internally to PHRED 33 on '
+                    'import. Working with the imported data will not be '
+                    'slower than working with PHRED 33 data.')
+
+_FASTQ_READ_SIZE = 8 * 1024 * 1024
+# Records the fast path can re-encode without changing anything but the
+# qualities: skbio writes headers as 'id description', sequences on one line
+# and a bare '+' separator.
+_FASTQ_HEADER = re.compile(rb'@[!-~]+(?: [!-~](?:[ -~]*[!-~])?)?')
+_FASTQ_SEQUENCE = re.compile(rb'[!-*,-?A-~][!-~]*')
+# Phred+64 covers '@' (0) to '~' (62); Phred+33 is 31 characters lower.
+_PHRED64 = bytes(range(64, 127))
+_PHRED64_TO_PHRED33 = bytes.maketrans(_PHRED64, bytes(range(33, 96)))
+# Sequences skbio.DNA takes as they are, and Phred+33 '!' (0) to '~' (93).
+_DNA_SEQUENCE = re.compile(rb'[ACGTRYKMSWBDHVN.-]+')
+_PHRED33 = bytes(range(33, 127))
+
+
+def _open_fastq(path):
+    with open(path, 'rb') as fh:
+        magic = fh.read(3)
+    if magic[:2] == b'\x1f\x8b':
+        return gzip.open(path, 'rb')
+    if magic == b'BZh':
+        return bz2.open(path, 'rb')
+    return open(path, 'rb')
+
+
+def _split_fastq_block(lines, sequence, qualities):
+    # Splits whole 4-line records into their headers, sequences and
+    # qualities, or returns None if any of them needs skbio.
+    headers = lines[0::4]
+    seqs = lines[1::4]
+    seps = lines[2::4]
+    quals = lines[3::4]
+    if not (all(map(_FASTQ_HEADER.fullmatch, headers))
+            and all(map(sequence.fullmatch, seqs))
+            and (seps.count(b'+') == len(seps)
+                 or all(sep == b'+' or sep == b'+' + header[1:]
+                        for header, sep in zip(headers, seps)))
+            and list(map(len, seqs)) == list(map(len, quals))
+            and not b''.join(quals).translate(None, qualities)):
+        return None
+    return headers, seqs, quals
+
+
+def _iter_fastq_blocks(fh, sequence, qualities):
+    """Yield the headers, sequences and qualities of the records in `fh`.
+
+    `fh` is read a block of whole 4-line records at a time, on bytes. From
+    the first block with anything in it that skbio would not read as it is
+    (wrapped or blank lines, whitespace to normalize, sequences not matching
+    `sequence`, quality characters not in `qualities`, ...), None is yielded
+    instead, and `fh` is left at the start of that block for skbio to read
+    the rest of it.
+
+    """
+    offset = 0
+    leftover = b''
+    while True:
+        data = fh.read(_FASTQ_READ_SIZE)
+        lines = (leftover + data).split(b'\n')
+        n_lines = (len(lines) - 1) // 4 * 4
+        records = _split_fastq_block(lines[:n_lines], sequence, qualities)
+        if records is None:
+            break
+
+        done = not data and lines[n_lines:] == [b'']
+        if not done:
+            # Hold back the last record: if skbio has to take over, it
+            # needs to see it to treat the line following it as before.
+            n_lines = max(n_lines - 4, 0)
+        if n_lines:
+            yield tuple(field[:n_lines // 4] for field in records)
+            offset += sum(map(len, lines[:n_lines])) + n_lines
+        leftover = b'\n'.join(lines[n_lines:])
+        if done:
+            return
+        if not data:
+            break
+
+    fh.seek(offset)
+    yield None
+
+
+def _write_phred64_to_phred33(phred64_path, phred33_path, compresslevel=None,
+                              n_jobs=None):
+    """Re-encode a Phred+64 FASTQ file as gzipped Phred+33.
+
+    The output is what skbio writes when reading `phred64_path` as
+    'illumina1.3' and writing 'illumina1.8', but records are converted a
+    block at a time on bytes (see `_iter_fastq_blocks`). From the first
+    block with anything unusual in it, the rest of the file goes through
+    skbio, which also produces the errors. The output is compressed as
+    `q2_types._util._open_gzip_writer` does.
+
+    """
+    with _open_fastq(phred64_path) as phred64_fh, \
+            _open_gzip_writer(phred33_path, compresslevel,
+                              n_jobs) as phred33_fh:
+        for records in _iter_fastq_blocks(phred64_fh, _FASTQ_SEQUENCE,
+                                          _PHRED64):
+            if records is None:
+                break
+            headers, seqs, quals = records
+            lines = [b'+'] * (4 * len(headers))
+            lines[0::4] = headers
+            lines[1::4] = seqs
+            lines[3::4] = map(bytes.translate, quals,
+                              itertools.repeat(_PHRED64_TO_PHRED33))
+            phred33_fh.write(b'\n'.join(lines) + b'\n')
+        else:
+            return
+
+        # skbio only takes file objects it can recognise.
+        phred64_text = io.TextIOWrapper(phred64_fh, encoding='utf-8')
+        phred33_text = io.TextIOWrapper(phred33_fh, encoding='utf-8',
+                                        newline='')
+        try:
+            skbio.io.write(skbio.io.read(phred64_text, format='fastq',
+                                         variant='illumina1.3'),
+                           into=phred33_text, format='fastq',
+                           variant='illumina1.8')
+        finally:
+            phred64_text.detach()
+            phred33_text.detach()
+
+
+def _iter_fastq_as_fasta(path):
+    # Yields the header suffixes (' description', or nothing) and sequences
+    # of the records in a FASTQ file, a block at a time, as skbio reads them
+    # with phred_offset=33.
+    with _open_fastq(path) as fh:
+        for records in _iter_fastq_blocks(fh, _DNA_SEQUENCE, _PHRED33):
+            if records is None:
+                break
+            headers, seqs, _ = records
+            yield [b''.join(header.partition(b' ')[1:])
+                   for header in headers], seqs
+        else:
+            return
+
+        text = io.TextIOWrapper(fh, encoding='utf-8')
+        try:
+            reader = skbio.io.read(text, format='fastq',
+                                   constructor=skbio.DNA, phred_offset=33,
+                                   verify=False)
+            for batch in iter(lambda: list(itertools.islice(reader, 10000)),
+                              []):
+                yield ([(' %s' % seq.metadata['description']).encode()
+                        if seq.metadata['description'] else b''
+                        for seq in batch],
+                       [str(seq).encode() for seq in batch])
+        finally:
+            text.detach()
+
+
+def _write_fasta_shard(fastq_path, shard_path):
+    with open(shard_path, 'wb') as fh:
+        for suffixes, seqs in _iter_fastq_as_fasta(fastq_path):
+            fh.write(b''.join(b'%s\n%s\n' % record
+                              for record in zip(suffixes, seqs)))
+
+
+def _iter_fasta_shard(shard_path):
+    with open(shard_path, 'rb') as fh:
+        leftover = b''
+        for data in iter(functools.partial(fh.read, _FASTQ_READ_SIZE), b''):
+            lines = (leftover + data).split(b'\n')
+            n_lines = (len(lines) - 1) // 2 * 2
+            yield lines[0:n_lines:2], lines[1:n_lines:2]
+            leftover = b'\n'.join(lines[n_lines:])
+
+
+def _write_qiime1_demux_records(blocks, fh, sample_id, start):
+    sample_id = sample_id.encode('utf-8')
+    for suffixes, seqs in blocks:
+        fh.write(b''.join(
+            b'>%s_%d%s\n%s\n' % (sample_id, i, suffix, seq)
+            for i, suffix, seq in zip(itertools.count(start), suffixes,
+                                      seqs)))
+        start += len(seqs)
+    return start
+
+
+def _write_qiime1_demux_fasta(samples, fasta_path, n_jobs=None):
+    """Write the reads of each of `samples` to a QIIME 1 demux FASTA file.
+
+    `samples` are pairs of sample IDs and FASTQ file paths. Reads are named
+    `<sample id>_<i>`, with `i` counting reads across all of the samples in
+    order, and keep their description. The FASTQ files are read as
+    `_iter_fastq_blocks` does, falling back to skbio. When `n_jobs` allows,
+    each file is converted by a pool of processes into a temporary shard,
+    and the shards are then numbered and concatenated in order.
+
+    """
+    n_jobs = _get_n_jobs(n_jobs)
+    samples = list(samples)
+    # Samples before one with an invalid ID are converted first, in case
+    # one of them is invalid too.
+    invalid = None
+    for n, (sample_id, _) in enumerate(samples):
+        if re.search(r"\s", sample_id) is not None:
+            invalid = sample_id
+            samples = samples[:n]
+            break
+
+    with open(fasta_path, 'wb') as fh:
+        i = 0
+        if n_jobs < 2 or len(samples) < 2:
+            for sample_id, fastq_path in samples:
+                i = _write_qiime1_demux_records(
+                    _iter_fastq_as_fasta(fastq_path), fh, sample_id, i)
+        else:
+            with tempfile.TemporaryDirectory() as shard_dir:
+                shard_paths = [os.path.join(shard_dir, str(n))
+                               for n in range(len(samples))]
+                _parallel_map(_write_fasta_shard,
+                              [fastq_path for _, fastq_path in samples],
+                              shard_paths, n_jobs=n_jobs)
+                for (sample_id, _), shard_path in zip(samples, shard_paths):
+                    i = _write_qiime1_demux_records(
+                        _iter_fasta_shard(shard_path), fh, sample_id, i)
+
+    if invalid is not None:
+        raise ValueError(
+            "Whitespace was found in the ID for sample %s. Sample "
+            "IDs with whitespace are incompatible with FASTA."
+            % invalid)
 
 
 def _manifest_v2_to_v1(fmt, manifest_fmt):
@@ -138,6 +138,20 @@ class TestAbsoluteFastqManifestV2Formats(TestPluginBase):
                     'line 1.*absolute-filepath.*Human-Kneecap'):
                 fmt(manifest, mode='r').validate()
 
+    def test_path_not_found_column_order(self):
+        s1 = self.get_data_path('Human-Kneecap_S1_L001_R1_001.fastq.gz')
+        s2 = self.get_data_path('Human-Armpit.fastq.gz')
+        missing = os.path.join(self.temp_dir.name, 'missing.fastq.gz')
+        fp = self.get_data_path('absolute_manifests_v2/paired-MANIFEST')
+        manifest = self.template_manifest(fp, {'s1f': s1, 's1r': missing,
+                                               's2f': missing, 's2r': s2})
+
+        for fmt in self.pe_formats:
+            with self.assertRaisesRegex(
+                    ValidationError,
+                    'line 2.*"forward-absolute-filepath".*Peanut-Eyeball'):
+                fmt(manifest, mode='r').validate()
+
     def test_duplicate_filepaths(self):
         s1 = self.get_data_path('Human-Kneecap_S1_L001_R1_001.fastq.gz')
         fp = self.get_data_path('absolute_manifests_v2/single-MANIFEST')
@@ -348,6 +362,38 @@ class TestFormats(TestPluginBase):
         self.assertTrue(True)
         self.assertIsInstance(format.manifest, pd.DataFrame)
 
+    def test_casava_one_eight_slanepsample_dir_fmt_manifest_cached(self):
+        for filename in ('Human-Kneecap_S1_L001_R1_001.fastq.gz',
+                         'paired_end_data/Human-Kneecap_S1_L001_R2_001.'
+                         'fastq.gz'):
+            shutil.copy(self.get_data_path(filename), self.temp_dir.name)
+        path = Path(self.temp_dir.name)
+
+        format = CasavaOneEightSingleLanePerSampleDirFmt(path, mode='r')
+
+        obs = format.manifest
+        exp = pd.DataFrame(
+            {'forward': [str(path / 'Human-Kneecap_S1_L001_R1_001.fastq.gz')],
+             'reverse': [str(path / 'Human-Kneecap_S1_L001_R2_001.fastq.gz')]},
+            index=pd.Index(['Human-Kneecap'], name='sample-id'))
+        pd.testing.assert_frame_equal(obs, exp, check_dtype=False,
+                                      check_index_type=False)
+
+        # callers get their own copy of the cached manifest
+        obs.loc['Human-Kneecap', 'forward'] = None
+        pd.testing.assert_frame_equal(format.manifest, exp, check_dtype=False,
+                                      check_index_type=False)
+
+        # and it is rebuilt once the directory changes
+        shutil.copy(self.get_data_path('Human-Armpit_S2_L001_R1_001.fastq.gz'),
+                    path)
+        os.utime(path, ns=(0, 0))
+        obs = format.manifest
+        self.assertEqual(list(obs.index), ['Human-Armpit', 'Human-Kneecap'])
+        self.assertEqual(obs.loc['Human-Armpit', 'forward'],
+                         str(path / 'Human-Armpit_S2_L001_R1_001.fastq.gz'))
+        self.assertIsNone(obs.loc['Human-Armpit', 'reverse'])
+
     def test_casava_one_eight_slanepsample_dir_fmt_validate_negative(self):
         filepath = self.get_data_path('not-fastq.fastq.gz')
         shutil.copy(filepath, self.temp_dir.name)
@@ -359,6 +405,33 @@ class TestFormats(TestPluginBase):
                                     'CasavaOneEightSingleLanePer'):
             format.validate()
 
+    def test_casava_one_eight_slanepsample_dir_fmt_validate_parallel(self):
+        for filename in ('Human-Kneecap_S1_L001_R1_001.fastq.gz',
+                         'Human-Armpit_S2_L001_R1_001.fastq.gz'):
+            shutil.copy(self.get_data_path(filename), self.temp_dir.name)
+
+        format = CasavaOneEightSingleLanePerSampleDirFmt(
+            self.temp_dir.name, mode='r')
+
+        with patch.dict(os.environ, {'Q2_TYPES_N_JOBS': '2'}):
+            format.validate()
+
+    def test_casava_one_eight_slanepsample_dir_fmt_parallel_first_error(self):
+        for filename, data in (('c_S3_L001_R1_001.fastq.gz', 'mixed-case'),
+                               ('b_S2_L001_R1_001.fastq.gz', 'invalid-sep'),
+                               ('a_S1_L001_R1_001.fastq.gz',
+                                'Human-Kneecap_S1_L001_R1_001')):
+            shutil.copy(self.get_data_path('%s.fastq.gz' % data),
+                        os.path.join(self.temp_dir.name, filename))
+
+        format = CasavaOneEightSingleLanePerSampleDirFmt(
+            self.temp_dir.name, mode='r')
+
+        with patch.dict(os.environ, {'Q2_TYPES_N_JOBS': '2'}):
+            with self.assertRaisesRegex(ValidationError,
+                                        r'b_S2_L001_R1_001(.|\n)*separator'):
+                format.validate()
+
     def test_casava_one_eight_slanepsample_dir_fmt_subdirectories(self):
         bad_dir = os.path.join(self.temp_dir.name, 'Human_Kneecap')
         os.mkdir(bad_dir)
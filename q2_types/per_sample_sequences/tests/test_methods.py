@@ -101,3 +101,13 @@ class TestSampleDataMAGsPartitionCollating(TestPluginBase):
             ["d65a71fa-4279-4588-b937-0747ed5d604d.fasta"],
             dircmp.common
         )
+
+    def test_collate_sample_data_mags_name_collision(self):
+        p1 = self.get_data_path("partitioned_mags/mag1")
+        mags = [
+            MultiMAGSequencesDirFmt(p1, mode="r"),
+            MultiMAGSequencesDirFmt(p1, mode="r")
+        ]
+
+        with self.assertRaises(FileExistsError):
+            collate_sample_data_mags(mags)
@@ -8,11 +8,14 @@
 
 
 import functools
+import gzip
+import itertools
 import unittest
 import os
 import io
 import shutil
 import string
+from unittest.mock import patch
 
 import skbio
 import yaml
@@ -48,7 +51,10 @@ from q2_types.per_sample_sequences._util import (
     _validate_header,
     _validate_single_end_fastq_manifest_directions,
     _validate_paired_end_fastq_manifest_directions,
-    _parse_and_validate_manifest
+    _parse_and_validate_manifest,
+    _copy_with_compression,
+    _write_phred64_to_phred33,
+    _write_qiime1_demux_fasta
 )
 
 
@@ -686,6 +692,46 @@ class TestFastqManifestTransformers(TestPluginBase):
                         "sampleABC,sampleABC_1_L001_R2_001.fastq.gz,reverse\n")
         self.assertEqual(obs_manifest, exp_manifest)
 
+    def test_paired_end_fastq_manifest_phred33_to_slpspefdf_parallel(self):
+        format_ = PairedEndFastqManifestPhred33
+        transformer = self.get_transformer(
+            format_,
+            SingleLanePerSamplePairedEndFastqDirFmt)
+
+        manifest_fp = os.path.join(self.temp_dir.name, 'manifest')
+        with open(manifest_fp, 'w') as fh:
+            fh.write("sample-id,absolute-filepath,direction\n")
+            for sample_id in ('sampleC', 'sampleA', 'sampleB'):
+                fh.write("%s,%s,forward\n" % (sample_id, self.get_data_path(
+                    'Human-Kneecap_S1_L001_R1_001.fastq')))
+                fh.write("%s,%s,reverse\n" % (sample_id, self.get_data_path(
+                    'Human-Armpit.fastq.gz')))
+
+        with patch.dict(os.environ, {'Q2_TYPES_N_JOBS': '2'}):
+            obs = transformer(format_(manifest_fp, 'r'))
+
+        exp_manifest = ["sample-id,filename,direction"]
+        for i, sample_id in enumerate(('sampleC', 'sampleA', 'sampleB')):
+            forward = '%s_%d_L001_R1_001.fastq.gz' % (sample_id, 2 * i)
+            reverse = '%s_%d_L001_R2_001.fastq.gz' % (sample_id, 2 * i + 1)
+            exp_manifest.append('%s,%s,forward' % (sample_id, forward))
+            exp_manifest.append('%s,%s,reverse' % (sample_id, reverse))
+
+            with gzip.open(os.path.join(str(obs), forward), 'rb') as fh:
+                obs_forward = fh.read()
+            with open(self.get_data_path(
+                    'Human-Kneecap_S1_L001_R1_001.fastq'), 'rb') as fh:
+                self.assertEqual(obs_forward, fh.read())
+
+            with open(os.path.join(str(obs), reverse), 'rb') as fh:
+                obs_reverse = fh.read()
+            with open(self.get_data_path('Human-Armpit.fastq.gz'),
+                      'rb') as fh:
+                self.assertEqual(obs_reverse, fh.read())
+
+        with open('%s/MANIFEST' % str(obs)) as fh:
+            self.assertEqual(fh.read(), '\n'.join(exp_manifest) + '\n')
+
     def test_paired_end_fastq_manifest_phred64_to_slpspefdf(self):
         format_ = PairedEndFastqManifestPhred64
         transformer = self.get_transformer(
@@ -1002,6 +1048,38 @@ class TestFastqManifestTransformers(TestPluginBase):
 
         self.assertEqual(manifest.iloc[0]['absolute-filepath'], expected_fp)
 
+    def test_parse_and_validate_manifest_first_invalid_record(self):
+        for i in range(100):
+            open(os.path.join(self.temp_dir.name, 's%d.fastq' % i), 'w')
+        records = ['s%d,%s/s%d.fastq,forward' % (i, self.temp_dir.name, i)
+                   for i in range(100)]
+        header = 'sample-id,absolute-filepath,direction\n'
+
+        missing = records.copy()
+        missing[70] = 's70,%s/missing.fastq,forward' % self.temp_dir.name
+        missing[90] = 's90,relative.fastq,forward'
+        with self.assertRaisesRegex(FileNotFoundError, 'missing.fastq'):
+            _parse_and_validate_manifest_partial(
+                io.StringIO(header + '\n'.join(missing)),
+                single_end=True, absolute=True)
+
+        missing[50] = 's50,,forward'
+        with self.assertRaisesRegex(ValueError, 'empty cells.*s50,nan'):
+            _parse_and_validate_manifest_partial(
+                io.StringIO(header + '\n'.join(missing)),
+                single_end=True, absolute=True)
+
+        missing[30] = 's30,relative.fastq,forward'
+        with self.assertRaisesRegex(ValueError, 'relative path: relative'):
+            _parse_and_validate_manifest_partial(
+                io.StringIO(header + '\n'.join(missing)),
+                single_end=True, absolute=True)
+
+        manifest = _parse_and_validate_manifest_partial(
+            io.StringIO(header + '\n'.join(records)),
+            single_end=True, absolute=True)
+        self.assertEqual(len(manifest), 100)
+
     def test_validate_header_valid(self):
         columns = ['sample-id', 'absolute-filepath', 'direction']
         manifest = pd.DataFrame(
@@ -1112,6 +1190,92 @@ class TestFastqManifestTransformers(TestPluginBase):
         with self.assertRaisesRegex(ValueError, 'reverse read record: xyz'):
             _validate_paired_end_fastq_manifest_directions(manifest)
 
+    def test_copy_with_compression(self):
+        in_fp = self.get_data_path('Human-Kneecap_S1_L001_R1_001.fastq')
+        out_fp = os.path.join(self.temp_dir.name, 'out.fastq.gz')
+        with open(in_fp, 'rb') as fh:
+            exp = fh.read()
+
+        for compresslevel, n_jobs in ((1, 1), (6, 2), (9, 3)):
+            _copy_with_compression(in_fp, out_fp, compresslevel, n_jobs)
+
+            FastqGzFormat(out_fp, mode='r').validate()
+            with gzip.open(out_fp, 'rb') as fh:
+                self.assertEqual(fh.read(), exp)
+
+    def test_write_phred64_to_phred33(self):
+        out_fp = os.path.join(self.temp_dir.name, 'out.fastq.gz')
+        for filename in ('s1-phred64.fastq', 's1-phred64.fastq.gz'):
+            _write_phred64_to_phred33(self.get_data_path(filename), out_fp)
+
+            obs = skbio.io.read(out_fp, compression='gzip', format='fastq',
+                                variant='illumina1.8')
+            exp = skbio.io.read(self.get_data_path(filename),
+                                format='fastq', variant='illumina1.3')
+            for o, e in itertools.zip_longest(obs, exp):
+                self.assertEqual(o, e)
+
+    def test_write_phred64_to_phred33_normalizes_records(self):
+        in_fp = os.path.join(self.temp_dir.name, 'in.fastq')
+        out_fp = os.path.join(self.temp_dir.name, 'out.fastq.gz')
+        with open(in_fp, 'w') as fh:
+            fh.write('@r1 a b\nACGT\n+r1 a b\nhhh@\n'
+                     '@r2\tdesc\nAC\nGT\n+\nBBBB\n\n'
+                     '@r3\nA\n+\n~\n')
+
+        _write_phred64_to_phred33(in_fp, out_fp)
+
+        with gzip.open(out_fp, 'rt') as fh:
+            self.assertEqual(fh.read(),
+                             '@r1 a b\nACGT\n+\nIII!\n'
+                             '@r2 desc\nACGT\n+\n####\n'
+                             '@r3\nA\n+\n_\n')
+
+    def test_write_phred64_to_phred33_out_of_range(self):
+        in_fp = os.path.join(self.temp_dir.name, 'in.fastq')
+        out_fp = os.path.join(self.temp_dir.name, 'out.fastq.gz')
+        with open(in_fp, 'w') as fh:
+            fh.write('@r1\nACGT\n+\nhhhh\n@r2\nACGT\n+\nhhI#\n')
+
+        with self.assertRaisesRegex(ValueError, 'out of range'):
+            _write_phred64_to_phred33(in_fp, out_fp)
+
+    def test_write_qiime1_demux_fasta(self):
+        s1 = os.path.join(self.temp_dir.name, 's1.fastq.gz')
+        s2 = os.path.join(self.temp_dir.name, 's2.fastq.gz')
+        with gzip.open(s1, 'wt') as fh:
+            fh.write('@r1 a b\nACGT\n+r1 a b\nIIII\n@r2\nAC.-\n+\n!!~~\n')
+        with gzip.open(s2, 'wt') as fh:
+            fh.write('@r1\nACGT\n+\nIIII\n@r2\tdesc\nAC\nGT\n+\n####\n')
+        out_fp = os.path.join(self.temp_dir.name, 'seqs.fna')
+
+        for n_jobs in (1, 2):
+            _write_qiime1_demux_fasta([('s1', s1), ('s2', s2)], out_fp,
+                                      n_jobs=n_jobs)
+
+            with open(out_fp) as fh:
+                self.assertEqual(fh.read(),
+                                 '>s1_0 a b\nACGT\n>s1_1\nAC.-\n'
+                                 '>s2_2\nACGT\n>s2_3 desc\nACGT\n')
+
+    def test_write_qiime1_demux_fasta_errors(self):
+        s1 = os.path.join(self.temp_dir.name, 's1.fastq.gz')
+        s2 = os.path.join(self.temp_dir.name, 's2.fastq.gz')
+        with gzip.open(s1, 'wt') as fh:
+            fh.write('@r1\nACGT\n+\nIIII\n')
+        with gzip.open(s2, 'wt') as fh:
+            fh.write('@r1\nACGX\n+\nIIII\n')
+        out_fp = os.path.join(self.temp_dir.name, 'seqs.fna')
+
+        for n_jobs in (1, 2):
+            with self.assertRaisesRegex(ValueError, 'X'):
+                _write_qiime1_demux_fasta([('s1', s1), ('s2', s2),
+                                           ('s 3', s1)], out_fp,
+                                          n_jobs=n_jobs)
+            with self.assertRaisesRegex(ValueError, 'space.*s 2'):
+                _write_qiime1_demux_fasta([('s1', s1), ('s 2', s2)], out_fp,
+                                          n_jobs=n_jobs)
+
 
 # NOTE: we are really only interested in the manifest, since these transformers
 # primarily transform the V2 TSV manifests to the (older) CSV manifests. The
@@ -5,9 +5,72 @@
 #
 # The full license is in the file LICENSE, distributed with this software.
 # ----------------------------------------------------------------------------
+import errno
+import gzip
+import io
+import os
+import struct
+import zlib
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_series_equal
+import skbio
 from qiime2.plugin.testing import TestPluginBase
 
-from q2_types._util import _validate_num_partitions, _validate_mag_ids
+from q2_types._util import (
+    _validate_num_partitions, _validate_mag_ids, _get_n_jobs,
+    _parse_fasta, fasta_to_series, _fasta_to_str_series,
+    _skbio_fasta_to_series, _iter_fasta, read_from_fasta, SequenceRecord,
+    _FASTAWriter, _write_series_to_fasta, _index_fasta, _fasta_index,
+    _read_fasta_record, _fasta_to_matrix, _write_uppercase_fasta,
+    _uppercase_fasta_block, _cached_validation, _prefetch, _iter_bgzf,
+    _check_fastq_gz, _UnusualFASTQ, _validate_files, _validated_files,
+    _parallel_map, _BGZFWriter, _open_gzip_writer, _get_gzip_level,
+    _paths_exist, _duplicate, _duplicate_stats, _get_cache_dir, _cache_path
+)
+
+
+def _reciprocal(x):
+    return 1 / x
+
+
+class _PickyFormat:
+    def __init__(self, path, mode):
+        self.path = path
+
+    def validate(self, level):
+        if 'bad' in os.path.basename(self.path):
+            raise ValueError('%s is bad at %s' % (self.path, level))
+
+
+def _bgzf_compress(data, block_size):
+    blocks = []
+    for i in range(0, len(data), block_size):
+        block = data[i:i + block_size]
+        compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+        deflated = compressor.compress(block) + compressor.flush()
+        blocks.append(
+            b'\x1f\x8b\x08\x04\x00\x00\x00\x00\x00\xff\x06\x00BC\x02\x00'
+            + struct.pack('<H', len(deflated) + 25) + deflated
+            + struct.pack('<II', zlib.crc32(block), len(block)))
+    return b''.join(blocks)
+
+
+class _CountingFormat:
+    alphabet = 'ACGT'
+
+    def __init__(self, path):
+        self.path = path
+        self.calls = []
+
+    @_cached_validation
+    def _validate_(self, level):
+        self.calls.append(level)
+        with open(self.path) as fh:
+            if 'X' in fh.read():
+                raise ValueError('X is not allowed.')
 
 
 class TestUtil(TestPluginBase):
@@ -46,3 +109,588 @@ class TestUtil(TestPluginBase):
                 6,
                 [(0, "a"), (0, "a"), (0, "c"), (0, "d"), (0, "e"), (0, "f")]
             )
+
+    def test_get_n_jobs_default(self):
+        with patch.dict(os.environ, clear=True):
+            self.assertEqual(_get_n_jobs(), 1)
+
+    def test_get_n_jobs_from_environment(self):
+        with patch.dict(os.environ, {'Q2_TYPES_N_JOBS': '3'}):
+            self.assertEqual(_get_n_jobs(), 3)
+            self.assertEqual(_get_n_jobs(2), 2)
+
+    def test_get_n_jobs_all_cpus(self):
+        with patch('os.cpu_count', return_value=8):
+            self.assertEqual(_get_n_jobs(0), 8)
+
+    def test_get_n_jobs_invalid(self):
+        with patch.dict(os.environ, {'Q2_TYPES_N_JOBS': 'many'}):
+            with self.assertRaisesRegex(ValueError, 'Q2_TYPES_N_JOBS.*many'):
+                _get_n_jobs()
+        with self.assertRaisesRegex(ValueError, 'non-negative.*-1'):
+            _get_n_jobs(-1)
+
+    def _write_fasta(self, content):
+        fp = os.path.join(self.temp_dir.name, 'seqs.fasta')
+        with open(fp, 'wb') as fh:
+            fh.write(content)
+        return fp
+
+    def test_fasta_to_series_matches_skbio(self):
+        fp = self._write_fasta(b'>s1 some description\r\nACGT\r\nAC\r\n'
+                               b'>s2\tother\nNNNN\n\n>s3\nGGGG')
+
+        self.assertIsNotNone(_parse_fasta(fp))
+        obs = fasta_to_series(fp)
+        exp = _skbio_fasta_to_series(fp, skbio.DNA, False)
+
+        assert_series_equal(obs, exp)
+        self.assertEqual(obs['s1'].metadata,
+                         {'id': 's1', 'description': 'some description'})
+
+    def test_fasta_to_str_series(self):
+        fp = self._write_fasta(b'>s1\nACgt\nac\n>s2\nnnNN\n')
+
+        obs = _fasta_to_str_series(fp, skbio.DNA, lowercase=True)
+
+        exp = pd.Series(['ACGTAC', 'NNNN'], index=['s1', 's2'], dtype=str)
+        assert_series_equal(obs, exp)
+
+    def test_fasta_to_str_series_fallback(self):
+        fp = self._write_fasta(b'>s1 \xc3\xa9\nAC GT\n  AC\n>s2\nNNNN\n')
+
+        self.assertIsNone(_parse_fasta(fp))
+        obs = _fasta_to_str_series(fp)
+
+        exp = pd.Series(['ACGTAC', 'NNNN'], index=['s1', 's2'], dtype=str)
+        assert_series_equal(obs, exp)
+
+    def test_parse_fasta_falls_back(self):
+        for content in (b'>s1\nACGT\n\nACGT\n',
+                        b'>s1\nACGT\n>s2\n',
+                        b'>s1\nACGT\r>s2\nACGT\n',
+                        b'>s1\nACGU\n',
+                        b'\n>s1\nACGT\n'):
+            fp = self._write_fasta(content)
+            self.assertIsNone(_parse_fasta(fp), content)
+
+    def test_fasta_to_series_duplicate_ids(self):
+        fp = self._write_fasta(b'>s1\nACGT\n>s2\nACGT\n>s1\nACGT\n')
+
+        with self.assertRaisesRegex(ValueError, 'unique.*once: s1'):
+            fasta_to_series(fp)
+
+    def test_iter_fasta_matches_skbio(self):
+        fp = self._write_fasta(b'>s1 some description\r\nACGT\r\nAC\r\n'
+                               b'>s2\tother\nNNNN\n\n>s3\nGGGG')
+
+        # Small reads, so that records are split across them.
+        for size in (1, 5, 1024):
+            with patch('q2_types._util._FASTA_READ_SIZE', size):
+                obs = list(_iter_fasta(fp))
+            exp = list(read_from_fasta(fp))
+
+            self.assertEqual(len(obs), 3)
+            for observed, expected in zip(obs, exp):
+                self.assertIsInstance(observed, SequenceRecord)
+                self.assertEqual(observed, expected)
+                self.assertEqual(observed.metadata, expected.metadata)
+
+    def test_iter_fasta_falls_back(self):
+        fp = self._write_fasta(b'>s1\nACGT\n>s2 \xc3\xa9\nAC GT\n>s3\nNNNN\n')
+
+        obs = list(_iter_fasta(fp))
+        exp = list(read_from_fasta(fp))
+
+        self.assertEqual(obs, exp)
+        self.assertEqual(obs[1].description, '\xe9')
+
+    def test_iter_fasta_invalid_characters(self):
+        fp = self._write_fasta(b'>s1\nACGT\n>s2\nACGU\n')
+
+        obs = _iter_fasta(fp)
+
+        self.assertEqual(str(next(obs)), 'ACGT')
+        with self.assertRaisesRegex(ValueError, "record with ID 's2'"):
+            next(obs)
+
+    def test_sequence_record(self):
+        record = SequenceRecord('s1', 'desc', 'ACGTT', constructor=skbio.DNA)
+
+        self.assertEqual(record.id, 's1')
+        self.assertEqual(record.metadata, {'id': 's1', 'description': 'desc'})
+        self.assertEqual(str(record), 'ACGTT')
+        self.assertEqual(len(record), 5)
+        self.assertEqual(
+            record, skbio.DNA('ACGTT', metadata={'id': 's1',
+                                                 'description': 'desc'}))
+        self.assertEqual(str(record.reverse_complement()), 'AACGT')
+        self.assertEqual(str(record[1:3]), 'CG')
+
+        obs = record.to_skbio()
+        self.assertIsInstance(obs, skbio.DNA)
+        self.assertIs(record.to_skbio(), obs)
+
+    def test_sequence_record_without_constructor(self):
+        record = SequenceRecord('s1', '', 'ACGT')
+
+        with self.assertRaisesRegex(TypeError, 'skbio sequence type'):
+            record.to_skbio()
+
+    def test_fasta_writer(self):
+        fh = io.StringIO()
+        with _FASTAWriter(fh, max_width=3) as writer:
+            writer.write('s 1', 'a\ndescription', 'ACGTACG')
+            writer.write_sequence(
+                skbio.DNA('AC', metadata={'id': 's2', 'description': ''}))
+            writer.write_sequence(SequenceRecord('s3', '', 'G'))
+
+        self.assertEqual(fh.getvalue(),
+                         '>s_1 a description\nACG\nTAC\nG\n'
+                         '>s2\nAC\n>s3\nG\n')
+
+    def test_fasta_writer_matches_skbio(self):
+        seqs = [skbio.DNA('ACGT', metadata={'id': 's1\t', 'description': 0}),
+                skbio.DNA('NNNN', metadata={'description': 'a\nb'})]
+        exp = io.StringIO()
+        skbio.io.write((seq for seq in seqs), format='fasta', into=exp)
+
+        obs = io.StringIO()
+        with _FASTAWriter(obs) as writer:
+            for seq in seqs:
+                writer.write_sequence(seq)
+
+        self.assertEqual(obs.getvalue(), exp.getvalue())
+
+    def test_fasta_writer_empty_sequence(self):
+        with _FASTAWriter(io.StringIO()) as writer:
+            writer.write('s1', '', 'ACGT')
+            with self.assertRaisesRegex(ValueError, '2nd sequence.*empty'):
+                writer.write('s2', '', '')
+
+    def test_write_series_to_fasta(self):
+        data = pd.Series(['ACgt', '', skbio.DNA('NN')], index=['s1', 's2', 3])
+
+        fh = io.StringIO()
+        _write_series_to_fasta(fh, data, skbio.DNA, lowercase=True,
+                               skip_empty=True)
+
+        self.assertEqual(fh.getvalue(), '>s1\nACGT\n>3\nNN\n')
+
+    def test_write_series_to_fasta_invalid_characters(self):
+        data = pd.Series(['ACGT', 'ACGU'], index=['s1', 's2'])
+
+        with self.assertRaisesRegex(ValueError, 'Invalid character.*U'):
+            _write_series_to_fasta(io.StringIO(), data, skbio.DNA)
+
+    def test_index_fasta(self):
+        fp = self._write_fasta(b'>s1 desc\r\nACGT\r\n>\tx\nAC\nGT\n\n>s3\nG')
+
+        ids, offsets, lengths = _index_fasta(fp)
+
+        self.assertEqual(ids, ['s1', '', 's3'])
+        self.assertEqual(offsets.tolist(), [0, 16, 27])
+        self.assertEqual(lengths.tolist(), [16, 11, 5])
+
+        with open(fp, 'rb') as fh:
+            obs = [_read_fasta_record(fh, offset, length)
+                   for offset, length in zip(offsets, lengths)]
+        self.assertEqual(obs, list(read_from_fasta(fp)))
+
+    def test_index_fasta_needs_skbio(self):
+        for content in (b'\n>s1\nACGT\n', b'>s1\rACGT\r>s2\rACGT\r',
+                        b'>s1 \xff\nACGT\n'):
+            fp = self._write_fasta(content)
+            self.assertIsNone(_index_fasta(fp), content)
+
+    def test_fasta_index_is_cached(self):
+        fp = self._write_fasta(b'>s1\nACGT\n>s2\nAC\n')
+        cache_dir = os.path.join(self.temp_dir.name, 'cache')
+
+        with patch.dict(os.environ, {'Q2_TYPES_CACHE_DIR': cache_dir}):
+            exp = _fasta_index(fp)
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+
+            with patch('q2_types._util._index_fasta') as index_fasta:
+                obs = _fasta_index(fp)
+            index_fasta.assert_not_called()
+
+        self.assertEqual(obs[0], exp[0])
+        self.assertEqual(obs[1].tolist(), exp[1].tolist())
+        self.assertEqual(obs[2].tolist(), exp[2].tolist())
+
+    def test_fasta_index_rejects_forged_cache(self):
+        fp = self._write_fasta(b'>s1\nACGT\n>s2\nAC\n')
+        cache_dir = os.path.join(self.temp_dir.name, 'cache')
+
+        with patch.dict(os.environ, {'Q2_TYPES_CACHE_DIR': cache_dir}):
+            exp = _fasta_index(fp)
+            cache = _cache_path(fp, '.fasta-index.npz')
+            for offsets, lengths in (([0, 4], [4, 10]), ([0, 10], [10, 4]),
+                                     ([0], [14])):
+                np.savez(cache, offsets=np.array(offsets),
+                         lengths=np.array(lengths),
+                         ids=np.frombuffer(b's2\ns1', dtype=np.uint8))
+                obs = _fasta_index(fp)
+                self.assertEqual(obs[0], exp[0])
+                self.assertEqual(obs[1].tolist(), exp[1].tolist())
+
+    def test_get_cache_dir(self):
+        cache_home = os.path.join(self.temp_dir.name, 'cache-home')
+        exp = os.path.join(cache_home, 'q2-types')
+
+        with patch.dict(os.environ, {'XDG_CACHE_HOME': cache_home}):
+            os.environ.pop('Q2_TYPES_CACHE_DIR', None)
+            self.assertEqual(_get_cache_dir(), exp)
+            self.assertEqual(os.stat(exp).st_mode & 0o777, 0o700)
+
+            with patch('os.getuid', return_value=os.getuid() + 1):
+                with self.assertRaises(PermissionError):
+                    _get_cache_dir()
+
+            os.chmod(exp, 0o777)
+            with self.assertRaises(PermissionError):
+                _get_cache_dir()
+
+    def test_fasta_to_matrix(self):
+        fp = self._write_fasta(b'>s1\nAC-T\n>s2 d\nA\nCGT\n')
+        cache_dir = os.path.join(self.temp_dir.name, 'cache')
+
+        with patch.dict(os.environ, {'Q2_TYPES_CACHE_DIR': cache_dir,
+                                     'Q2_TYPES_ALIGNMENT_CACHE': '0'}):
+            ids, matrix = _fasta_to_matrix(fp)
+            self.assertEqual(ids, ['s1', 's2'])
+            np.testing.assert_array_equal(
+                matrix, np.array([list(b'AC-T'), list(b'ACGT')]))
+            self.assertNotIsInstance(matrix, np.memmap)
+            self.assertEqual(
+                [f for f in os.listdir(cache_dir) if 'alignment' in f], [])
+
+            os.environ['Q2_TYPES_ALIGNMENT_CACHE'] = '1'
+            _fasta_to_matrix(fp)
+            ids, cached = _fasta_to_matrix(fp)
+            self.assertIsInstance(cached, np.memmap)
+            self.assertFalse(cached.flags.writeable)
+            np.testing.assert_array_equal(cached, matrix)
+
+    def test_fasta_to_matrix_without_index(self):
+        fp = self._write_fasta(b'\n>s1\nAC-T\n>s2\nACGT\n')
+
+        ids, matrix = _fasta_to_matrix(fp)
+
+        self.assertEqual(ids, ['s1', 's2'])
+        self.assertEqual(matrix.shape, (2, 4))
+
+    def test_fasta_to_matrix_not_aligned(self):
+        fp = self._write_fasta(b'>s1\nAC-T\n>s2\nACG\n')
+        cache_dir = os.path.join(self.temp_dir.name, 'cache')
+
+        with patch.dict(os.environ, {'Q2_TYPES_CACHE_DIR': cache_dir,
+                                     'Q2_TYPES_ALIGNMENT_CACHE': '1'}):
+            with self.assertRaisesRegex(ValueError, "'s2' has 3 positions"):
+                _fasta_to_matrix(fp)
+            self.assertEqual(
+                [f for f in os.listdir(cache_dir) if 'alignment' in f], [])
+
+    def test_write_uppercase_fasta(self):
+        for content in (b'>s1 desc\nACgt\n>s2\nnnNN\n',
+                        b'>s1  desc \r\nAC\ngt\n\n>s2\nnnNN',
+                        b'>s1\nAC gt\n>s2\nnnNN\n'):
+            fp = self._write_fasta(content)
+            exp = io.StringIO()
+            skbio.io.write(read_from_fasta(fp, lowercase=True),
+                           format='fasta', into=exp)
+
+            obs = io.StringIO()
+            _write_uppercase_fasta(fp, obs)
+
+            self.assertEqual(obs.getvalue(), exp.getvalue(), content)
+
+    def test_uppercase_fasta_block(self):
+        allowed = b'ACGTNacgtn\n'
+
+        self.assertEqual(
+            _uppercase_fasta_block(b'>s1 a b\nacGT\n>s2\nn', allowed),
+            '>s1 a b\nACGT\n>s2\nN\n')
+        for block in (b'>s1\nAC\nGT\n', b'>s1  a\nAC\n', b'>s1\tb\nAC\n',
+                      b'>s1\n\n>s2\nAC\n', b'>s1\nAC-\n'):
+            self.assertIsNone(_uppercase_fasta_block(block, allowed), block)
+
+    def test_write_uppercase_fasta_invalid_characters(self):
+        fp = self._write_fasta(b'>s1\nACGT\n>s2\nACGU\n')
+
+        with self.assertRaisesRegex(ValueError, "record with ID 's2'"):
+            _write_uppercase_fasta(fp, io.StringIO())
+
+    def _validation_cache_env(self, enabled='1'):
+        return patch.dict(os.environ, {
+            'Q2_TYPES_CACHE_DIR': os.path.join(self.temp_dir.name, 'cache'),
+            'Q2_TYPES_VALIDATION_CACHE': enabled})
+
+    def test_cached_validation(self):
+        fp = self._write_fasta(b'>s1\nACGT\n')
+
+        with self._validation_cache_env():
+            fmt = _CountingFormat(fp)
+            fmt._validate_('min')
+            fmt._validate_('min')
+            self.assertEqual(fmt.calls, ['min'])
+
+            # a pass at 'min' says nothing about 'max', but not vice versa
+            fmt._validate_('max')
+            fmt._validate_('max')
+            fmt._validate_('min')
+            self.assertEqual(fmt.calls, ['min', 'max'])
+
+            # the file is validated again once it changes
+            with open(fp, 'ab') as fh:
+                fh.write(b'>s2\nAC\n')
+            fmt._validate_('max')
+            self.assertEqual(fmt.calls, ['min', 'max', 'max'])
+
+    def test_cached_validation_disabled(self):
+        fp = self._write_fasta(b'>s1\nACGT\n')
+
+        with self._validation_cache_env(enabled='0'):
+            fmt = _CountingFormat(fp)
+            fmt._validate_('min')
+            fmt._validate_('min')
+
+        self.assertEqual(fmt.calls, ['min', 'min'])
+        self.assertFalse(
+            os.path.exists(os.path.join(self.temp_dir.name, 'cache')))
+
+    def test_cached_validation_failures_are_not_cached(self):
+        fp = self._write_fasta(b'>s1\nAXGT\n')
+
+        with self._validation_cache_env():
+            fmt = _CountingFormat(fp)
+            for _ in range(2):
+                with self.assertRaisesRegex(ValueError, 'X is not allowed'):
+                    fmt._validate_('min')
+
+        self.assertEqual(fmt.calls, ['min', 'min'])
+
+    def test_cached_validation_unusable_cache(self):
+        fp = self._write_fasta(b'>s1\nACGT\n')
+        cache_dir = os.path.join(self.temp_dir.name, 'cache')
+        os.makedirs(cache_dir)
+        with open(os.path.join(cache_dir, 'validation.sqlite'), 'w') as fh:
+            fh.write('not a database')
+
+        with self._validation_cache_env():
+            fmt = _CountingFormat(fp)
+            fmt._validate_('min')
+            fmt._validate_('min')
+
+        self.assertEqual(fmt.calls, ['min', 'min'])
+
+    def test_cached_validation_foreign_cache(self):
+        fp = self._write_fasta(b'>s1\nACGT\n')
+
+        with self._validation_cache_env():
+            fmt = _CountingFormat(fp)
+            fmt._validate_('min')
+            # Passes recorded by another user are not trusted.
+            with patch('os.getuid', return_value=os.getuid() + 1):
+                fmt._validate_('min')
+
+        self.assertEqual(fmt.calls, ['min', 'min'])
+
+    def _write_fastq_gz(self, content, compress=gzip.compress):
+        fp = os.path.join(self.temp_dir.name, 'reads.fastq.gz')
+        with open(fp, 'wb') as fh:
+            fh.write(compress(content))
+        return fp
+
+    def test_prefetch(self):
+        def numbers():
+            yield from range(3)
+            raise ValueError('out of numbers')
+
+        obs = []
+        with self.assertRaisesRegex(ValueError, 'out of numbers'):
+            for number in _prefetch(numbers(), depth=1):
+                obs.append(number)
+        self.assertEqual(obs, [0, 1, 2])
+
+        self.assertEqual(next(_prefetch(iter(range(100)), depth=1)), 0)
+
+    def test_iter_bgzf(self):
+        data = b''.join(b'@r%d\nACGT\n+\nIIII\n' % i for i in range(100))
+        fp = self._write_fastq_gz(
+            data, lambda data: _bgzf_compress(data, block_size=7))
+
+        with patch('q2_types._util._GZIP_READ_SIZE', 64):
+            self.assertEqual(b''.join(_iter_bgzf(fp, n_jobs=3)), data)
+
+        fp = self._write_fastq_gz(data)
+        with self.assertRaises(_UnusualFASTQ):
+            list(_iter_bgzf(fp, n_jobs=3))
+
+    def test_check_fastq_gz(self):
+        data = b''.join(b'@r%d\nACGT\n+\nIIII\n' % i for i in range(100))
+
+        for compress in (gzip.compress,
+                         lambda data: _bgzf_compress(data, block_size=50)):
+            fp = self._write_fastq_gz(data, compress)
+            with patch('q2_types._util._GZIP_READ_SIZE', 64):
+                _check_fastq_gz(fp, n_jobs=1)
+                _check_fastq_gz(fp, n_jobs=3)
+
+    def test_check_fastq_gz_unusual(self):
+        for data in (b'@r1\nACGT\n+\nIIII\n@r2\nacgt\n+\nIIII\n',
+                     b'@r1\nACGT\n+\nIIII\n@r2\nACGT\n+\nIII\n',
+                     b'@r1\r\nACGT\r\n+\r\nIIII\r\n',
+                     b'@r1 \xc3\xa9\nACGT\n+\nIIII\n',
+                     b'@r1\nACGT\n+\nIIII'):
+            fp = self._write_fastq_gz(data)
+            with self.assertRaises(_UnusualFASTQ, msg=data):
+                _check_fastq_gz(fp)
+
+        fp = self._write_fastq_gz(b'@r1\nACGT\n+\nIIII\n')
+        with open(fp, 'rb') as fh:
+            truncated = fh.read()[:-4]
+        with open(fp, 'wb') as fh:
+            fh.write(truncated)
+        with self.assertRaises(_UnusualFASTQ):
+            _check_fastq_gz(fp)
+
+    def test_validate_files(self):
+        paths = [os.path.join(self.temp_dir.name, name)
+                 for name in ('a', 'b-bad', 'c', 'd-bad')]
+
+        _validate_files(_PickyFormat, paths[::2], 'max', n_jobs=2)
+        for _ in range(3):
+            with self.assertRaisesRegex(ValueError, 'b-bad is bad at min'):
+                _validate_files(_PickyFormat, paths, 'min', n_jobs=2)
+
+    def test_validated_files(self):
+        fp = self._write_fasta(b'>s1\nACGT\n')
+        fmt = _CountingFormat(fp)
+
+        with _validated_files([fp], 'max'):
+            fmt._validate_('max')
+            fmt._validate_('min')
+        fmt._validate_('max')
+
+        self.assertEqual(fmt.calls, ['min', 'max'])
+
+    def test_parallel_map(self):
+        for n_jobs in (1, 3):
+            self.assertEqual(_parallel_map(_reciprocal, [1, 2, 4, 5, 8],
+                                           n_jobs=n_jobs),
+                             [1, 0.5, 0.25, 0.2, 0.125])
+            self.assertEqual(_parallel_map(_reciprocal, [], n_jobs=n_jobs),
+                             [])
+            with self.assertRaises(ZeroDivisionError):
+                _parallel_map(_reciprocal, [1, 0, 2, 0], n_jobs=n_jobs)
+
+    def test_paths_exist(self):
+        paths = []
+        for i in range(100):
+            path = os.path.join(self.temp_dir.name, 'f%d' % i)
+            if i % 3:
+                open(path, 'w').close()
+            paths.extend([path, path])
+
+        with patch('q2_types._util.os.path.exists',
+                   side_effect=os.path.exists) as exists:
+            obs = _paths_exist(paths)
+
+        self.assertEqual(exists.call_count, 100)
+        self.assertEqual(list(obs), paths[::2])
+        self.assertEqual(list(obs.values()),
+                         [bool(i % 3) for i in range(100)])
+        self.assertEqual(_paths_exist([]), {})
+
+    def test_duplicate(self):
+        src = os.path.join(self.temp_dir.name, 'src')
+        dst = os.path.join(self.temp_dir.name, 'dst')
+        data = os.urandom(100000)
+        with open(src, 'wb') as fh:
+            fh.write(data)
+        with open(dst, 'wb') as fh:
+            fh.write(b'replaced')
+
+        with self.assertRaises(FileExistsError):
+            _duplicate(src, dst)
+        with open(dst, 'rb') as fh:
+            self.assertEqual(fh.read(), b'replaced')
+
+        before = _duplicate_stats()
+        _duplicate(src, dst, overwrite=True)
+        stats = _duplicate_stats() - before
+
+        with open(dst, 'rb') as fh:
+            self.assertEqual(fh.read(), data)
+        self.assertEqual(sum(stats[strategy] for strategy in
+                             ('reflink', 'hardlink', 'copy')), 1)
+        self.assertEqual(stats['bytes_copied'],
+                         len(data) if stats['copy'] else 0)
+
+        # Duplicating onto a link of the source leaves the data alone.
+        _duplicate(src, dst, overwrite=True)
+        _duplicate(src, src, overwrite=True)
+        with self.assertRaises(FileExistsError):
+            _duplicate(src, src)
+        with open(src, 'rb') as fh:
+            self.assertEqual(fh.read(), data)
+
+    def test_duplicate_fallbacks(self):
+        src = os.path.join(self.temp_dir.name, 'src')
+        dst = os.path.join(self.temp_dir.name, 'dst')
+        data = os.urandom(100000)
+        with open(src, 'wb') as fh:
+            fh.write(data)
+
+        exdev = OSError(errno.EXDEV, 'Invalid cross-device link')
+        with patch('q2_types._util._reflink', return_value=False), \
+                patch('os.link', side_effect=exdev):
+            before = _duplicate_stats()
+            _duplicate(src, dst)
+            with patch('q2_types._util._kernel_copy', return_value=False):
+                _duplicate(src, dst, overwrite=True)
+            stats = _duplicate_stats() - before
+
+        with open(dst, 'rb') as fh:
+            self.assertEqual(fh.read(), data)
+        self.assertEqual(stats, {'copy': 2, 'bytes_copied': 2 * len(data)})
+
+    def test_bgzf_writer(self):
+        data = b''.join(b'@r%d\nACGT\n+\nIIII\n' % i for i in range(1000))
+        fp = os.path.join(self.temp_dir.name, 'reads.fastq.gz')
+
+        with patch('q2_types._util._BGZF_BLOCK_SIZE', 100), \
+                patch('q2_types._util._BGZF_BATCH_SIZE', 300):
+            with _BGZFWriter(fp, compresslevel=1, n_jobs=3) as fh:
+                for start in range(0, len(data), 77):
+                    chunk = data[start:start + 77]
+                    self.assertEqual(fh.write(chunk), len(chunk))
+
+        with gzip.open(fp, 'rb') as fh:
+            self.assertEqual(fh.read(), data)
+        self.assertEqual(b''.join(_iter_bgzf(fp, n_jobs=2)), data)
+        _check_fastq_gz(fp, n_jobs=2)
+
+    def test_open_gzip_writer(self):
+        fp = os.path.join(self.temp_dir.name, 'reads.fastq.gz')
+
+        with _open_gzip_writer(fp, n_jobs=1) as fh:
+            self.assertIsInstance(fh, gzip.GzipFile)
+        with _open_gzip_writer(fp, n_jobs=2) as fh:
+            self.assertIsInstance(fh, _BGZFWriter)
+            fh.write(b'@r1\nACGT\n+\nIIII\n')
+        with gzip.open(fp, 'rb') as fh:
+            self.assertEqual(fh.read(), b'@r1\nACGT\n+\nIIII\n')
+
+    def test_get_gzip_level(self):
+        self.assertEqual(_get_gzip_level(1), 1)
+        with patch.dict(os.environ, {'Q2_TYPES_GZIP_LEVEL': '4'}):
+            self.assertEqual(_get_gzip_level(), 4)
+            self.assertEqual(_get_gzip_level(6), 6)
+        with patch.dict(os.environ, {'Q2_TYPES_GZIP_LEVEL': 'fast'}):
+            with self.assertRaisesRegex(ValueError, 'Q2_TYPES_GZIP_LEVEL'):
+                _get_gzip_level()
+        with self.assertRaisesRegex(ValueError, 'from 0 to 9'):
+            _get_gzip_level(10)